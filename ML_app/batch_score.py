@@ -0,0 +1,149 @@
+"""
+Wsadowa ocena plików z danymi pacjentów (CSV lub Parquet) bez uruchamiania serwera.
+Plik wczytywany jest porcjami, każda porcja oceniana jest wszystkimi modelami naraz
+(jedno transform i jedno predict_proba na model), a porcje rozdzielane są między procesy.
+Uruchamianie z katalogu ML_app:
+
+    python batch_score.py heart_disease pacjenci.csv wyniki.csv [--workers 4] [--chunksize 50000]
+
+Plik wejściowy musi zawierać kolumny cech zbioru danych (nazwy jak w schema.py i plikach datasets/*.csv);
+pozostałe kolumny (np. identyfikator pacjenta) są przepisywane do wyniku bez zmian.
+Do wyniku dopisywane są kolumny <model>_prediction i <model>_probability.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from registry import ModelRegistry
+from schema import SCHEMAS
+from scoring import MODEL_LABELS, score_models
+
+# Modele w procesie roboczym (ustawiane przez _init_worker)
+_worker_models = None
+
+
+def read_chunks(path, chunksize):
+    """Wczytuje plik CSV lub Parquet porcjami po chunksize wierszy"""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Obsługa plików Parquet wymaga pakietu pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, encoding='utf-8-sig')
+
+
+class ResultWriter:
+    """Zapisuje kolejne porcje wyników do pliku CSV lub Parquet"""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet = None
+        self._first = True
+
+    def write(self, frame):
+        if self.path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def _init_worker(dataset_name, version, models_root):
+    global _worker_models
+    # Wersja wybrana raz dla całego pliku - wszystkie procesy oceniają go tymi samymi modelami
+    registry = ModelRegistry([dataset_name], models_root=models_root, check_interval=None)
+    _worker_models = registry.load_version(dataset_name, version)
+
+
+def score_chunk(dataset_name, chunk):
+    """
+    Ocena jednej porcji danych - zwraca ramkę wejściową z dopisanymi wynikami modeli.
+    Macierz cech (float64, kolejność schematu) budowana jest tym samym koderem co w aplikacji.
+    """
+    models = _worker_models
+    input_scaled = models['scaler'].transform(SCHEMAS[dataset_name].encode_frame(chunk))
+    results = score_models(models, input_scaled)
+
+    output = chunk.reset_index(drop=True)
+    for model_key, (labels, probabilities) in results.items():
+        output[f'{model_key}_prediction'] = labels
+        output[f'{model_key}_probability'] = probabilities
+    return output
+
+
+def score_file(dataset_name, input_path, output_path, workers=None, chunksize=50000, models_root='models'):
+    """
+    Ocenia plik porcjami w puli procesów. Wyniki zapisywane są w kolejności wierszy wejściowych;
+    w obiegu jest najwyżej 2 * workers porcji, więc zużycie pamięci nie zależy od rozmiaru pliku.
+    Zwraca (liczba wierszy, czas w sekundach).
+    """
+    workers = workers or os.cpu_count() or 1
+    version = ModelRegistry([dataset_name], models_root=models_root).resolve(dataset_name)[0]
+    writer = ResultWriter(output_path)
+    rows = 0
+    start = time.perf_counter()
+
+    try:
+        if workers == 1:
+            _init_worker(dataset_name, version, models_root)
+            for chunk in read_chunks(input_path, chunksize):
+                output = score_chunk(dataset_name, chunk)
+                writer.write(output)
+                rows += len(output)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(dataset_name, version, models_root)) as executor:
+                pending = deque()
+                for chunk in read_chunks(input_path, chunksize):
+                    pending.append(executor.submit(score_chunk, dataset_name, chunk))
+                    if len(pending) >= 2 * workers:
+                        output = pending.popleft().result()
+                        writer.write(output)
+                        rows += len(output)
+                while pending:
+                    output = pending.popleft().result()
+                    writer.write(output)
+                    rows += len(output)
+    finally:
+        writer.close()
+
+    return rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wsadowa ocena pliku CSV/Parquet wszystkimi modelami")
+    parser.add_argument('dataset', choices=list(SCHEMAS), help="Zbiór danych")
+    parser.add_argument('input', help="Plik wejściowy (.csv lub .parquet)")
+    parser.add_argument('output', help="Plik wynikowy (.csv lub .parquet)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Liczba procesów oceniających (domyślnie liczba rdzeni)")
+    parser.add_argument('--chunksize', type=int, default=50000, help="Liczba wierszy w porcji")
+    parser.add_argument('--models-root', default='models', help="Katalog z modelami")
+    args = parser.parse_args()
+
+    rows, elapsed = score_file(args.dataset, args.input, args.output, workers=args.workers,
+                               chunksize=args.chunksize, models_root=args.models_root)
+    print(f"Oceniono {rows} wierszy w {elapsed:.2f} s ({rows / elapsed if elapsed else 0:.0f} wierszy/s), "
+          f"modele: {', '.join(MODEL_LABELS.values())}")
+    print(f"Wyniki zapisano w {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# Znacznik zakończenia pracy wątku grupującego
+_STOP = object()
+# Znacznik wyniku bez metadanych
+_NO_META = object()
+
+
+class MicroBatcher:
+    """
+    Grupowanie równoczesnych jednowierszowych predykcji (dynamic batching).
+    Żądania dla tego samego zbioru danych trafiają do wspólnej kolejki; wątek grupujący
+    czeka najwyżej max_wait_ms od pojawienia się pierwszego wiersza (lub do zebrania
+    max_rows wierszy) i przekazuje całą macierz do process(klucz, macierz) jednym wywołaniem.
+    Każdy wywołujący otrzymuje swój wiersz wyniku przez Future.
+
+    process musi zwracać wynik w formacie score_models: {klucz_modelu: (etykiety, prawdopodobieństwa)}
+    albo parę (wynik, metadane) - metadane (np. wersja modeli) przekazywane są bez zmian
+    każdemu wierszowi partii, który otrzymuje wtedy (swój wynik, metadane).
+    """
+
+    def __init__(self, process, max_wait_ms=5.0, max_rows=64):
+        self.process = process
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_rows = max_rows
+        self._queues = {}
+        self._threads = {}
+        self._lock = threading.Lock()
+
+        # Metryki
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_size = 0
+        self.batch_sizes = {}            # rozmiar partii -> liczba partii
+        self.total_queue_delay = 0.0     # suma czasów oczekiwania wierszy w kolejce (s)
+        self.max_queue_delay = 0.0
+
+    def _queue_for(self, key):
+        with self._lock:
+            if key not in self._queues:
+                self._queues[key] = queue.Queue()
+                thread = threading.Thread(target=self._run, args=(key,), name=f'microbatch-{key}', daemon=True)
+                self._threads[key] = thread
+                thread.start()
+            return self._queues[key]
+
+    def submit(self, key, row):
+        """Dodaje wiersz do kolejki zbioru danych i zwraca Future z wynikiem dla tego wiersza"""
+        future = Future()
+        self._queue_for(key).put((time.perf_counter(), np.asarray(row, dtype=np.float64), future))
+        return future
+
+    def score(self, key, row, timeout=None):
+        """Wynik dla jednego wiersza (czeka na przetworzenie partii, w której się znalazł)"""
+        return self.submit(key, row).result(timeout)
+
+    def _collect(self, pending, first):
+        """Zbiera wiersze do max_rows lub do upływu max_wait od pojawienia się pierwszego"""
+        items = [first]
+        deadline = first[0] + self.max_wait
+        stop = False
+        while len(items) < self.max_rows:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            items.append(item)
+        return items, stop
+
+    def _run(self, key):
+        pending = self._queues[key]
+        while True:
+            first = pending.get()
+            if first is _STOP:
+                return
+            items, stop = self._collect(pending, first)
+            started = time.perf_counter()
+            self._record(items, started)
+
+            try:
+                results = self.process(key, np.vstack([row for _, row, _ in items]))
+            except Exception as e:
+                for _, _, future in items:
+                    future.set_exception(e)
+            else:
+                results, meta = results if isinstance(results, tuple) else (results, _NO_META)
+                for i, (_, _, future) in enumerate(items):
+                    row_results = {model_key: (labels[i:i + 1], probabilities[i:i + 1])
+                                   for model_key, (labels, probabilities) in results.items()}
+                    future.set_result(row_results if meta is _NO_META else (row_results, meta))
+            if stop:
+                return
+
+    def _record(self, items, started):
+        delays = [started - enqueued for enqueued, _, _ in items]
+        with self._lock:
+            self.batches += 1
+            self.rows += len(items)
+            self.max_batch_size = max(self.max_batch_size, len(items))
+            self.batch_sizes[len(items)] = self.batch_sizes.get(len(items), 0) + 1
+            self.total_queue_delay += sum(delays)
+            self.max_queue_delay = max(self.max_queue_delay, max(delays))
+
+    def stop(self):
+        """Kończy wątki grupujące po przetworzeniu wierszy, które są już w kolejkach"""
+        with self._lock:
+            queues = list(self._queues.values())
+            threads = list(self._threads.values())
+        for pending in queues:
+            pending.put(_STOP)
+        for thread in threads:
+            thread.join()
+
+    def stats(self):
+        """Rozmiary partii i czasy oczekiwania w kolejce"""
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'rows': self.rows,
+                'mean_batch_size': round(self.rows / self.batches, 3) if self.batches else 0.0,
+                'max_batch_size': self.max_batch_size,
+                'batch_sizes': dict(sorted(self.batch_sizes.items())),
+                'mean_queue_delay_ms': round(self.total_queue_delay / self.rows * 1000, 3) if self.rows else 0.0,
+                'max_queue_delay_ms': round(self.max_queue_delay * 1000, 3)
+            }
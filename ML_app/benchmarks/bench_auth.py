@@ -0,0 +1,81 @@
+"""
+Benchmark ścieżki uwierzytelniania: liczba uwierzytelnionych żądań na sekundę
+z pamięcią podręczną użytkowników i bez niej (load_user z zapytaniem do bazy przy
+każdym żądaniu) oraz przepustowość logowań dla skonfigurowanej metody haszowania.
+Uruchamianie z katalogu ML_app (baza tymczasowa, dane aplikacji nie są zmieniane):
+
+    python benchmarks/bench_auth.py [--requests 2000] [--logins 20] [--threads 4]
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from passwords import password_hasher
+
+
+def load_app(database_path):
+    """Importuje aplikację (flask-app.py) z tymczasową bazą danych"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{database_path}'
+    spec = importlib.util.spec_from_file_location('flask_app', 'flask-app.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.app.config['TESTING'] = True
+    return module
+
+
+def authenticated_rate(module, client, requests, cache):
+    """Żądania na sekundę dla strony wymagającej zalogowania"""
+    saved = module.user_cache
+    module.user_cache = saved if cache else None
+    try:
+        client.get('/')
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get('/')
+        return requests / (time.perf_counter() - start)
+    finally:
+        module.user_cache = saved
+
+
+def login_rate(module, logins, threads):
+    """Logowania na sekundę przy równoległych klientach"""
+    def login(_):
+        client = module.app.test_client()
+        return client.post('/login', data={'username': 'bench', 'password': 'bench-password'}).status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(login, range(logins)))
+    return logins / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark uwierzytelniania")
+    parser.add_argument('--requests', type=int, default=2000, help="Liczba uwierzytelnionych żądań")
+    parser.add_argument('--logins', type=int, default=20, help="Liczba logowań")
+    parser.add_argument('--threads', type=int, default=4, help="Liczba równoległych klientów logujących się")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        module = load_app(f'{directory}/bench.db')
+        client = module.app.test_client()
+        client.post('/register', data={'username': 'bench', 'email': 'bench@example.com',
+                                       'password': 'bench-password'})
+        client.post('/login', data={'username': 'bench', 'password': 'bench-password'})
+
+        without_cache = authenticated_rate(module, client, args.requests, cache=False)
+        with_cache = authenticated_rate(module, client, args.requests, cache=True)
+        logins = login_rate(module, args.logins, args.threads)
+
+        print(f"Uwierzytelnione żądania/s bez pamięci podręcznej: {without_cache:.0f}")
+        print(f"Uwierzytelnione żądania/s z pamięcią podręczną:  {with_cache:.0f} ({with_cache / without_cache:.2f}x)")
+        print(f"Logowania/s ({args.threads} klientów, metoda {password_hasher.method}): {logins:.1f}")
+
+
+if __name__ == '__main__':
+    main()
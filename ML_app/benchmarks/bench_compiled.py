@@ -0,0 +1,62 @@
+"""
+Porównanie opóźnień predykcji modeli sklearn i ich skompilowanych odpowiedników
+(compiled.py) wraz ze sprawdzeniem zgodności prawdopodobieństw. Uruchamianie z katalogu ML_app:
+
+    python benchmarks/bench_compiled.py [--repeat 100]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compiled import compile_model
+from scoring import MODEL_LABELS
+
+DATASETS = ['heart_disease', 'diabetes', 'lung_cancer']
+# Maksymalna dopuszczalna różnica prawdopodobieństw
+TOLERANCE = 1e-9
+
+
+def measure(function, repeat):
+    """Zwraca najlepszy średni czas jednego wywołania w milisekundach"""
+    return min(timeit.repeat(function, number=repeat, repeat=3)) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=100, help='Liczba powtórzeń dla każdego pomiaru')
+    parser.add_argument('--batch', type=int, default=1000, help='Liczba wierszy w pomiarze wsadowym')
+    args = parser.parse_args()
+
+    print(f"{'Zbiór danych':<15} {'Model':<7} {'Wiersze':>8} {'sklearn [ms]':>13} {'compiled [ms]':>14} "
+          f"{'Przyspieszenie':>15} {'Maks. różnica':>14}")
+
+    for dataset_name in DATASETS:
+        models_dir = f'models/{dataset_name}'
+        models = {key: joblib.load(f'{models_dir}/{key}_model.joblib') for key in MODEL_LABELS}
+        models['scaler'] = joblib.load(f'{models_dir}/scaler.joblib')
+        compiled = {key: compile_model(model) for key, model in models.items()}
+
+        rng = np.random.default_rng(42)
+        n_features = models['scaler'].n_features_in_
+        batch = rng.normal(size=(args.batch, n_features)) * 2
+
+        for rows in (1, args.batch):
+            X = batch[:rows]
+            for key in MODEL_LABELS:
+                difference = np.abs(models[key].predict_proba(X) - compiled[key].predict_proba(X)).max()
+                if difference > TOLERANCE:
+                    raise AssertionError(f"{dataset_name}/{key}: różnica {difference} przekracza {TOLERANCE}")
+
+                sklearn_time = measure(lambda: models[key].predict_proba(X), args.repeat)
+                compiled_time = measure(lambda: compiled[key].predict_proba(X), args.repeat)
+                print(f"{dataset_name:<15} {key:<7} {rows:>8} {sklearn_time:>13.3f} {compiled_time:>14.3f} "
+                      f"{sklearn_time / compiled_time:>14.1f}x {difference:>14.2e}")
+
+
+if __name__ == '__main__':
+    main()
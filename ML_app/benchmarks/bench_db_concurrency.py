@@ -0,0 +1,140 @@
+"""
+Benchmark współbieżnych zapisów predykcji i odczytów historii w SQLite:
+domyślne ustawienia (dziennik rollback, synchronous=FULL) w porównaniu
+z ustawieniami z db_config.SQLITE_PRAGMAS (WAL, synchronous=NORMAL, mmap).
+Uruchamianie z katalogu ML_app:
+
+    python benchmarks/bench_db_concurrency.py [--writers 4] [--readers 4] [--duration 5]
+
+Procesy zapisujące dodają pojedyncze predykcje (jedna transakcja na predykcję, jak widok predict),
+procesy czytające pobierają pierwszą stronę historii (jak widok history).
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Domyślne ustawienia SQLite (punkt odniesienia)
+BASELINE_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 5000}
+
+INSERT = ("INSERT INTO prediction (user_id, dataset, timestamp, features, rf_prediction, rf_probability, "
+          "lr_prediction, lr_probability, dt_prediction, dt_probability) VALUES (?, ?, ?, ?, 1, 0.5, 0, 0.4, 1, 1.0)")
+SELECT_PAGE = ("SELECT id, timestamp, features, rf_prediction, rf_probability, lr_prediction, lr_probability, "
+               "dt_prediction, dt_probability FROM prediction WHERE user_id = ? AND dataset = ? "
+               "ORDER BY timestamp DESC, id DESC LIMIT 50")
+
+
+def create_database(path, rows, users):
+    """Tworzy bazę ze schematem aplikacji i wypełnia ją predykcjami"""
+    from sqlalchemy import create_engine
+    from models import db
+
+    engine = create_engine(f'sqlite:///{path}')
+    db.Model.metadata.create_all(engine)
+    engine.dispose()
+
+    connection = sqlite3.connect(path)
+    features = np.zeros(8, dtype='<f8').tobytes()
+    connection.executemany(INSERT, [(i % users + 1, 'diabetes', datetime(2025, 1, 1, 0, 0, i % 60), features)
+                                    for i in range(rows)])
+    connection.commit()
+    connection.close()
+
+
+def worker(path, pragmas, kind, users, duration, start, results):
+    """Proces wykonujący zapisy lub odczyty do upływu czasu trwania pomiaru"""
+    from db_config import apply_sqlite_pragmas
+
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+    apply_sqlite_pragmas(connection, pragmas)
+    features = np.zeros(8, dtype='<f8').tobytes()
+    rng = np.random.default_rng(os.getpid())
+
+    operations = 0
+    latencies = []
+    start.wait()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        user_id = int(rng.integers(1, users + 1))
+        began = time.perf_counter()
+        if kind == 'write':
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(INSERT, (user_id, 'diabetes', datetime.utcnow(), features))
+            connection.execute('COMMIT')
+        else:
+            connection.execute(SELECT_PAGE, (user_id, 'diabetes')).fetchall()
+        latencies.append(time.perf_counter() - began)
+        operations += 1
+
+    connection.close()
+    results.put((kind, operations, latencies))
+
+
+def run(path, pragmas, writers, readers, users, duration):
+    """Uruchamia procesy zapisujące i czytające, zwraca statystyki dla każdego rodzaju operacji"""
+    from db_config import apply_sqlite_pragmas
+
+    # Tryb dziennika jest zapisywany w pliku bazy - ustawiany przed startem procesów
+    connection = sqlite3.connect(path)
+    apply_sqlite_pragmas(connection, {'journal_mode': pragmas['journal_mode']})
+    connection.close()
+
+    context = multiprocessing.get_context('spawn')
+    start = context.Barrier(writers + readers)
+    results = context.Queue()
+    kinds = ['write'] * writers + ['read'] * readers
+    processes = [context.Process(target=worker, args=(path, pragmas, kind, users, duration, start, results))
+                 for kind in kinds]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    stats = {}
+    for kind in ('write', 'read'):
+        operations = sum(count for k, count, _ in collected if k == kind)
+        latencies = np.concatenate([np.array(lat) for k, _, lat in collected if k == kind] or [np.zeros(0)])
+        stats[kind] = {
+            'ops_per_s': operations / duration,
+            'p50_ms': float(np.percentile(latencies, 50) * 1000) if latencies.size else 0.0,
+            'p99_ms': float(np.percentile(latencies, 99) * 1000) if latencies.size else 0.0
+        }
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark współbieżnego dostępu do bazy predykcji")
+    parser.add_argument('--writers', type=int, default=4, help="Liczba procesów zapisujących")
+    parser.add_argument('--readers', type=int, default=4, help="Liczba procesów czytających")
+    parser.add_argument('--users', type=int, default=20, help="Liczba użytkowników w danych testowych")
+    parser.add_argument('--rows', type=int, default=50000, help="Liczba predykcji w bazie przed pomiarem")
+    parser.add_argument('--duration', type=float, default=5.0, help="Czas trwania pomiaru (sekundy)")
+    args = parser.parse_args()
+
+    from db_config import SQLITE_PRAGMAS
+
+    configurations = [('domyślne', BASELINE_PRAGMAS), ('db_config', SQLITE_PRAGMAS)]
+    print(f"{'Ustawienia':<12} {'Zapisy/s':>10} {'p50 zap.':>10} {'p99 zap.':>10} "
+          f"{'Odczyty/s':>10} {'p50 odcz.':>10} {'p99 odcz.':>10}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, pragmas in configurations:
+            path = f'{directory}/{name}.db'
+            create_database(path, args.rows, args.users)
+            stats = run(path, pragmas, args.writers, args.readers, args.users, args.duration)
+            write, read = stats['write'], stats['read']
+            print(f"{name:<12} {write['ops_per_s']:>10.0f} {write['p50_ms']:>9.2f}ms {write['p99_ms']:>9.2f}ms "
+                  f"{read['ops_per_s']:>10.0f} {read['p50_ms']:>9.2f}ms {read['p99_ms']:>9.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Mikro-benchmark porównujący dotychczasowy sposób predykcji (osobne predict
+i predict_proba dla każdego modelu) z funkcją score_models (jedno predict_proba
+na model). Uruchamianie z katalogu ML_app:
+
+    python benchmarks/bench_scoring.py [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scoring import MODEL_LABELS, score_models
+
+DATASETS = ['heart_disease', 'diabetes', 'lung_cancer']
+
+
+def score_separately(models, input_scaled):
+    """Dotychczasowa ścieżka widoku predict - predict i predict_proba osobno"""
+    return {
+        model_key: (models[model_key].predict(input_scaled),
+                    models[model_key].predict_proba(input_scaled)[:, 1])
+        for model_key in MODEL_LABELS
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help='Liczba powtórzeń dla każdego wariantu')
+    args = parser.parse_args()
+
+    print(f"{'Zbiór danych':<15} {'predict+proba [ms]':>20} {'score_models [ms]':>18} {'Oszczędność':>12}")
+    for dataset_name in DATASETS:
+        models_dir = f'models/{dataset_name}'
+        models = {key: joblib.load(f'{models_dir}/{key}_model.joblib') for key in MODEL_LABELS}
+        scaler = joblib.load(f'{models_dir}/scaler.joblib')
+
+        # Jeden losowy wiersz - odpowiada pojedynczemu żądaniu /predict
+        row = np.random.default_rng(42).normal(size=(1, scaler.n_features_in_))
+
+        # Sprawdzenie zgodności wyników obu ścieżek
+        old = score_separately(models, row)
+        new = score_models(models, row)
+        for model_key in MODEL_LABELS:
+            assert np.array_equal(old[model_key][0], new[model_key][0])
+            assert np.allclose(old[model_key][1], new[model_key][1])
+
+        old_time = min(timeit.repeat(lambda: score_separately(models, row), number=args.repeat, repeat=3)) / args.repeat
+        new_time = min(timeit.repeat(lambda: score_models(models, row), number=args.repeat, repeat=3)) / args.repeat
+        saving = (old_time - new_time) / old_time * 100
+        print(f"{dataset_name:<15} {old_time * 1000:>20.3f} {new_time * 1000:>18.3f} {saving:>11.1f}%")
+
+
+if __name__ == '__main__':
+    main()
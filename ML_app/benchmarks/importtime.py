@@ -0,0 +1,129 @@
+"""
+Raport czasu startu procesu serwera na podstawie python -X importtime. W nowym procesie
+importowany jest punkt wejścia WSGI (wsgi.py), a po imporcie skrypt czeka na załadowanie
+modeli wszystkich zbiorów danych. Raport zawiera:
+  - czas importu aplikacji (suma z -X importtime) i czas do gotowości modeli,
+  - moduły najwyższego poziomu o największym łącznym czasie importu,
+  - moduły zakazane w procesie serwera (domyślnie pandas i sklearn), jeśli zostały załadowane.
+
+Skrypt kończy się kodem 1, gdy start przekracza --target-ms lub załadowano moduł zakazany.
+Uruchamianie z katalogu ML_app:
+
+    python benchmarks/importtime.py
+    python benchmarks/importtime.py --target-ms 1500 --top 30
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+# Moduły, których proces serwera nie powinien ładować (stos trenowania)
+FORBIDDEN_MODULES = ('pandas', 'sklearn')
+
+# Skrypt procesu potomnego - wypisuje czasy i listę załadowanych pakietów jako JSON.
+# Ładowanie modeli w tle jest wstrzymywane do końca importu i wykonywane w wątku głównym -
+# importy z dwóch wątków przeplatałyby się w wyjściu -X importtime, zaburzając drzewo importów.
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import registry
+registry.ModelRegistry.start_preload = lambda self, parallel=True: None
+import wsgi
+imported = time.perf_counter()
+wsgi.flask_app.model_registry.preload(parallel=False)
+ready = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - start,
+    'ready_seconds': ready - start,
+    'status': wsgi.flask_app.model_registry.status(),
+    'packages': sorted({name.split('.')[0] for name in sys.modules})
+}))
+"""
+
+# Wiersz wyjścia -X importtime: "import time: <własny> | <łączny> | <wcięcie><moduł>"
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(-?\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(output):
+    """Lista (moduł, głębokość, własny czas, łączny czas) w mikrosekundach z wyjścia -X importtime"""
+    entries = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            entries.append((match[4], len(match[3]) // 2, int(match[1]), int(match[2])))
+    return entries
+
+
+def startup_report(database_url=None):
+    """
+    Uruchamia start aplikacji w nowym procesie z -X importtime (z osobną bazą SQLite).
+    Zwraca słownik z czasami startu, listą pakietów i wpisami importów.
+    """
+    env = dict(os.environ)
+    env['DATABASE_URL'] = database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='importtime-'), 'startup.db')}"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+                            capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(f"Start aplikacji nie powiódł się:\n{result.stderr[-2000:]}")
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['imports'] = parse_importtime(result.stderr)
+    # Łączny czas importu punktu wejścia (wsgi importuje flask-app.py i wszystkie jego zależności)
+    report['wsgi_import_us'] = sum(cumulative for name, depth, _, cumulative in report['imports']
+                                   if depth == 0 and name in ('registry', 'wsgi'))
+    return report
+
+
+def top_level(imports, top):
+    """
+    Moduły importowane bezpośrednio przez aplikację (poziom 1 pod wsgi) oraz przy ładowaniu
+    modeli (poziom 0 po imporcie wsgi), według łącznego czasu importu. Wyjście -X importtime
+    wypisuje moduł po jego zależnościach, więc wpisy aplikacji poprzedzają wiersz wsgi.
+    """
+    after_wsgi = False
+    entries = []
+    for name, depth, _, cumulative in imports:
+        if depth == (0 if after_wsgi else 1):
+            entries.append((name, cumulative))
+        after_wsgi = after_wsgi or (depth == 0 and name == 'wsgi')
+    return sorted(entries, key=lambda entry: -entry[1])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raport czasu importu i startu procesu serwera")
+    parser.add_argument('--top', type=int, default=20, help="Liczba wyświetlanych modułów")
+    parser.add_argument('--target-ms', type=float, default=None,
+                        help="Maksymalny czas do gotowości modeli w milisekundach")
+    parser.add_argument('--forbid', default=','.join(FORBIDDEN_MODULES),
+                        help="Pakiety zakazane w procesie serwera (oddzielone przecinkami)")
+    args = parser.parse_args()
+
+    report = startup_report()
+    print(f"Import aplikacji: {report['import_seconds'] * 1000:.1f} ms "
+          f"(-X importtime: {report['wsgi_import_us'] / 1000:.1f} ms)")
+    print(f"Gotowość modeli:  {report['ready_seconds'] * 1000:.1f} ms")
+    for dataset_name, status in report['status'].items():
+        if status['state'] != 'ready':
+            print(f"  {dataset_name}: {status['state']} {status.get('error', '')}")
+
+    print("\nModuły o najdłuższym imporcie (łącznie z zależnościami):")
+    for name, cumulative in top_level(report['imports'], args.top):
+        print(f"  {name:<50} {cumulative / 1000:>10.1f} ms")
+
+    failed = False
+    forbidden = sorted(set(name for name in args.forbid.split(',') if name) & set(report['packages']))
+    if forbidden:
+        print(f"\nZaładowano moduły zakazane w procesie serwera: {', '.join(forbidden)} "
+              f"(brak modeli skompilowanych? zob. multi-dataset-predictor.py export)")
+        failed = True
+    if args.target_ms is not None and report['ready_seconds'] * 1000 > args.target_ms:
+        print(f"\nStart trwa dłużej niż {args.target_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Test obciążeniowy działającego serwera: równolegli klienci wysyłają formularze predykcji
+i mierzony jest rozkład czasów odpowiedzi (p50/p99) oraz przepustowość.
+Przykład porównania serwera deweloperskiego z trybem produkcyjnym (z katalogu ML_app):
+
+    python flask-app.py                                   # http://127.0.0.1:5000
+    python benchmarks/load_test.py --url http://127.0.0.1:5000
+
+    INFERENCE_WORKERS=2 gunicorn -c gunicorn.conf.py wsgi:app   # http://127.0.0.1:8000
+    python benchmarks/load_test.py --url http://127.0.0.1:8000
+
+Skrypt rejestruje (jeśli trzeba) i loguje użytkownika testowego.
+"""
+import argparse
+import http.cookiejar
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Zakresy losowanych wartości cech (wartości całkowite) dla każdego zbioru danych - nazwy jak w schema.py
+FEATURE_RANGES = {
+    'heart_disease': {
+        'age': (29, 77), 'sex': (0, 1), 'cp': (0, 3), 'trestbps': (94, 200), 'chol': (126, 564),
+        'fbs': (0, 1), 'restecg': (0, 2), 'thalach': (71, 202), 'exang': (0, 1), 'oldpeak': (0, 6),
+        'slope': (0, 2), 'ca': (0, 4), 'thal': (0, 3)
+    },
+    'diabetes': {
+        'Pregnancies': (0, 17), 'Glucose': (44, 199), 'BloodPressure': (24, 122), 'SkinThickness': (7, 99),
+        'Insulin': (14, 846), 'BMI': (18, 67), 'DiabetesPedigreeFunction': (0, 2), 'Age': (21, 81)
+    },
+    'lung_cancer': {
+        'GENDER': ('M', 'F'), 'AGE': (21, 87), 'SMOKING': (1, 2), 'YELLOW_FINGERS': (1, 2), 'ANXIETY': (1, 2),
+        'PEER_PRESSURE': (1, 2), 'CHRONIC DISEASE': (1, 2), 'FATIGUE': (1, 2), 'ALLERGY': (1, 2),
+        'WHEEZING': (1, 2), 'ALCOHOL CONSUMING': (1, 2), 'COUGHING': (1, 2), 'SHORTNESS OF BREATH': (1, 2),
+        'SWALLOWING DIFFICULTY': (1, 2), 'CHEST PAIN': (1, 2)
+    }
+}
+
+
+def random_form(dataset_name, rng):
+    """Losowy formularz predykcji dla zbioru danych"""
+    form = {}
+    for name, (low, high) in FEATURE_RANGES[dataset_name].items():
+        if isinstance(low, str):
+            form[name] = low if rng.random() < 0.5 else high
+        else:
+            form[name] = str(int(rng.integers(low, high + 1)))
+    return form
+
+
+def login(base_url, username, password):
+    """Rejestruje (jeśli trzeba) i loguje użytkownika, zwraca słoik ciasteczek sesji"""
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    credentials = {'username': username, 'email': f'{username}@example.com', 'password': password}
+    opener.open(f'{base_url}/register', urllib.parse.urlencode(credentials).encode())
+    opener.open(f'{base_url}/login', urllib.parse.urlencode(credentials).encode())
+    if not any(cookie.name in ('session', 'remember_token') for cookie in jar):
+        raise RuntimeError("Logowanie nie powiodło się")
+    return jar
+
+
+def run_load(base_url, jar, dataset_name, requests, concurrency, seed):
+    """Wysyła żądania predykcji z concurrency wątków, zwraca (czasy odpowiedzi, kody, czas całkowity)"""
+    local = threading.local()
+    rng_lock = threading.Lock()
+    rng = np.random.default_rng(seed)
+
+    def request(_):
+        if not hasattr(local, 'opener'):
+            local.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+        with rng_lock:
+            data = urllib.parse.urlencode(random_form(dataset_name, rng)).encode()
+
+        start = time.perf_counter()
+        try:
+            with local.opener.open(f'{base_url}/predict/{dataset_name}', data, timeout=60) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except urllib.error.URLError:
+            status = 0
+        return time.perf_counter() - start, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(request, range(requests)))
+    total = time.perf_counter() - start
+
+    latencies = np.array([latency for latency, _ in results])
+    statuses = [status for _, status in results]
+    return latencies, statuses, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test obciążeniowy endpointu predykcji")
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help="Adres serwera")
+    parser.add_argument('--dataset', default='heart_disease', choices=list(FEATURE_RANGES),
+                        help="Zbiór danych")
+    parser.add_argument('--requests', type=int, default=500, help="Łączna liczba żądań")
+    parser.add_argument('--concurrency', type=int, default=16, help="Liczba równoległych klientów")
+    parser.add_argument('--warmup', type=int, default=20, help="Liczba żądań rozgrzewających (bez pomiaru)")
+    parser.add_argument('--username', default='loadtest', help="Użytkownik testowy")
+    parser.add_argument('--password', default='loadtest-password', help="Hasło użytkownika testowego")
+    parser.add_argument('--seed', type=int, default=42, help="Ziarno losowania danych wejściowych")
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip('/')
+    jar = login(base_url, args.username, args.password)
+    if args.warmup:
+        run_load(base_url, jar, args.dataset, args.warmup, min(args.concurrency, args.warmup), args.seed + 1)
+
+    latencies, statuses, total = run_load(base_url, jar, args.dataset, args.requests, args.concurrency, args.seed)
+    ok = sum(1 for status in statuses if status == 200)
+    rejected = sum(1 for status in statuses if status == 503)
+
+    print(f"Serwer: {base_url}, zbiór: {args.dataset}, żądania: {args.requests}, klienci: {args.concurrency}")
+    print(f"Przepustowość: {args.requests / total:.1f} żądań/s")
+    print(f"Czas odpowiedzi p50: {np.percentile(latencies, 50) * 1000:.1f} ms, "
+          f"p99: {np.percentile(latencies, 99) * 1000:.1f} ms, max: {latencies.max() * 1000:.1f} ms")
+    print(f"Odpowiedzi 200: {ok}, 503 (przeciążenie): {rejected}, inne: {len(statuses) - ok - rejected}")
+
+
+if __name__ == '__main__':
+    main()
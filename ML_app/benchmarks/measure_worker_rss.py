@@ -0,0 +1,86 @@
+"""
+Pomiar pamięci procesów roboczych po załadowaniu modeli wszystkich zbiorów danych,
+z mapowaniem plików (mmap_mode='r') i bez niego. Uruchamianie z katalogu ML_app:
+
+    python benchmarks/measure_worker_rss.py [--workers 4]
+
+Dla każdego procesu raportowane są przyrosty RSS oraz PSS (Proportional Set Size).
+RSS liczy współdzielone strony w każdym procesie osobno, natomiast PSS dzieli je
+proporcjonalnie między procesy - to PSS pokazuje rzeczywisty koszt kolejnego workera.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATASETS = ['heart_disease', 'diabetes', 'lung_cancer']
+
+
+def read_memory_kb():
+    """Zwraca (RSS, PSS) bieżącego procesu w kB na podstawie /proc/self/smaps_rollup"""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0]] = int(parts[1])
+    return values['Rss:'], values['Pss:']
+
+
+def worker(mmap_mode, loaded, done, results):
+    """Proces roboczy - ładuje modele i raportuje zużycie pamięci"""
+    import warnings
+    warnings.filterwarnings('ignore')
+    import sklearn.ensemble  # noqa: F401 - koszt importu nie wchodzi do pomiaru
+    from registry import ModelRegistry
+
+    rss_before, pss_before = read_memory_kb()
+    registry = ModelRegistry(DATASETS, mmap_mode=mmap_mode)
+    registry.preload(parallel=False)
+
+    # Pomiar dopiero gdy wszystkie procesy mają załadowane modele
+    loaded.wait()
+    rss_after, pss_after = read_memory_kb()
+    results.put((os.getpid(), rss_after - rss_before, pss_after - pss_before))
+    done.wait()
+
+
+def measure(workers, mmap_mode):
+    """Uruchamia procesy robocze i zwraca listę (pid, przyrost RSS, przyrost PSS)"""
+    context = multiprocessing.get_context('spawn')
+    loaded = context.Barrier(workers + 1)
+    done = context.Barrier(workers + 1)
+    results = context.Queue()
+
+    processes = [context.Process(target=worker, args=(mmap_mode, loaded, done, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    loaded.wait()
+    measurements = [results.get() for _ in range(workers)]
+    done.wait()
+    for process in processes:
+        process.join()
+    return measurements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4, help='Liczba procesów roboczych')
+    args = parser.parse_args()
+
+    for mmap_mode in (None, 'r'):
+        measurements = measure(args.workers, mmap_mode)
+        print(f"\nmmap_mode={mmap_mode!r}, procesów: {args.workers}")
+        print(f"{'PID':>8} {'RSS [MB]':>10} {'PSS [MB]':>10}")
+        for pid, rss, pss in measurements:
+            print(f"{pid:>8} {rss / 1024:>10.2f} {pss / 1024:>10.2f}")
+        total_pss = sum(pss for _, _, pss in measurements) / 1024
+        print(f"Suma PSS: {total_pss:.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
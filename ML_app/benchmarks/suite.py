@@ -0,0 +1,383 @@
+"""
+Zestaw benchmarków głównych ścieżek projektu na danych syntetycznych (benchmarks/synthetic.py):
+  load       - wczytywanie zbioru danych (load_dataset w pamięci i porcjami) w funkcji liczby wierszy,
+  train      - trenowanie modeli (train_models) i lasu losowego w funkcji liczby rdzeni,
+  model_load - zimne (nowy proces) i ciepłe (modele w pamięci) ładowanie modeli,
+  startup    - import aplikacji i czas do gotowości modeli w nowym procesie serwera (benchmarks/importtime.py),
+  predict    - predykcja pojedynczego wiersza i partii (score_models oraz endpointy aplikacji),
+  history    - strona historii predykcji (pierwsza i odległa) w funkcji liczby wierszy w bazie.
+
+Wyniki (mediana z powtórzeń, w sekundach) zapisywane są w benchmarks/results/<commit>.json.
+Po podaniu --baseline (commit lub plik JSON) skrypt porównuje metryki i kończy się kodem 1,
+jeśli któraś jest wolniejsza od bazowej o więcej niż --threshold. Uruchamianie z katalogu ML_app:
+
+    python benchmarks/suite.py --rows 10000,100000
+    python benchmarks/suite.py --only predict,history --baseline HEAD~1 --threshold 0.2
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schema import DATASETS_CONFIG, SCHEMAS
+from importtime import startup_report
+from synthetic import ensure_dataset
+
+# Modele zapisane starszą wersją sklearn - ostrzeżenie przy każdym ładowaniu zaciemniałoby wyniki
+warnings.filterwarnings('ignore', message='Trying to unpickle estimator')
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+# Katalog z wynikami benchmarków (jeden plik na commit)
+RESULTS_DIR = 'benchmarks/results'
+
+# Zarejestrowane grupy benchmarków: nazwa -> funkcja(kontekst)
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Rejestruje funkcję jako grupę benchmarków uruchamianą przez --only <name>"""
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def measure(fn, repeat, warmup=1):
+    """Czasy wykonania fn (sekundy) z repeat powtórzeń, po warmup wywołaniach rozgrzewających"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def quiet(fn):
+    """Wywołanie fn bez komunikatów wypisywanych na standardowe wyjście (trenowanie, wczytywanie)"""
+    def wrapper():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return wrapper
+
+
+def load_module(name, filename):
+    """Import modułu o nazwie pliku z myślnikiem (flask-app.py, multi-dataset-predictor.py)"""
+    spec = importlib.util.spec_from_file_location(name, filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Context:
+    """Parametry uruchomienia, zebrane metryki oraz współdzielona instancja aplikacji"""
+
+    def __init__(self, args):
+        self.datasets = args.datasets
+        self.rows = args.rows
+        self.history_rows = args.history_rows
+        self.cores = args.cores
+        self.repeat = args.repeat
+        self.metrics = {}
+        self._app = None
+
+    def record(self, name, timings):
+        self.metrics[name] = {
+            'median': float(np.median(timings)),
+            'min': float(np.min(timings)),
+            'repeat': len(timings)
+        }
+        print(f"  {name:<60} {self.metrics[name]['median'] * 1000:>12.3f} ms")
+
+    def app(self):
+        """Moduł flask-app z osobną bazą SQLite i zalogowanym klientem testowym (tworzony raz)"""
+        if self._app is None:
+            database = os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')
+            os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+            # Bez pamięci podręcznej wyników - mierzona jest predykcja, a nie odczyt z pamięci
+            os.environ['PREDICTION_CACHE_SIZE'] = '0'
+            module = load_module('flask_app', 'flask-app.py')
+            module.model_registry.preload()
+            client = module.app.test_client()
+            credentials = {'username': 'bench', 'email': 'bench@example.com', 'password': 'bench-password'}
+            client.post('/register', data=credentials)
+            client.post('/login', data=credentials)
+            with module.app.app_context():
+                user_id = module.User.query.filter_by(username='bench').first().id
+            self._app = (module, client, user_id)
+        return self._app
+
+
+def synthetic_predictor(dataset_name, path):
+    """MultiDatasetPredictor czytający plik syntetyczny zamiast datasets/*.csv"""
+    module = load_module('multi_dataset_predictor', 'multi-dataset-predictor.py')
+    predictor = module.MultiDatasetPredictor()
+    predictor.DATASETS_CONFIG = {**DATASETS_CONFIG, dataset_name: {**DATASETS_CONFIG[dataset_name], 'path': path}}
+    return module, predictor
+
+
+def random_rows(dataset_name, n, seed=0):
+    """Wiersze wylosowane z oryginalnego zbioru danych (wartości surowe, jak w formularzu)"""
+    import pandas as pd
+    config = DATASETS_CONFIG[dataset_name]
+    data = pd.read_csv(config['path'], encoding='utf-8-sig')
+    names = SCHEMAS[dataset_name].feature_names
+    return data[names].sample(n, replace=True, random_state=seed).to_dict('records')
+
+
+@benchmark('load')
+def bench_load(ctx):
+    for dataset_name in ctx.datasets:
+        for rows in ctx.rows:
+            path = ensure_dataset(dataset_name, rows)
+            _, predictor = synthetic_predictor(dataset_name, path)
+            ctx.record(f'load.in_memory[{dataset_name},rows={rows}]', measure(
+                quiet(lambda: predictor.load_dataset(dataset_name, use_cache=False)), ctx.repeat, warmup=0))
+            ctx.record(f'load.chunked[{dataset_name},rows={rows}]', measure(
+                quiet(lambda: predictor.load_dataset(dataset_name, chunksize=100000, use_cache=False)),
+                ctx.repeat, warmup=0))
+
+
+@benchmark('train')
+def bench_train(ctx):
+    for dataset_name in ctx.datasets:
+        for rows in ctx.rows:
+            module, predictor = synthetic_predictor(dataset_name, ensure_dataset(dataset_name, rows))
+            quiet(lambda: predictor.load_dataset(dataset_name, use_cache=False))()
+            ctx.record(f'train.train_models[{dataset_name},rows={rows}]',
+                       measure(quiet(predictor.train_models), ctx.repeat, warmup=0))
+            for cores in ctx.cores:
+                ctx.record(f'train.rf[{dataset_name},rows={rows},cores={cores}]', measure(
+                    lambda: module.build_model('rf', n_jobs=cores).fit(predictor.X_train, predictor.y_train),
+                    ctx.repeat, warmup=0))
+
+
+# Zimne ładowanie w nowym procesie - wypisuje czas importu i ładowania modeli
+COLD_LOAD_SCRIPT = """
+import time, warnings
+warnings.filterwarnings('ignore')
+start = time.perf_counter()
+from registry import ModelRegistry
+registry = ModelRegistry([{dataset_name!r}])
+registry.load({dataset_name!r})
+print(time.perf_counter() - start)
+"""
+
+
+@benchmark('model_load')
+def bench_model_load(ctx):
+    from registry import ModelRegistry
+
+    for dataset_name in ctx.datasets:
+        script = COLD_LOAD_SCRIPT.format(dataset_name=dataset_name)
+        ctx.record(f'model_load.cold[{dataset_name}]', [
+            float(subprocess.check_output([sys.executable, '-c', script], text=True).strip())
+            for _ in range(ctx.repeat)
+        ])
+
+        registry = ModelRegistry([dataset_name])
+        ctx.record(f'model_load.first_in_process[{dataset_name}]', measure(
+            lambda: ModelRegistry([dataset_name]).load(dataset_name), ctx.repeat, warmup=0))
+        registry.load(dataset_name)
+        # Ciepłe ładowanie - koszt jednego get_versioned (jak w każdym żądaniu predykcji)
+        calls = 1000
+        timings = measure(lambda: [registry.get_versioned(dataset_name) for _ in range(calls)], ctx.repeat)
+        ctx.record(f'model_load.warm[{dataset_name}]', [t / calls for t in timings])
+
+
+@benchmark('startup')
+def bench_startup(ctx):
+    reports = [startup_report() for _ in range(ctx.repeat)]
+    ctx.record('startup.import[wsgi]', [report['import_seconds'] for report in reports])
+    ctx.record('startup.ready[wsgi]', [report['ready_seconds'] for report in reports])
+
+
+@benchmark('predict')
+def bench_predict(ctx):
+    from registry import ModelRegistry
+    from scoring import score_models
+
+    module, client, _ = ctx.app()
+    for dataset_name in ctx.datasets:
+        schema = SCHEMAS[dataset_name]
+        models = ModelRegistry([dataset_name]).load(dataset_name)
+        rows = random_rows(dataset_name, 1000)
+        X = schema.encode(schema.rows_from_mappings(rows))
+
+        ctx.record(f'predict.score_single[{dataset_name}]', measure(
+            lambda: score_models(models, models['scaler'].transform(X[:1])), ctx.repeat * 20))
+        ctx.record(f'predict.score_batch[{dataset_name},rows=1000]', measure(
+            lambda: score_models(models, models['scaler'].transform(X)), ctx.repeat))
+
+        forms = iter([{name: str(value) for name, value in row.items()} for row in rows] * (ctx.repeat * 20 + 1))
+        ctx.record(f'predict.http_single[{dataset_name}]', measure(
+            lambda: client.post(f'/predict/{dataset_name}', data=next(forms)), ctx.repeat * 20))
+        payload = [{name: (value.item() if hasattr(value, 'item') else value) for name, value in row.items()}
+                   for row in rows[:100]]
+        ctx.record(f'predict.http_batch[{dataset_name},rows=100]', measure(
+            lambda: client.post(f'/api/predict/{dataset_name}/batch', json=payload), ctx.repeat))
+
+
+@benchmark('history')
+def bench_history(ctx):
+    module, client, user_id = ctx.app()
+    dataset_name = 'heart_disease'
+    features = module.Prediction.pack_features(np.zeros(SCHEMAS[dataset_name].n_features))
+    start_time = datetime(2024, 1, 1)
+
+    for rows in ctx.history_rows:
+        with module.app.app_context():
+            module.Prediction.query.delete()
+            module.db.session.commit()
+            for offset in range(0, rows, 50000):
+                module.db.session.bulk_insert_mappings(module.Prediction, [
+                    {'user_id': user_id, 'dataset': dataset_name, 'features': features,
+                     'timestamp': start_time + timedelta(seconds=i),
+                     'rf_prediction': 1, 'rf_probability': 0.5, 'lr_prediction': 1, 'lr_probability': 0.5,
+                     'dt_prediction': 1, 'dt_probability': 0.5}
+                    for i in range(offset, min(rows, offset + 50000))
+                ])
+                module.db.session.commit()
+            # Kursor strony w połowie historii
+            middle = module.Prediction.query.order_by(module.Prediction.id).offset(rows // 2).first()
+            cursor = module.encode_cursor(middle.timestamp, middle.id)
+
+        ctx.record(f'history.first_page[rows={rows}]', measure(
+            lambda: client.get(f'/history/{dataset_name}'), ctx.repeat * 10))
+        ctx.record(f'history.middle_page[rows={rows}]', measure(
+            lambda: client.get(f'/history/{dataset_name}', query_string={'cursor': cursor}), ctx.repeat * 10))
+
+
+def current_commit():
+    """Skrócony identyfikator bieżącego commita (z sufiksem -dirty przy niezatwierdzonych zmianach)"""
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short=12', 'HEAD'], text=True,
+                                         stderr=subprocess.DEVNULL).strip()
+        dirty = subprocess.call(['git', 'diff', '--quiet', 'HEAD'], stderr=subprocess.DEVNULL) != 0
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{commit}-dirty' if dirty else commit
+
+
+def save_results(ctx, commit, results_dir=RESULTS_DIR):
+    """Zapisuje metryki do <results_dir>/<commit>.json (dopisując do wyników wcześniejszych uruchomień)"""
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f'{commit}.json')
+    results = {'metrics': {}}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            results = json.load(f)
+    results.update({
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpu_count': os.cpu_count()}
+    })
+    results['metrics'].update(ctx.metrics)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    return path
+
+
+def load_baseline(baseline, results_dir=RESULTS_DIR):
+    """Metryki bazowe z pliku JSON lub z wyników zapisanych dla podanego commita"""
+    path = baseline
+    if not baseline.endswith('.json'):
+        commit = subprocess.check_output(['git', 'rev-parse', '--short=12', baseline], text=True).strip()
+        path = os.path.join(results_dir, f'{commit}.json')
+    if not os.path.exists(path):
+        raise SystemExit(f"Brak wyników bazowych: {path} (uruchom benchmarki na commicie {baseline})")
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['metrics']
+
+
+def find_regressions(metrics, baseline, threshold, noise_floor):
+    """
+    Metryki wolniejsze od bazowych o więcej niż threshold (ułamek). Różnice poniżej
+    noise_floor sekund są pomijane - dla bardzo krótkich operacji to szum pomiaru.
+    Zwraca listę (nazwa, bazowa, bieżąca, stosunek).
+    """
+    regressions = []
+    for name, values in sorted(metrics.items()):
+        if name not in baseline:
+            continue
+        old, new = baseline[name]['median'], values['median']
+        if new > old * (1 + threshold) and new - old > noise_floor:
+            regressions.append((name, old, new, new / old if old else float('inf')))
+    return regressions
+
+
+def parse_int_list(value):
+    return [int(item) for item in value.split(',') if item]
+
+
+def default_cores():
+    """Liczby rdzeni dla benchmarku trenowania: potęgi dwójki do liczby rdzeni maszyny"""
+    cpu_count = os.cpu_count() or 1
+    cores = [1]
+    while cores[-1] * 2 <= cpu_count:
+        cores.append(cores[-1] * 2)
+    return cores + ([cpu_count] if cores[-1] != cpu_count else [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarki wczytywania, trenowania, predykcji i historii")
+    parser.add_argument('--only', default=','.join(BENCHMARKS),
+                        help=f"Grupy benchmarków oddzielone przecinkami ({', '.join(BENCHMARKS)})")
+    parser.add_argument('--datasets', default=','.join(DATASETS_CONFIG), help="Zbiory danych")
+    parser.add_argument('--rows', type=parse_int_list, default=[10000],
+                        help="Liczby wierszy danych syntetycznych dla load/train (np. 10000,1000000,10000000)")
+    parser.add_argument('--history-rows', type=parse_int_list, default=[1000, 10000, 100000],
+                        help="Liczby predykcji w bazie dla benchmarku historii")
+    parser.add_argument('--cores', type=parse_int_list, default=default_cores(),
+                        help="Liczby rdzeni dla trenowania lasu losowego")
+    parser.add_argument('--repeat', type=int, default=3, help="Liczba powtórzeń (mediana)")
+    parser.add_argument('--baseline', help="Commit (np. HEAD~1) lub plik JSON z wynikami bazowymi")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Dopuszczalne spowolnienie względem wyników bazowych (0.2 = 20%%)")
+    parser.add_argument('--noise-floor', type=float, default=0.0005,
+                        help="Minimalna różnica w sekundach traktowana jako regresja")
+    parser.add_argument('--no-save', action='store_true', help="Nie zapisuj wyników")
+    args = parser.parse_args()
+    args.datasets = [name for name in args.datasets.split(',') if name]
+
+    groups = [name for name in args.only.split(',') if name]
+    unknown = set(groups) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Nieznane grupy benchmarków: {', '.join(sorted(unknown))}")
+
+    ctx = Context(args)
+    commit = current_commit()
+    print(f"Commit: {commit}, rdzenie: {os.cpu_count()}, powtórzenia: {args.repeat}")
+    for name in groups:
+        print(f"\n[{name}]")
+        BENCHMARKS[name](ctx)
+
+    if not args.no_save:
+        print(f"\nWyniki zapisano w {save_results(ctx, commit)}")
+
+    if args.baseline:
+        regressions = find_regressions(ctx.metrics, load_baseline(args.baseline), args.threshold, args.noise_floor)
+        if regressions:
+            print(f"\nRegresje względem {args.baseline} (próg {args.threshold:.0%}):")
+            for name, old, new, ratio in regressions:
+                print(f"  {name:<60} {old * 1000:>10.3f} -> {new * 1000:>10.3f} ms ({ratio:.2f}x)")
+            sys.exit(1)
+        print(f"\nBrak regresji względem {args.baseline} (próg {args.threshold:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Generator syntetycznych zbiorów danych o schemacie plików datasets/*.csv (te same kolumny,
+kodowanie i rozkłady), w rozmiarze od tysięcy do milionów wierszy. Wiersze losowane są
+ze zwracaniem z oryginalnego pliku i zapisywane porcjami, więc zużycie pamięci
+nie zależy od liczby wierszy. Uruchamianie z katalogu ML_app:
+
+    python benchmarks/synthetic.py heart_disease 1000000 [--output benchmarks/data/heart_disease-1000000.csv]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schema import DATASETS_CONFIG
+
+# Domyślny katalog wygenerowanych plików (nie jest wersjonowany)
+DATA_DIR = 'benchmarks/data'
+
+
+def generate(dataset_name, rows, path, seed=42, chunk_rows=1_000_000):
+    """Zapisuje do path plik CSV z rows wierszami o schemacie zbioru danych"""
+    config = DATASETS_CONFIG[dataset_name]
+    source = pd.read_csv(config['path'], encoding='utf-8-sig')
+    columns = [name for name, _ in config['features']] + [config['target']]
+    source = source[columns]
+    rng = np.random.default_rng(seed)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f'{path}.tmp'
+    written = 0
+    while written < rows:
+        n = min(chunk_rows, rows - written)
+        chunk = source.iloc[rng.integers(0, len(source), size=n)]
+        chunk.to_csv(temp_path, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+        written += n
+    os.replace(temp_path, path)
+    return path
+
+
+def ensure_dataset(dataset_name, rows, data_dir=DATA_DIR, seed=42):
+    """Ścieżka pliku syntetycznego - generowanego tylko wtedy, gdy jeszcze nie istnieje"""
+    path = os.path.join(data_dir, f'{dataset_name}-{rows}-{seed}.csv')
+    if not os.path.exists(path):
+        generate(dataset_name, rows, path, seed=seed)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generator syntetycznych zbiorów danych")
+    parser.add_argument('dataset', choices=list(DATASETS_CONFIG), help="Zbiór danych")
+    parser.add_argument('rows', type=int, help="Liczba wierszy")
+    parser.add_argument('--output', help="Plik wynikowy (domyślnie benchmarks/data/<zbiór>-<wiersze>-<ziarno>.csv)")
+    parser.add_argument('--seed', type=int, default=42, help="Ziarno losowania")
+    args = parser.parse_args()
+
+    path = args.output or os.path.join(DATA_DIR, f'{args.dataset}-{args.rows}-{args.seed}.csv')
+    generate(args.dataset, args.rows, path, seed=args.seed)
+    print(f"Zapisano {args.rows} wierszy do {path}")
+
+
+if __name__ == '__main__':
+    main()
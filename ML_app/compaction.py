@@ -0,0 +1,173 @@
+import io
+import time
+
+import joblib
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+
+from compiled import compile_model
+
+# Warianty zmniejszonych modeli drzewiastych - parametry nadpisujące parametry modelu bazowego.
+# Mniej drzew, ograniczenie głębokości i wielkości liści oraz przycinanie kosztowo-złożonościowe
+# (ccp_alpha); każdy wariant oceniany jest z liśćmi float64 i float32.
+COMPACTION_VARIANTS = {
+    'rf': [
+        {'n_estimators': 50},
+        {'n_estimators': 25},
+        {'max_depth': 10},
+        {'max_depth': 6},
+        {'min_samples_leaf': 3},
+        {'min_samples_leaf': 5},
+        {'ccp_alpha': 0.002},
+        {'ccp_alpha': 0.005},
+        {'n_estimators': 50, 'max_depth': 8, 'min_samples_leaf': 3},
+        {'n_estimators': 25, 'max_depth': 6, 'min_samples_leaf': 5},
+        {'n_estimators': 50, 'ccp_alpha': 0.005}
+    ],
+    'dt': [
+        {'max_depth': 8},
+        {'max_depth': 5},
+        {'max_depth': 3},
+        {'min_samples_leaf': 5},
+        {'min_samples_leaf': 10},
+        {'ccp_alpha': 0.005},
+        {'ccp_alpha': 0.01},
+        {'max_depth': 5, 'min_samples_leaf': 5}
+    ]
+}
+
+# Typy liści sprawdzane dla każdego wariantu
+LEAF_DTYPES = (np.float64, np.float32)
+# Liczba podzbiorów walidacji krzyżowej na zbiorze treningowym, na której wybierany jest wariant
+COMPACTION_FOLDS = 5
+
+
+def joblib_size(model):
+    """Rozmiar modelu sklearn zapisanego przez joblib bez kompresji (jak w save_models), w bajtach"""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer, compress=0)
+    return buffer.tell()
+
+
+def compiled_size(compiled):
+    """Pamięć zajmowana przez tablice modelu skompilowanego (mapowane przez procesy serwera), w bajtach"""
+    return sum(np.asarray(array).nbytes for array in compiled.arrays().values())
+
+
+def row_latency(compiled, X, repeat=200):
+    """Mediana czasu predykcji jednego wiersza modelem skompilowanym (sekundy)"""
+    row = X[:1]
+    compiled.predict_proba(row)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compiled.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def batch_row_latency(compiled, X, repeat=5):
+    """Mediana czasu predykcji całej macierzy X w przeliczeniu na jeden wiersz (sekundy)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compiled.predict_proba(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) / len(X)
+
+
+def compiled_accuracy(compiled, X, y):
+    """Dokładność modelu skompilowanego (uwzględnia ewentualny wpływ liści float32)"""
+    labels = compiled.classes_[np.argmax(compiled.predict_proba(X), axis=1)]
+    return float(np.mean(labels == np.asarray(y)))
+
+
+def cv_accuracy(model, X, y, folds=COMPACTION_FOLDS):
+    """
+    Dokładność walidacji krzyżowej modelu (kopii trenowanych na podzbiorach zbioru treningowego)
+    dla każdego typu liści z LEAF_DTYPES. Każdy wiersz zbioru treningowego oceniany jest raz,
+    więc rozdzielczość wyniku wynosi 1 / len(y).
+    """
+    y = np.asarray(y)
+    correct = {leaf_dtype: 0 for leaf_dtype in LEAF_DTYPES}
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    for train_index, test_index in splitter.split(X, y):
+        fold_model = clone(model).fit(X[train_index], y[train_index])
+        for leaf_dtype in LEAF_DTYPES:
+            compiled = compile_model(fold_model, leaf_dtype)
+            correct[leaf_dtype] += compiled_accuracy(compiled, X[test_index], y[test_index]) * len(test_index)
+    return {leaf_dtype: count / len(y) for leaf_dtype, count in correct.items()}
+
+
+def evaluate_variant(model, params, leaf_dtype, accuracy, X):
+    """Dokładność walidacji krzyżowej, rozmiar, pamięć i opóźnienie wariantu (mierzone na wierszach X)"""
+    compiled = compile_model(model, leaf_dtype)
+    return {
+        'params': params,
+        'leaf_dtype': np.dtype(leaf_dtype).name,
+        'cv_accuracy': accuracy,
+        'nodes': int(compiled.threshold.shape[0]),
+        'joblib_bytes': joblib_size(model),
+        'memory_bytes': compiled_size(compiled),
+        'row_latency': row_latency(compiled, X),
+        'batch_row_latency': batch_row_latency(compiled, X)
+    }
+
+
+def compact_model(base_model, variants, X_train, y_train, folds=COMPACTION_FOLDS):
+    """
+    Trenuje warianty modelu bazowego (kopie z nadpisanymi parametrami) i ocenia je razem z nim
+    walidacją krzyżową na zbiorze treningowym - zbiór testowy nie uczestniczy w wyborze wariantu.
+    Zwraca (lista wyników, słownik indeks wyniku -> wytrenowany model). Pierwsze wyniki
+    dotyczą modelu bazowego (params = {}).
+    """
+    X_train = np.asarray(X_train)
+    results = []
+    models = {}
+    for params in [{}] + list(variants):
+        if params:
+            model = clone(base_model).set_params(**params)
+            model.fit(X_train, y_train)
+        else:
+            model = base_model
+        accuracies = cv_accuracy(model, X_train, y_train, folds)
+        for leaf_dtype in LEAF_DTYPES:
+            models[len(results)] = model
+            results.append(evaluate_variant(model, params, leaf_dtype, accuracies[leaf_dtype], X_train))
+    return results, models
+
+
+def effective_tolerance(tolerance, n_samples):
+    """
+    Tolerancja spadku dokładności nie mniejsza niż jedna próbka walidacji krzyżowej - mniejsza
+    wartość oznaczałaby w praktyce brak choćby jednego dodatkowego błędu.
+    """
+    return max(tolerance, 1 / n_samples)
+
+
+def choose_variant(results, tolerance):
+    """
+    Indeks wariantu o najmniejszej pamięci (przy remisie - najszybszego), którego dokładność
+    walidacji krzyżowej jest nie niższa niż dokładność modelu bazowego pomniejszona o tolerance.
+    """
+    baseline = results[0]['cv_accuracy']
+    eligible = [index for index, result in enumerate(results) if result['cv_accuracy'] >= baseline - tolerance]
+    return min(eligible, key=lambda index: (results[index]['memory_bytes'], results[index]['row_latency']))
+
+
+def format_params(params):
+    return ', '.join(f'{name}={value}' for name, value in params.items()) or 'bazowy'
+
+
+def print_report(model_name, results, chosen):
+    """Tabela wariantów: dokładność CV, rozmiar joblib, pamięć tablic i opóźnienie predykcji"""
+    print(f"\n=== {model_name.upper()} ===")
+    print(f"  {'wariant':<50} {'liście':>7} {'dokł.CV':>7} {'węzły':>8} {'joblib':>10} "
+          f"{'pamięć':>10} {'1 wiersz':>10} {'partia/w.':>10}")
+    for index, result in enumerate(results):
+        marker = '*' if index == chosen else ' '
+        print(f"{marker} {format_params(result['params']):<50} {result['leaf_dtype']:>7} "
+              f"{result['cv_accuracy']:>7.4f} {result['nodes']:>8} {result['joblib_bytes'] / 1024:>8.0f}kB "
+              f"{result['memory_bytes'] / 1024:>8.0f}kB {result['row_latency'] * 1e6:>8.0f}us "
+              f"{result['batch_row_latency'] * 1e6:>8.2f}us")
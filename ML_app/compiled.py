@@ -0,0 +1,241 @@
+import json
+import os
+
+import numpy as np
+
+# Katalog (wewnątrz models/<zbiór_danych>) z modelami zapisanymi jako tablice NumPy
+COMPILED_DIR = 'compiled'
+# Plik opisujący zapisane tablice
+MANIFEST_FILE = 'compiled.json'
+
+# Oznaczenie liścia w tablicach dzieci (zgodne z sklearn.tree._tree.TREE_LEAF)
+TREE_LEAF = -1
+
+
+class CompiledScaler:
+    """
+    Standaryzacja danych na podstawie zapisanych średnich i odchyleń (odpowiednik StandardScaler.transform).
+    """
+    kind = 'scaler'
+
+    def __init__(self, mean, scale):
+        self.mean = mean
+        self.scale = scale
+
+    @property
+    def n_features_in_(self):
+        return self.mean.shape[0]
+
+    def arrays(self):
+        return {'mean': self.mean, 'scale': self.scale}
+
+    def transform(self, X):
+        X = check_input(X, self.n_features_in_, np.float64)
+        return (X - self.mean) / self.scale
+
+
+class CompiledLinear:
+    """
+    Binarna regresja logistyczna zapisana jako wektor współczynników i wyraz wolny.
+    """
+    kind = 'linear'
+
+    def __init__(self, coef, intercept, classes):
+        self.coef = coef
+        self.intercept = intercept
+        self.classes_ = classes
+
+    @property
+    def n_features_in_(self):
+        return self.coef.shape[0]
+
+    def arrays(self):
+        return {'coef': self.coef, 'intercept': self.intercept, 'classes': self.classes_}
+
+    def predict_proba(self, X):
+        X = check_input(X, self.n_features_in_, np.float64)
+        decision = X @ self.coef + self.intercept[0]
+        positive = 1.0 / (1.0 + np.exp(-decision))
+        return np.column_stack([1.0 - positive, positive])
+
+
+class CompiledTreeEnsemble:
+    """
+    Las losowy lub pojedyncze drzewo decyzyjne zapisane jako płaskie tablice węzłów.
+    Węzły wszystkich drzew leżą w jednej tablicy, roots wskazuje korzeń każdego drzewa.
+    Ewaluacja przechodzi wszystkie drzewa i wiersze jednocześnie - jedna iteracja
+    pętli odpowiada jednemu poziomowi głębokości drzew.
+    """
+    kind = 'trees'
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, n_features=None):
+        self.feature = feature        # Indeks cechy w węźle (0 dla liści)
+        self.threshold = threshold    # Próg podziału
+        self.left = left              # Lewe dziecko (TREE_LEAF dla liści)
+        self.right = right            # Prawe dziecko
+        self.value = value            # Rozkład klas w węźle (znormalizowany)
+        self.roots = roots            # Indeksy korzeni kolejnych drzew
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+
+    def arrays(self):
+        return {
+            'feature': self.feature, 'threshold': self.threshold, 'left': self.left,
+            'right': self.right, 'value': self.value, 'roots': self.roots, 'classes': self.classes_
+        }
+
+    def apply(self, X):
+        """Zwraca indeksy liści (drzewa x wiersze), do których trafia każdy wiersz"""
+        # sklearn porównuje cechy w precyzji float32 - rzutowanie zapewnia identyczne ścieżki w drzewach
+        X = check_input(X, self.n_features_in_, np.float32)
+        n_rows = X.shape[0]
+
+        # Para (drzewo, wiersz) spłaszczona do jednego wymiaru; przetwarzane są tylko
+        # ścieżki, które nie dotarły jeszcze do liścia
+        node = np.repeat(self.roots, n_rows)
+        row = np.tile(np.arange(n_rows), len(self.roots))
+        active = np.flatnonzero(self.left[node] != TREE_LEAF)
+
+        while active.size:
+            current = node[active]
+            go_left = X[row[active], self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            node[active] = current
+            active = active[self.left[current] != TREE_LEAF]
+
+        return node.reshape(len(self.roots), n_rows)
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        # Sumowanie w float64 także dla liści zapisanych jako float32 (zob. compile_trees)
+        return self.value[leaves].sum(axis=0, dtype=np.float64) / len(self.roots)
+
+
+COMPILED_KINDS = {cls.kind: cls for cls in (CompiledScaler, CompiledLinear, CompiledTreeEnsemble)}
+
+
+def check_input(X, n_features, dtype):
+    """Zamienia dane wejściowe na dwuwymiarową tablicę i sprawdza liczbę cech"""
+    X = np.asarray(X, dtype=dtype)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    if n_features is not None and X.shape[1] != n_features:
+        raise ValueError(f"Nieprawidłowa liczba cech. Oczekiwano {n_features}, otrzymano {X.shape[1]}")
+    return X
+
+
+def compile_trees(estimators, classes, n_features, leaf_dtype=np.float64):
+    """
+    Spłaszcza listę drzew sklearn do jednego zestawu tablic.
+    leaf_dtype=np.float32 zmniejsza o połowę tablicę rozkładów klas (16 z 36 bajtów
+    na węzeł przy dwóch klasach) kosztem błędu prawdopodobieństw rzędu 1e-7.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+
+    for estimator in estimators:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == TREE_LEAF
+
+        # Rozkład klas w węźle normalizowany tak samo jak w DecisionTreeClassifier.predict_proba
+        value = tree.value[:, 0, :].astype(np.float64)
+        normalizer = value.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(np.where(is_leaf, TREE_LEAF, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, TREE_LEAF, tree.children_right + offset).astype(np.int32))
+        values.append(value / normalizer)
+        roots.append(offset)
+        offset += tree.node_count
+
+    return CompiledTreeEnsemble(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        value=np.concatenate(values).astype(leaf_dtype),
+        roots=np.array(roots, dtype=np.int32),
+        classes=np.asarray(classes),
+        n_features=n_features
+    )
+
+
+def compile_model(model, leaf_dtype=np.float64):
+    """
+    Zamienia wytrenowany model sklearn na odpowiednik oparty wyłącznie na tablicach NumPy.
+    Obsługiwane: RandomForestClassifier, DecisionTreeClassifier, binarna LogisticRegression, StandardScaler.
+    leaf_dtype dotyczy tylko drzew (typ tablicy rozkładów klas w węzłach).
+    """
+    if hasattr(model, 'estimators_'):
+        return compile_trees(model.estimators_, model.classes_, model.n_features_in_, leaf_dtype)
+    if hasattr(model, 'tree_'):
+        return compile_trees([model], model.classes_, model.n_features_in_, leaf_dtype)
+    if hasattr(model, 'coef_'):
+        if model.coef_.shape[0] != 1:
+            raise ValueError("Obsługiwana jest tylko binarna regresja logistyczna")
+        return CompiledLinear(
+            coef=model.coef_[0].astype(np.float64),
+            intercept=np.asarray(model.intercept_, dtype=np.float64),
+            classes=np.asarray(model.classes_)
+        )
+    if hasattr(model, 'scale_'):
+        n_features = model.n_features_in_
+        mean = model.mean_ if model.mean_ is not None else np.zeros(n_features)
+        scale = model.scale_ if model.scale_ is not None else np.ones(n_features)
+        return CompiledScaler(mean=np.asarray(mean, dtype=np.float64), scale=np.asarray(scale, dtype=np.float64))
+    raise ValueError(f"Nieobsługiwany typ modelu: {type(model).__name__}")
+
+
+def save_compiled(models, directory, leaf_dtypes=None):
+    """
+    Zapisuje modele (słownik klucz -> model sklearn) jako pliki .npy w podanym katalogu.
+    Pliki .npy można mapować do pamięci, więc procesy robocze współdzielą jedną kopię.
+    leaf_dtypes: opcjonalny słownik klucz -> typ liści drzew (domyślnie float64).
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = {}
+    leaf_dtypes = leaf_dtypes or {}
+
+    for key, model in models.items():
+        compiled = compile_model(model, leaf_dtypes.get(key, np.float64))
+        names = []
+        for name, array in compiled.arrays().items():
+            np.save(f'{directory}/{key}.{name}.npy', np.ascontiguousarray(array))
+            names.append(name)
+        manifest[key] = {'kind': compiled.kind, 'arrays': names, 'n_features': int(compiled.n_features_in_)}
+        if compiled.kind == CompiledTreeEnsemble.kind:
+            manifest[key]['leaf_dtype'] = compiled.value.dtype.name
+
+    with open(f'{directory}/{MANIFEST_FILE}', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_compiled(directory, mmap_mode='r'):
+    """Wczytuje modele zapisane przez save_compiled (tablice mapowane tylko do odczytu)"""
+    with open(f'{directory}/{MANIFEST_FILE}') as f:
+        manifest = json.load(f)
+
+    models = {}
+    for key, entry in manifest.items():
+        arrays = {name: np.load(f'{directory}/{key}.{name}.npy', mmap_mode=mmap_mode) for name in entry['arrays']}
+        if entry['kind'] == CompiledTreeEnsemble.kind:
+            arrays['n_features'] = entry['n_features']
+        models[key] = COMPILED_KINDS[entry['kind']](**arrays)
+    return models
+
+
+def compiled_leaf_dtypes(models_dir):
+    """Typy liści drzew zapisane w wersji skompilowanej (pusty słownik, gdy jej brak)"""
+    if not has_compiled(models_dir):
+        return {}
+    with open(f'{models_dir}/{COMPILED_DIR}/{MANIFEST_FILE}') as f:
+        manifest = json.load(f)
+    return {key: np.dtype(entry['leaf_dtype']).type for key, entry in manifest.items() if 'leaf_dtype' in entry}
+
+
+def has_compiled(models_dir):
+    """Czy w katalogu modeli istnieje wersja skompilowana"""
+    return os.path.exists(f'{models_dir}/{COMPILED_DIR}/{MANIFEST_FILE}')
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import joblib
+import numpy as np
+
+# Domyślny katalog pamięci podręcznej przetworzonych zbiorów danych
+CACHE_ROOT = 'cache/datasets'
+# Tablice zapisywane dla każdego zbioru danych
+ARRAY_NAMES = ('X_train', 'X_test', 'y_train', 'y_test')
+
+
+def file_hash(path, block_size=1 << 20):
+    """Skrót SHA-256 zawartości pliku liczony blokami"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """
+    Pamięć podręczna przetworzonych zbiorów danych (podziały treningowy/testowy po
+    standaryzacji oraz dopasowany skaler). Tablice zapisywane są jako pliki .npy
+    i wczytywane z mapowaniem pamięci, więc ponowne użycie jest niemal natychmiastowe.
+    Klucz obejmuje skrót pliku CSV, wpis konfiguracji zbioru danych i opcje przetwarzania,
+    więc zmiana danych lub konfiguracji automatycznie prowadzi do ponownego przetworzenia.
+    """
+
+    def __init__(self, root=CACHE_ROOT):
+        self.root = root
+
+    def key(self, config, **options):
+        """Wyznacza klucz dla wpisu konfiguracji zbioru danych i opcji przetwarzania"""
+        payload = json.dumps({
+            'source': file_hash(config['path']),
+            'config': config,
+            'options': options
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path(self, dataset_name, key):
+        return f'{self.root}/{dataset_name}-{key[:16]}'
+
+    def load(self, dataset_name, key, mmap_mode='r'):
+        """Zwraca (tablice, skaler, metadane) lub None, jeśli wpisu nie ma w pamięci podręcznej"""
+        directory = self.path(dataset_name, key)
+        if not os.path.exists(f'{directory}/meta.json'):
+            return None
+
+        with open(f'{directory}/meta.json') as f:
+            meta = json.load(f)
+        if meta.get('key') != key:
+            return None
+
+        arrays = {name: np.load(f'{directory}/{name}.npy', mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        scaler = joblib.load(f'{directory}/scaler.joblib')
+        return arrays, scaler, meta
+
+    def store(self, dataset_name, key, arrays, scaler, meta=None):
+        """
+        Zapisuje przetworzony zbiór danych. Zapis odbywa się do katalogu tymczasowego,
+        który po zakończeniu jest przemianowywany - przerwany zapis nie tworzy uszkodzonego wpisu.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        directory = self.path(dataset_name, key)
+        temp_dir = tempfile.mkdtemp(prefix=f'.{dataset_name}-', dir=self.root)
+
+        try:
+            for name in ARRAY_NAMES:
+                np.save(f'{temp_dir}/{name}.npy', np.ascontiguousarray(arrays[name]))
+            joblib.dump(scaler, f'{temp_dir}/scaler.joblib', compress=0)
+            with open(f'{temp_dir}/meta.json', 'w') as f:
+                json.dump({**(meta or {}), 'dataset': dataset_name, 'key': key}, f, indent=2)
+
+            if os.path.exists(directory):
+                shutil.rmtree(directory)
+            os.rename(temp_dir, directory)
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        return directory
@@ -1,68 +1,63 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+import atexit
+import csv
+import io
+import os
+import time
+from datetime import datetime
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, g, Response
 from flask_login import LoginManager, login_required, current_user
-import joblib
-from models import db, User, HeartDiseasePrediction, DiabetesPrediction, LungCancerPrediction
+import numpy as np
+from models import db, User, Prediction, PredictionOutcome
 from auth import auth
-
-# Konfiguracja dla różnych zbiorów danych - definiuje cechy i ich opisy dla każdego typu predykcji
-DATASETS_CONFIG = {
-    'heart_disease': {
-        'features': [
-            ('sex', 'Płeć pacjenta (0 = kobieta, 1 = mężczyzna)'),
-            ('age', 'Wiek pacjenta'),
-            ('cp', 'Typ bólu w klatce piersiowej'),
-            ('trestbps', 'Ciśnienie tętnicze krwi w spoczynku'),
-            ('chol', 'Poziom cholesterolu'),
-            ('fbs', 'Cukier we krwi na czczo'),
-            ('restecg', 'Wyniki EKG spoczynkowego'),
-            ('thalachh', 'Maksymalne tętno'),
-            ('exng', 'Dławica wysiłkowa'),
-            ('oldpeak', 'Obniżenie odcinka ST'),
-            ('slp', 'Nachylenie odcinka ST'),
-            ('caa', 'Liczba głównych naczyń wieńcowych'),
-            ('thall', 'Wynik testu Thallium')
-        ]
-    },
-    'diabetes': {
-        'features': [
-            ('Pregnancies', 'Liczba ciąż'),
-            ('Glucose', 'Poziom glukozy'),
-            ('BloodPressure', 'Ciśnienie krwi'),
-            ('SkinThickness', 'Grubość fałdu skórnego'),
-            ('Insulin', 'Poziom insuliny'),
-            ('BMI', 'Wskaźnik masy ciała'),
-            ('DiabetesPedigreeFunction', 'Funkcja rodowodu cukrzycy'),
-            ('Age', 'Wiek')
-        ]
-    },
-    'lung_cancer': {
-        'features': [
-            ('GENDER', 'Płeć (M/F)'),
-            ('AGE', 'Wiek'),
-            ('SMOKING', 'Palenie tytoniu (1-2)'),
-            ('YELLOW_FINGERS', 'Żółte palce (1-2)'),
-            ('ANXIETY', 'Niepokój (1-2)'),
-            ('PEER_PRESSURE', 'Presja rówieśników (1-2)'),
-            ('CHRONIC DISEASE', 'Choroba przewlekła (1-2)'),
-            ('FATIGUE', 'Zmęczenie (1-2)'),
-            ('ALLERGY', 'Alergia (1-2)'),
-            ('WHEEZING', 'Świszczący oddech (1-2)'),
-            ('ALCOHOL CONSUMING', 'Spożywanie alkoholu (1-2)'),
-            ('COUGHING', 'Kaszel (1-2)'),
-            ('SHORTNESS OF BREATH', 'Duszność (1-2)'),
-            ('SWALLOWING DIFFICULTY', 'Trudności w połykaniu (1-2)'),
-            ('CHEST PAIN', 'Ból w klatce piersiowej (1-2)')
-        ]
-    }
-}
+from scoring import MODEL_LABELS, score_models, format_predictions
+from registry import ModelRegistry
+from persistence import PredictionWriter
+from db_config import configure_database
+from prediction_cache import PredictionCache, score_cached
+from user_cache import UserCache
+from inference_pool import InferencePool, InferencePoolBusy
+from batching import MicroBatcher
+from metrics import MetricsRegistry, CONTENT_TYPE
+from schema import DATASETS_CONFIG, SCHEMAS
+from migrate_predictions import add_missing_columns, upgrade_feature_layouts, widen_columns
+
+# Progi decyzyjne dla poszczególnych modeli (brak wpisu = klasa o najwyższym prawdopodobieństwie)
+MODEL_THRESHOLDS = {}
+
+# Maksymalna liczba wierszy w jednym żądaniu wsadowym
+MAX_BATCH_ROWS = 10000
+# Liczba predykcji wyświetlanych na jednej stronie historii
+HISTORY_PAGE_SIZE = 50
 
 # Inicjalizacja i konfiguracja aplikacji Flask
 app = Flask(__name__)
 app.config['SECRET_KEY'] = '1234'
 
-# Inicjalizacja bazy danych z użyciem skonfigurowanej aplikacji
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///predictions.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Konfiguracja bazy danych - adres ze zmiennej DATABASE_URL, ustawienia SQLite i puli połączeń (db_config.py)
+configure_database(app)
+
+# Zapis predykcji w tle (write-behind) - włączany zmienną środowiskową PREDICTION_WRITE_BEHIND=1
+app.config['PREDICTION_WRITE_BEHIND'] = os.environ.get('PREDICTION_WRITE_BEHIND') == '1'
+app.config['PREDICTION_WRITE_MAX_BATCH'] = int(os.environ.get('PREDICTION_WRITE_MAX_BATCH', 500))
+app.config['PREDICTION_WRITE_MAX_DELAY'] = float(os.environ.get('PREDICTION_WRITE_MAX_DELAY', 0.05))
+
+# Pamięć podręczna wyników modeli - liczba wpisów (0 wyłącza) i czas życia wpisu w sekundach
+app.config['PREDICTION_CACHE_SIZE'] = int(os.environ.get('PREDICTION_CACHE_SIZE', 10000))
+app.config['PREDICTION_CACHE_TTL'] = float(os.environ['PREDICTION_CACHE_TTL']) if 'PREDICTION_CACHE_TTL' in os.environ else None
+
+# Pamięć podręczna użytkowników dla load_user - czas życia wpisu w sekundach (0 wyłącza)
+app.config['USER_CACHE_TTL'] = float(os.environ.get('USER_CACHE_TTL', 300))
+
+# Pula procesów wykonujących predykcje - liczba procesów (0 = predykcje w procesie serwera),
+# limit zadań przyjętych jednocześnie i maksymalny czas oczekiwania na miejsce w kolejce
+app.config['INFERENCE_WORKERS'] = int(os.environ.get('INFERENCE_WORKERS', 0))
+app.config['INFERENCE_MAX_PENDING'] = int(os.environ.get('INFERENCE_MAX_PENDING', 64))
+app.config['INFERENCE_QUEUE_TIMEOUT'] = float(os.environ.get('INFERENCE_QUEUE_TIMEOUT', 1.0))
+
+# Grupowanie równoczesnych predykcji z formularza - maksymalny czas oczekiwania na kolejne
+# wiersze w milisekundach (0 wyłącza grupowanie) i maksymalny rozmiar partii
+app.config['MICROBATCH_MAX_WAIT_MS'] = float(os.environ.get('MICROBATCH_MAX_WAIT_MS', 0))
+app.config['MICROBATCH_MAX_ROWS'] = int(os.environ.get('MICROBATCH_MAX_ROWS', 64))
 
 # Inicjalizacja bazy danych z użyciem skonfigurowanej aplikacji
 db.init_app(app)
@@ -76,47 +71,313 @@ login_manager.login_message = 'Proszę się zalogować.' # Komunikat dla niezalo
 # Rejestracja blueprintu autoryzacji (mechanizm Flaska służący do organizacji funkcjonalności związanych z uwierzytelnianiem użytkowników)
 app.register_blueprint(auth)
 
+# Pamięć podręczna użytkowników - wpis usuwany po zmianie lub usunięciu użytkownika
+user_cache = None
+if app.config['USER_CACHE_TTL'] > 0:
+    user_cache = UserCache(ttl=app.config['USER_CACHE_TTL'])
+    user_cache.watch(User)
+
 # Funkcja pomocnicza dla Flask-Login, ładująca użytkownika na podstawie ID
 @login_manager.user_loader
 def load_user(id):
-    return User.query.get(int(id)) # Pobranie użytkownika z bazy danych po ID
+    if user_cache is None:
+        return User.query.get(int(id)) # Pobranie użytkownika z bazy danych po ID
+
+    user = user_cache.get(int(id))
+    if user is None:
+        user = User.query.get(int(id))
+        if user is not None:
+            user = user_cache.put(user)
+    return user
 
 # Tworzenie wszystkich tabel w bazie danych
 with app.app_context():
     db.create_all()
-
-# Słownik przechowujący załadowane modele ML
-loaded_models = {}
+    add_missing_columns(db.engine)
+    widen_columns(db.engine)
+    # Przestawienie wektorów cech zapisanych przed wprowadzeniem wspólnego schematu (jednorazowo)
+    upgrade_feature_layouts(db.engine)
+
+# Rejestr modeli ML - modele wszystkich zbiorów danych ładowane są w tle przy starcie aplikacji,
+# a nowe wersje z magazynu modeli (model_store.py) przeładowywane w tle bez restartu serwera
+model_registry = ModelRegistry(DATASETS_CONFIG.keys())
+model_registry.start_preload(parallel=True)
+model_registry.start_watcher()
+
+# Pamięć podręczna wyników modeli; wpisy zbioru danych usuwane są po przeładowaniu jego modeli
+prediction_cache = None
+if app.config['PREDICTION_CACHE_SIZE'] > 0:
+    prediction_cache = PredictionCache(app.config['PREDICTION_CACHE_SIZE'], app.config['PREDICTION_CACHE_TTL'])
+    model_registry.on_reload(prediction_cache.invalidate)
+
+# Pula procesów predykcji. Procesy robocze uruchamiane są przed przyjęciem pierwszego żądania:
+# w gunicorn przez hak post_worker_init (gunicorn.conf.py), w serwerze deweloperskim poniżej.
+# Przy imporcie modułu nie są uruchamiane, bo procesy puli (spawn) importują moduł główny ponownie.
+inference_pool = None
+if app.config['INFERENCE_WORKERS'] > 0:
+    inference_pool = InferencePool(
+        DATASETS_CONFIG.keys(),
+        workers=app.config['INFERENCE_WORKERS'],
+        max_pending=app.config['INFERENCE_MAX_PENDING'],
+        queue_timeout=app.config['INFERENCE_QUEUE_TIMEOUT']
+    )
+    atexit.register(inference_pool.shutdown)
+
+# Grupowanie jednowierszowych predykcji w partie (score_raw_batch wywoływane raz na partię)
+micro_batcher = None
+if app.config['MICROBATCH_MAX_WAIT_MS'] > 0:
+    micro_batcher = MicroBatcher(
+        lambda dataset_name, input_matrix: score_raw_batch(dataset_name, input_matrix),
+        max_wait_ms=app.config['MICROBATCH_MAX_WAIT_MS'],
+        max_rows=app.config['MICROBATCH_MAX_ROWS']
+    )
+    atexit.register(micro_batcher.stop)
+
+# Kolejka zapisu predykcji (None = zapis synchroniczny w trakcie obsługi żądania)
+prediction_writer = None
+if app.config['PREDICTION_WRITE_BEHIND']:
+    prediction_writer = PredictionWriter(
+        app, Prediction,
+        max_batch=app.config['PREDICTION_WRITE_MAX_BATCH'],
+        max_delay=app.config['PREDICTION_WRITE_MAX_DELAY']
+    ).start()
+    # Zapisanie predykcji pozostałych w kolejce przy zamykaniu procesu
+    atexit.register(prediction_writer.stop)
+
+# Metryki eksportowane przez /metrics (format tekstowy Prometheusa)
+metrics_registry = MetricsRegistry()
+REQUEST_SECONDS = metrics_registry.histogram(
+    'ml_http_request_seconds', 'Czas obsługi żądań HTTP', ('endpoint', 'method', 'status'))
+STAGE_SECONDS = metrics_registry.histogram(
+    'ml_predict_stage_seconds', 'Czas etapów predykcji (parse, scale, score, inference, persist, render)',
+    ('dataset', 'stage'))
+MODEL_SECONDS = metrics_registry.histogram(
+    'ml_model_predict_seconds', 'Czas predict_proba pojedynczego modelu', ('dataset', 'model'))
+
+def _model_metrics(key):
+    def collect():
+        return [({'dataset': dataset_name}, status.get(key))
+                for dataset_name, status in model_registry.status().items()]
+    return collect
+
+metrics_registry.callback('ml_model_load_seconds', 'Czas ostatniego ładowania modeli zbioru danych',
+                          ('dataset',), _model_metrics('load_time'))
+metrics_registry.callback('ml_model_ready', 'Czy modele zbioru danych są załadowane (1/0)', ('dataset',),
+                          lambda: [({'dataset': dataset_name}, int(status['state'] == 'ready'))
+                                   for dataset_name, status in model_registry.status().items()])
+
+def _stats_metrics(component, key):
+    # Liczniki komponentu odczytywane z jego stats() w chwili eksportu
+    return lambda: [({}, component.stats()[key])] if component is not None else []
+
+for key in ('hits', 'misses', 'evictions'):
+    metrics_registry.callback(f'ml_prediction_cache_{key}_total', f'Pamięć podręczna wyników - {key}', (),
+                              _stats_metrics(prediction_cache, key), kind='counter')
+metrics_registry.callback('ml_prediction_cache_entries', 'Liczba wpisów w pamięci podręcznej wyników', (),
+                          _stats_metrics(prediction_cache, 'entries'))
+for key in ('hits', 'misses'):
+    metrics_registry.callback(f'ml_user_cache_{key}_total', f'Pamięć podręczna użytkowników - {key}', (),
+                              _stats_metrics(user_cache, key), kind='counter')
+for key in ('written', 'failed', 'batches'):
+    metrics_registry.callback(f'ml_db_predictions_{key}_total', f'Zapis predykcji w tle - {key}', (),
+                              _stats_metrics(prediction_writer, key), kind='counter')
+metrics_registry.callback('ml_db_predictions_pending', 'Predykcje oczekujące na zapis', (),
+                          _stats_metrics(prediction_writer, 'pending'))
+metrics_registry.callback('ml_inference_rejected_total', 'Predykcje odrzucone przy pełnej kolejce puli', (),
+                          _stats_metrics(inference_pool, 'rejected'), kind='counter')
+for key in ('batches', 'rows'):
+    metrics_registry.callback(f'ml_microbatch_{key}_total', f'Grupowanie predykcji - {key}', (),
+                              _stats_metrics(micro_batcher, key), kind='counter')
+
+def _db_pool_metrics():
+    with app.app_context():
+        pool = db.engine.pool
+    checkedout = getattr(pool, 'checkedout', None)
+    return [({}, checkedout())] if checkedout is not None else []
+
+metrics_registry.callback('ml_db_pool_checked_out', 'Połączenia z bazą danych pobrane z puli', (),
+                          _db_pool_metrics)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=request.endpoint or 'unknown',
+                                method=request.method, status=response.status_code)
+    return response
 
 def load_models(dataset_name):
     """
-    Ładuje modele uczenia maszynowego dla wybranego zbioru danych.
-    Modele są ładowane tylko raz i przechowywane w pamięci.
+    Zwraca modele uczenia maszynowego dla wybranego zbioru danych oraz ich wersję.
+    Jeśli ładowanie w tle jeszcze trwa, czeka na jego zakończenie.
     """
-    if dataset_name not in loaded_models:
-        models_dir = f'models/{dataset_name}'
-        loaded_models[dataset_name] = {
-            'rf': joblib.load(f'{models_dir}/rf_model.joblib'), # Random Forest
-            'lr': joblib.load(f'{models_dir}/lr_model.joblib'), # Logistic Regression
-            'dt': joblib.load(f'{models_dir}/dt_model.joblib'), # Decision Tree
-            'scaler': joblib.load(f'{models_dir}/scaler.joblib') # Standaryzator danych
-        }
+    return model_registry.get_versioned(dataset_name)
+
+def run_models(dataset_name, models, version, input_scaled):
+    """
+    Wykonuje predykcje wszystkimi modelami; powtarzające się wiersze danych
+    obsługiwane są z pamięci podręcznej wyników.
+    """
+    def observe(model_key, seconds):
+        MODEL_SECONDS.observe(seconds, dataset=dataset_name, model=model_key)
+
+    def score(models, input_scaled):
+        with STAGE_SECONDS.time(dataset=dataset_name, stage='score'):
+            if inference_pool is not None:
+                return inference_pool.score(dataset_name, version, input_scaled, MODEL_THRESHOLDS)
+            return score_models(models, input_scaled, MODEL_THRESHOLDS, observe=observe)
+
+    if prediction_cache is None:
+        return score(models, input_scaled)
+    return score_cached(prediction_cache, dataset_name, version, models, input_scaled, score)
+
+def score_raw_batch(dataset_name, input_matrix):
+    """
+    Skalowanie i predykcja wszystkimi modelami dla macierzy surowych danych (wiersze x cechy).
+    Zwraca (wyniki modeli, wersja modeli) - wersja zapisywana jest razem z predykcjami.
+    """
+    models, version = load_models(dataset_name)
+    with STAGE_SECONDS.time(dataset=dataset_name, stage='scale'):
+        input_scaled = models['scaler'].transform(input_matrix)
+    return run_models(dataset_name, models, version, input_scaled), version
 
 def prepare_input_data(dataset_name, form_data):
     """
     Przygotowuje dane wejściowe do formatu akceptowanego przez modele.
-    Konwertuje dane z formularza na odpowiedni format numeryczny.
+    Zwraca macierz float64 (1 x cechy) w kolejności schematu, na którym trenowano modele.
     """
-    features = DATASETS_CONFIG[dataset_name]['features']
-    input_data = []
+    return SCHEMAS[dataset_name].encode_mapping(form_data)
 
-    for feature_name, _ in features:
-        value = form_data[feature_name]
-        if dataset_name == 'lung_cancer' and feature_name == 'GENDER':
-            value = 1 if value.upper() == 'M' else 0
-        input_data.append(float(value))
+def parse_batch_rows(dataset_name, req):
+    """
+    Odczytuje wiersze z żądania wsadowego (tablica JSON lub CSV z nagłówkiem).
+    Zwraca listę wierszy z surowymi wartościami w kolejności cech zbioru danych.
+    """
+    schema = SCHEMAS[dataset_name]
+
+    if req.is_json:
+        payload = req.get_json()
+        # Dopuszczalna jest sama tablica lub obiekt {"rows": [...]}
+        if isinstance(payload, dict):
+            payload = payload.get('rows')
+        if not isinstance(payload, list):
+            raise ValueError("Oczekiwano tablicy JSON z wierszami danych")
+
+        rows = []
+        for index, item in enumerate(payload):
+            if isinstance(item, dict):
+                missing = [name for name in schema.feature_names if name not in item]
+                if missing:
+                    raise ValueError(f"Wiersz {index}: brakujące cechy {missing}")
+                row = [item[name] for name in schema.feature_names]
+            elif isinstance(item, list):
+                if len(item) != schema.n_features:
+                    raise ValueError(f"Wiersz {index}: oczekiwano {schema.n_features} wartości cech, "
+                                     f"otrzymano {len(item)}")
+                row = item
+            else:
+                raise ValueError(f"Wiersz {index}: oczekiwano obiektu z nazwami cech lub tablicy wartości")
+            # JSON true/false nie jest wartością cechy (bool przeszedłby konwersję na liczbę)
+            for name, value in zip(schema.feature_names, row):
+                if isinstance(value, bool):
+                    raise ValueError(f"Wiersz {index}: nieprawidłowa wartość cechy {name}: {str(value).lower()}")
+            rows.append(row)
+        return rows
+
+    # Dane CSV - pierwszy wiersz zawiera nazwy cech
+    reader = csv.DictReader(io.StringIO(req.get_data(as_text=True)))
+    missing = [name for name in schema.feature_names if name not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Brakujące kolumny w danych CSV: {missing}")
+    return schema.rows_from_mappings(reader)
+
+def build_input_matrix(dataset_name, rows):
+    """
+    Buduje macierz float64 (wiersze x cechy) z surowych wierszy żądania wsadowego.
+    Walidacja i kodowanie kolumn tekstowych wykonywane są wektorowo według schematu cech.
+    """
+    return SCHEMAS[dataset_name].encode(rows)
+
+def build_prediction_row(dataset_name, input_row, model_results, model_version, row=0):
+    """
+    Tworzy słownik kolumn tabeli Prediction dla jednego wiersza danych wejściowych
+    i wyników wszystkich modeli (format zwracany przez score_models).
+    """
+    mapping = {
+        'user_id': current_user.id,
+        'dataset': dataset_name,
+        'timestamp': datetime.utcnow(),
+        'features': Prediction.pack_features(input_row),
+        'model_version': model_version
+    }
+    for model_key, (labels, probabilities) in model_results.items():
+        mapping[f'{model_key}_prediction'] = int(labels[row])
+        mapping[f'{model_key}_probability'] = float(probabilities[row])
+    return mapping
 
-    return input_data
+@app.template_filter('feature_value')
+def format_feature_value(value, feature_name, dataset_name):
+    """
+    Formatuje wartość cechy do wyświetlenia w historii predykcji.
+    """
+    if feature_name in ('sex', 'GENDER'):
+        return 'Mężczyzna' if value == 1 else 'Kobieta'
+    if dataset_name == 'lung_cancer' and feature_name != 'AGE':
+        return 'Tak' if value == 2 else 'Nie'
+    return int(value) if float(value).is_integer() else value
+
+def encode_cursor(timestamp, prediction_id):
+    """Kursor strony historii - (timestamp, id) ostatniej wyświetlonej predykcji"""
+    return f'{timestamp.isoformat()}_{prediction_id}'
+
+def decode_cursor(cursor):
+    """Odczytuje kursor zapisany przez encode_cursor"""
+    timestamp, _, prediction_id = cursor.rpartition('_')
+    return datetime.fromisoformat(timestamp), int(prediction_id)
+
+def fetch_history_page(dataset_name, cursor=None, limit=HISTORY_PAGE_SIZE):
+    """
+    Pobiera jedną stronę historii predykcji użytkownika (stronicowanie kluczem (timestamp, id)).
+    Zapytanie korzysta z indeksu (user_id, dataset, timestamp, id) i nie odczytuje
+    pominiętych wierszy, więc koszt kolejnych stron nie rośnie z liczbą predykcji.
+    Zwraca (wiersze, kursor następnej strony lub None).
+    """
+    query = Prediction.query.filter_by(user_id=current_user.id, dataset=dataset_name)
+    if cursor is not None:
+        timestamp, prediction_id = decode_cursor(cursor)
+        query = query.filter(db.or_(
+            Prediction.timestamp < timestamp,
+            db.and_(Prediction.timestamp == timestamp, Prediction.id < prediction_id)
+        ))
+
+    # Tylko kolumny potrzebne w tabeli historii; szczegóły pobierane są osobno (predictions_detail)
+    rows = query.with_entities(
+        Prediction.id, Prediction.timestamp, Prediction.features,
+        Prediction.rf_prediction, Prediction.rf_probability,
+        Prediction.lr_prediction, Prediction.lr_probability,
+        Prediction.dt_prediction, Prediction.dt_probability
+    ).order_by(Prediction.timestamp.desc(), Prediction.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return rows, next_cursor
+
+def save_predictions(mappings):
+    """
+    Zapisuje predykcje (słowniki kolumn tabeli Prediction) - od razu jedną transakcją
+    albo, w trybie write-behind, przez kolejkę zapisu w tle.
+    """
+    if prediction_writer is not None:
+        prediction_writer.submit(mappings)
+        return
+    db.session.bulk_insert_mappings(Prediction, mappings)
+    db.session.commit()
 
 # Ścieżka dla strony głównej
 @app.route('/')
@@ -148,13 +409,7 @@ def delete_prediction(dataset_name, prediction_id):
     Usuwa wybraną predykcję z bazy danych
     """
     try:
-        # Wybór odpowiedniego modelu w zależności od typu danych
-        if dataset_name == 'heart_disease':
-            prediction = HeartDiseasePrediction.query.get_or_404(prediction_id)
-        elif dataset_name == 'diabetes':
-            prediction = DiabetesPrediction.query.get_or_404(prediction_id)
-        else:  # lung_cancer
-            prediction = LungCancerPrediction.query.get_or_404(prediction_id)
+        prediction = Prediction.query.filter_by(id=prediction_id, dataset=dataset_name).first_or_404()
 
         # Sprawdzenie uprawnień - tylko właściciel może usunąć predykcję
         if prediction.user_id != current_user.id:
@@ -176,18 +431,28 @@ def history(dataset_name):
     Wyświetla historię predykcji dla wybranego zbioru danych
     """
 
+    if dataset_name not in DATASETS_CONFIG:
+        return "Nieznany zbiór danych", 404
+
+    cursor = request.args.get('cursor')
+    try:
+        # Pobranie jednej strony predykcji użytkownika dla wybranego zbioru danych
+        rows, next_cursor = fetch_history_page(dataset_name, cursor)
+    except ValueError:
+        return "Nieprawidłowy kursor strony", 400
+
     try:
-        # Pobranie predykcji z bazy danych w zależności od typu
-        if dataset_name == 'heart_disease':
-            predictions = HeartDiseasePrediction.query.filter_by(user_id=current_user.id).order_by(HeartDiseasePrediction.timestamp.desc()).all()
-        elif dataset_name == 'diabetes':
-            predictions = DiabetesPrediction.query.filter_by(user_id=current_user.id).order_by(DiabetesPrediction.timestamp.desc()).all()
-        else:  # lung_cancer
-            predictions = LungCancerPrediction.query.filter_by(user_id=current_user.id).order_by(LungCancerPrediction.timestamp.desc()).all()
+        config = DATASETS_CONFIG[dataset_name]
+        feature_names = [name for name, _ in config['features']]
+        predictions = [(row, dict(zip(feature_names, Prediction.unpack_features(row.features).tolist())))
+                       for row in rows]
 
         return render_template('history.html',
                                dataset_name=dataset_name,
-                               predictions=predictions)
+                               predictions=predictions,
+                               summary=config['summary'],
+                               is_first_page=cursor is None,
+                               next_cursor=next_cursor)
     except Exception as e:
         return render_template('error.html', error=str(e))
 
@@ -209,117 +474,182 @@ def predict(dataset_name):
         if dataset_name not in DATASETS_CONFIG:
             return "Nieznany zbiór danych", 404
 
-        # Załadowanie modeli jeśli jeszcze nie są załadowane
-        if dataset_name not in loaded_models:
-            load_models(dataset_name)
-
-        models = loaded_models[dataset_name]
-        input_data = prepare_input_data(dataset_name, request.form)
-
-        # Walidacja liczby cech
-        expected_features = len(DATASETS_CONFIG[dataset_name]['features'])
-        if len(input_data) != expected_features:
-            raise ValueError(f"Nieprawidłowa liczba cech. Oczekiwano {expected_features}, otrzymano {len(input_data)}")
-
-        # Skalowanie danych wejściowych
-        input_scaled = models['scaler'].transform([input_data])
-
-        # Wykonanie predykcji wszystkimi modelami
-        predictions = {
-            'Random Forest': {
-                'prediction': int(models['rf'].predict(input_scaled)[0]),
-                'probability': float(models['rf'].predict_proba(input_scaled)[0][1])
-            },
-            'Logistic Regression': {
-                'prediction': int(models['lr'].predict(input_scaled)[0]),
-                'probability': float(models['lr'].predict_proba(input_scaled)[0][1])
-            },
-            'Decision Tree': {
-                'prediction': int(models['dt'].predict(input_scaled)[0]),
-                'probability': float(models['dt'].predict_proba(input_scaled)[0][1])
-            }
-        }
+        with STAGE_SECONDS.time(dataset=dataset_name, stage='parse'):
+            input_data = prepare_input_data(dataset_name, request.form)[0]
 
-        # Zapisz predykcje do bazy danych
-        if dataset_name == 'heart_disease':
-            prediction = HeartDiseasePrediction(
-                user_id=current_user.id,
-                sex=float(input_data[0]),
-                age=float(input_data[1]),
-                cp=float(input_data[2]),
-                trestbps=float(input_data[3]),
-                chol=float(input_data[4]),
-                fbs=float(input_data[5]),
-                restecg=float(input_data[6]),
-                thalachh=float(input_data[7]),
-                exng=float(input_data[8]),
-                oldpeak=float(input_data[9]),
-                slp=float(input_data[10]),
-                caa=float(input_data[11]),
-                thall=float(input_data[12]),
-                rf_prediction=predictions['Random Forest']['prediction'],
-                rf_probability=predictions['Random Forest']['probability'],
-                lr_prediction=predictions['Logistic Regression']['prediction'],
-                lr_probability=predictions['Logistic Regression']['probability'],
-                dt_prediction=predictions['Decision Tree']['prediction'],
-                dt_probability=predictions['Decision Tree']['probability']
-            )
-        elif dataset_name == 'diabetes':
-            prediction = DiabetesPrediction(
-                user_id=current_user.id,
-                pregnancies=float(input_data[0]),
-                glucose=float(input_data[1]),
-                blood_pressure=float(input_data[2]),
-                skin_thickness=float(input_data[3]),
-                insulin=float(input_data[4]),
-                bmi=float(input_data[5]),
-                diabetes_pedigree_function=float(input_data[6]),
-                age=float(input_data[7]),
-                rf_prediction=predictions['Random Forest']['prediction'],
-                rf_probability=predictions['Random Forest']['probability'],
-                lr_prediction=predictions['Logistic Regression']['prediction'],
-                lr_probability=predictions['Logistic Regression']['probability'],
-                dt_prediction=predictions['Decision Tree']['prediction'],
-                dt_probability=predictions['Decision Tree']['probability']
-            )
-        else:  # lung_cancer
-            prediction = LungCancerPrediction(
-                user_id=current_user.id,
-                gender=request.form['GENDER'],
-                age=float(input_data[1]),
-                smoking=float(input_data[2]),
-                yellow_fingers=float(input_data[3]),
-                anxiety=float(input_data[4]),
-                peer_pressure=float(input_data[5]),
-                chronic_disease=float(input_data[6]),
-                fatigue=float(input_data[7]),
-                allergy=float(input_data[8]),
-                wheezing=float(input_data[9]),
-                alcohol_consuming=float(input_data[10]),
-                coughing=float(input_data[11]),
-                shortness_of_breath=float(input_data[12]),
-                swallowing_difficulty=float(input_data[13]),
-                chest_pain=float(input_data[14]),
-                rf_prediction=predictions['Random Forest']['prediction'],
-                rf_probability=predictions['Random Forest']['probability'],
-                lr_prediction=predictions['Logistic Regression']['prediction'],
-                lr_probability=predictions['Logistic Regression']['probability'],
-                dt_prediction=predictions['Decision Tree']['prediction'],
-                dt_probability=predictions['Decision Tree']['probability']
-            )
+        # Skalowanie i predykcja wszystkimi modelami (lub odczyt wyniku z pamięci podręcznej);
+        # przy włączonym grupowaniu wiersz oceniany jest razem z równoczesnymi żądaniami.
+        # Etap 'inference' obejmuje też oczekiwanie w kolejkach (grupowanie, pula procesów)
+        with STAGE_SECONDS.time(dataset=dataset_name, stage='inference'):
+            if micro_batcher is not None:
+                model_results, model_version = micro_batcher.score(dataset_name, input_data)
+            else:
+                model_results, model_version = score_raw_batch(dataset_name, input_data[np.newaxis, :])
+        predictions = format_predictions(model_results)
 
         # Zapisanie predykcji do bazy danych
-        db.session.add(prediction)
-        db.session.commit()
+        with STAGE_SECONDS.time(dataset=dataset_name, stage='persist'):
+            save_predictions([build_prediction_row(dataset_name, input_data, model_results, model_version)])
 
         # Zwrócenie wyników
-        return render_template('result.html',
-                               dataset_name=dataset_name,
-                               predictions=predictions)
+        with STAGE_SECONDS.time(dataset=dataset_name, stage='render'):
+            return render_template('result.html',
+                                   dataset_name=dataset_name,
+                                   predictions=predictions)
 
+    except InferencePoolBusy as e:
+        return render_template('error.html', error=str(e)), 503, {'Retry-After': '1'}
     except Exception as e:
         return render_template('error.html', error=str(e))
 
+# Ścieżka do sprawdzania gotowości aplikacji (np. dla load balancera)
+@app.route('/healthz/ready')
+def healthz_ready():
+    """
+    Zwraca stan załadowania modeli. Kod 200 gdy wszystkie modele są gotowe, 503 w przeciwnym razie.
+    """
+    ready = model_registry.is_ready()
+    response = {'ready': ready, 'datasets': model_registry.status()}
+    if prediction_writer is not None:
+        response['prediction_writer'] = prediction_writer.stats()
+    if prediction_cache is not None:
+        response['prediction_cache'] = prediction_cache.stats()
+    if inference_pool is not None:
+        response['inference_pool'] = inference_pool.stats()
+    if micro_batcher is not None:
+        response['micro_batcher'] = micro_batcher.stats()
+    return jsonify(response), 200 if ready else 503
+
+# Ścieżka z metrykami dla Prometheusa
+@app.route('/metrics')
+def metrics():
+    """
+    Metryki w formacie tekstowym Prometheusa: czasy etapów predykcji i modeli,
+    czasy ładowania modeli, liczniki pamięci podręcznych, zapisu do bazy i żądań HTTP.
+    """
+    return Response(metrics_registry.render(), content_type=CONTENT_TYPE)
+
+# Ścieżka do wsadowych predykcji (API JSON)
+@app.route('/api/predict/<dataset_name>/batch', methods=['POST'])
+@login_required
+def predict_batch(dataset_name):
+    """
+    Wykonuje predykcje dla wielu pacjentów w jednym żądaniu.
+    Przyjmuje tablicę JSON (obiekty z nazwami cech lub listy wartości) albo CSV z nagłówkiem.
+    Skalowanie i predict_proba wykonywane są raz na całą macierz, a wyniki
+    zapisywane jednym wstawieniem wsadowym.
+    """
+    if dataset_name not in DATASETS_CONFIG:
+        return jsonify({'error': 'Nieznany zbiór danych'}), 404
+
+    try:
+        with STAGE_SECONDS.time(dataset=dataset_name, stage='parse'):
+            rows = parse_batch_rows(dataset_name, request)
+            if not rows:
+                raise ValueError("Brak wierszy do predykcji")
+            if len(rows) > MAX_BATCH_ROWS:
+                raise ValueError(f"Zbyt wiele wierszy. Maksymalnie {MAX_BATCH_ROWS} w jednym żądaniu")
+            input_matrix = build_input_matrix(dataset_name, rows)
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        # Jedno skalowanie dla całej macierzy i jedno wywołanie predict_proba na model
+        # dla wszystkich wierszy spoza pamięci podręcznej
+        with STAGE_SECONDS.time(dataset=dataset_name, stage='inference'):
+            model_results, model_version = score_raw_batch(dataset_name, input_matrix)
+
+        # Zapis wszystkich predykcji jednym wstawieniem wsadowym
+        with STAGE_SECONDS.time(dataset=dataset_name, stage='persist'):
+            mappings = [build_prediction_row(dataset_name, input_matrix[i], model_results, model_version, i)
+                        for i in range(len(input_matrix))]
+            save_predictions(mappings)
+        results = [format_predictions(model_results, i) for i in range(len(input_matrix))]
+
+        return jsonify({
+            'dataset': dataset_name,
+            'model_version': model_version,
+            'count': len(results),
+            'predictions': results
+        })
+
+    except InferencePoolBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+# Ścieżka do szczegółów pojedynczej predykcji (API JSON)
+@app.route('/api/predictions/<dataset_name>/<int:prediction_id>')
+@login_required
+def prediction_detail(dataset_name, prediction_id):
+    """
+    Zwraca dane wejściowe i wyniki wybranej predykcji.
+    Wykorzystywane przez historię do wczytywania szczegółów dopiero po ich rozwinięciu.
+    """
+    if dataset_name not in DATASETS_CONFIG:
+        return jsonify({'error': 'Nieznany zbiór danych'}), 404
+
+    prediction = Prediction.query.filter_by(id=prediction_id, dataset=dataset_name).first()
+    if prediction is None:
+        return jsonify({'error': 'Nie znaleziono predykcji'}), 404
+    if prediction.user_id != current_user.id:
+        return jsonify({'error': 'Brak uprawnień do tej predykcji'}), 403
+
+    features = []
+    for (name, description), value in zip(DATASETS_CONFIG[dataset_name]['features'],
+                                          prediction.feature_values().tolist()):
+        features.append({
+            'name': name,
+            'description': description,
+            'value': value,
+            'display': str(format_feature_value(value, name, dataset_name))
+        })
+
+    return jsonify({
+        'id': prediction.id,
+        'dataset': dataset_name,
+        'timestamp': prediction.timestamp.isoformat(),
+        'model_version': prediction.model_version,
+        'features': features,
+        'predictions': {
+            MODEL_LABELS[model_key]: {
+                'prediction': getattr(prediction, f'{model_key}_prediction'),
+                'probability': getattr(prediction, f'{model_key}_probability')
+            }
+            for model_key in MODEL_LABELS
+        }
+    })
+
+# Ścieżka do zapisu rzeczywistego wyniku predykcji (API JSON)
+@app.route('/api/predictions/<dataset_name>/<int:prediction_id>/outcome', methods=['POST'])
+@login_required
+def record_outcome(dataset_name, prediction_id):
+    """
+    Zapisuje potwierdzony wynik (etykietę 0/1) dla predykcji użytkownika.
+    Oznaczone predykcje są wykorzystywane do douczania modeli.
+    """
+    prediction = Prediction.query.filter_by(id=prediction_id, dataset=dataset_name).first()
+    if prediction is None:
+        return jsonify({'error': 'Nie znaleziono predykcji'}), 404
+    if prediction.user_id != current_user.id:
+        return jsonify({'error': 'Brak uprawnień do tej predykcji'}), 403
+
+    payload = request.get_json(silent=True) or {}
+    label = payload.get('label')
+    if label not in (0, 1):
+        return jsonify({'error': 'Etykieta musi mieć wartość 0 lub 1'}), 400
+
+    if PredictionOutcome.query.filter_by(dataset=dataset_name, prediction_id=prediction_id).first():
+        return jsonify({'error': 'Wynik dla tej predykcji został już zapisany'}), 409
+
+    db.session.add(PredictionOutcome(dataset=dataset_name, prediction_id=prediction_id, label=label))
+    db.session.commit()
+    return jsonify({'dataset': dataset_name, 'prediction_id': prediction_id, 'label': label}), 201
+
 # Uruchomienie aplikacji w trybie debug
 if __name__ == '__main__':
+    # Z debug=True serwer działa w procesie potomnym przeładowania (WERKZEUG_RUN_MAIN)
+    if inference_pool is not None and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        inference_pool.start()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+Konfiguracja serwera gunicorn dla trybu produkcyjnego. Uruchamianie z katalogu ML_app:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Każdy proces serwera obsługuje żądania w wielu wątkach (worker gthread).
+Predykcje modeli mogą być wykonywane w osobnej puli procesów (INFERENCE_WORKERS > 0),
+dzięki czemu obliczenia lasów nie blokują wątków obsługujących pozostałe żądania.
+Wszystkie ustawienia można nadpisać zmiennymi środowiskowymi.
+"""
+import os
+import sys
+
+bind = os.environ.get('BIND', '127.0.0.1:8000')
+
+# Procesy i wątki obsługujące żądania HTTP
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 8))
+
+# Maksymalna liczba oczekujących połączeń oraz limity czasu
+backlog = int(os.environ.get('WEB_BACKLOG', 256))
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Okresowy restart procesów (ogranicza skutki ewentualnych wycieków pamięci)
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('WEB_MAX_REQUESTS_JITTER', 0))
+
+# Aplikacja ładowana osobno w każdym procesie - wątki tła (ładowanie modeli, zapis predykcji,
+# pula predykcji) nie przetrwałyby rozwidlenia procesu głównego
+preload_app = False
+
+accesslog = os.environ.get('WEB_ACCESS_LOG')
+errorlog = '-'
+
+
+def _inference_pool():
+    """Pula predykcji aplikacji załadowanej w procesie serwera (None poza trybem puli)"""
+    wsgi = sys.modules.get('wsgi')
+    return getattr(getattr(wsgi, 'flask_app', None), 'inference_pool', None)
+
+
+def post_worker_init(worker):
+    # Procesy puli predykcji uruchamiane są po załadowaniu aplikacji, a przed przyjęciem
+    # pierwszego żądania - żadne żądanie nie czeka na ich start i załadowanie modeli
+    pool = _inference_pool()
+    if pool is not None:
+        pool.start()
+
+
+def worker_exit(server, worker):
+    pool = _inference_pool()
+    if pool is not None:
+        pool.shutdown()
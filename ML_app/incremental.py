@@ -0,0 +1,158 @@
+import json
+import os
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+# Domyślna baza danych aplikacji (Flask-SQLAlchemy umieszcza plik SQLite w katalogu instance);
+# zmienna DATABASE_URL wskazuje tę samą bazę co aplikacja (np. PostgreSQL)
+DEFAULT_DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///instance/predictions.db')
+# Plik ze stanem douczania zapisywany w katalogu modeli
+TRAINING_STATE_FILE = 'training_state.json'
+# Unikalne wartości cech danych treningowych (zob. remap_tree_thresholds), zapisywane obok stanu douczania
+REFERENCE_VALUES_FILE = 'reference_values.npz'
+
+# Typ wartości w spakowanym wektorze cech predykcji (zgodny z models.FEATURE_DTYPE)
+FEATURE_DTYPE = '<f8'
+
+
+def stream_labelled_rows(database_url, dataset_name, after_id=0, chunk_size=1000, until_id=None):
+    """
+    Strumieniowo odczytuje z bazy predykcje z potwierdzonym wynikiem (tabela prediction_outcome),
+    dodane po punkcie kontrolnym after_id (i nie później niż until_id, jeśli podano).
+    Zwraca kolejne porcje (id wyników, X, y).
+    """
+    query = text(
+        "SELECT o.id, p.features, o.label "
+        "FROM prediction_outcome o JOIN prediction p "
+        "ON p.id = o.prediction_id AND p.dataset = o.dataset "
+        "WHERE o.dataset = :dataset AND o.id > :after_id "
+        + ("AND o.id <= :until_id " if until_id is not None else "") +
+        "ORDER BY o.id"
+    )
+
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as connection:
+            result = connection.execution_options(stream_results=True).execute(
+                query, {'dataset': dataset_name, 'after_id': after_id, 'until_id': until_id}
+            )
+            while True:
+                rows = result.fetchmany(chunk_size)
+                if not rows:
+                    break
+                ids = np.array([row[0] for row in rows], dtype=np.int64)
+                labels = np.array([row[2] for row in rows], dtype=np.int64)
+                # Wszystkie wektory cech porcji rozpakowywane jednym wywołaniem
+                # (zapisane w kolejności schematu cech, tej samej co przy trenowaniu)
+                X = np.frombuffer(b''.join(row[1] for row in rows), dtype=FEATURE_DTYPE).reshape(len(rows), -1)
+                yield ids, X, labels
+    finally:
+        engine.dispose()
+
+
+def merge_feature_values(values, X):
+    """
+    Dołącza unikalne wartości kolumn macierzy X (dane surowe) do posortowanych list wartości
+    poszczególnych cech. Pamięć zależy od liczby różnych wartości, a nie od liczby wierszy.
+    """
+    if values is None:
+        return [np.unique(X[:, i]) for i in range(X.shape[1])]
+    return [np.union1d(feature_values, X[:, i]) for i, feature_values in enumerate(values)]
+
+
+def snap_thresholds(old_threshold, remapped, old_values, new_values):
+    """
+    Progi w nowej skali, przy których każda wartość referencyjna trafia na tę samą stronę
+    podziału co przy starym progu. old_values i new_values to te same (rosnące) wartości
+    surowe w starej i nowej skali, zaokrąglone do float32 jak w sklearn. Próg przeliczony
+    w float64 zostaje, jeśli już rozdziela wartości poprawnie; w przeciwnym razie
+    przesuwany jest w środek między najbliższymi wartościami po obu stronach.
+    """
+    old_values = old_values.astype(np.float64)
+    new_values = new_values.astype(np.float64)
+    n_left = np.searchsorted(old_values, old_threshold, side='right')
+    has_left = n_left > 0
+    has_right = n_left < len(new_values)
+    left = new_values[np.maximum(n_left - 1, 0)]
+    right = new_values[np.minimum(n_left, len(new_values) - 1)]
+
+    result = remapped.copy()
+    both = has_left & has_right & (left < right) & ~((left <= remapped) & (remapped < right))
+    result[both] = (left[both] + right[both]) / 2
+    only_left = has_left & ~has_right
+    result[only_left] = np.maximum(remapped[only_left], left[only_left])
+    only_right = ~has_left & has_right
+    result[only_right] = np.minimum(remapped[only_right], np.nextafter(right[only_right], -np.inf))
+    return result
+
+
+def remap_tree_thresholds(estimator, old_mean, old_scale, new_mean, new_scale, reference_values=None):
+    """
+    Przelicza progi drzewa decyzyjnego ze starej standaryzacji na nową.
+    Warunek (x - m0) / s0 <= t odpowiada (x - m1) / s1 <= (t * s0 + m0 - m1) / s1, ale sklearn
+    porównuje cechy rzutowane do float32, więc sam próg przeliczony w float64 nie daje
+    równoważności - wartość leżąca tuż przy progu może po zmianie skali trafić do innego liścia.
+
+    Przy podanym reference_values (posortowane unikalne wartości surowe każdej cechy, np. danych
+    treningowych - zob. merge_feature_values) progi są dosuwane tak, aby każda z tych wartości
+    trafiała na tę samą stronę każdego podziału, czyli każda próbka referencyjna - do tego samego
+    liścia. Dla pozostałych wartości decyzje zgodne są z dokładnością do zaokrąglenia float32.
+    """
+    tree = estimator.tree_
+    internal = tree.feature >= 0
+    feature = tree.feature[internal]
+    threshold = tree.threshold
+    old_threshold = threshold[internal]
+    remapped = (old_threshold * old_scale[feature] + old_mean[feature] - new_mean[feature]) / new_scale[feature]
+
+    if reference_values is not None:
+        for i in np.unique(feature):
+            nodes = feature == i
+            values = reference_values[i]
+            if not len(values):
+                continue
+            old_values = ((values - old_mean[i]) / old_scale[i]).astype(np.float32)
+            new_values = ((values - new_mean[i]) / new_scale[i]).astype(np.float32)
+            remapped[nodes] = snap_thresholds(old_threshold[nodes], remapped[nodes], old_values, new_values)
+
+    threshold[internal] = remapped
+
+
+def remap_linear(model, old_mean, old_scale, new_mean, new_scale):
+    """
+    Przelicza współczynniki modelu liniowego ze starej standaryzacji na nową
+    (funkcja decyzyjna dla danych surowych pozostaje bez zmian).
+    """
+    coef = model.coef_
+    model.intercept_ = model.intercept_ + coef @ ((new_mean - old_mean) / old_scale)
+    model.coef_ = coef * (new_scale / old_scale)
+
+
+def load_training_state(model_dir):
+    """Wczytuje stan douczania (punkt kontrolny) z katalogu modeli"""
+    path = f'{model_dir}/{TRAINING_STATE_FILE}'
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_training_state(model_dir, state):
+    """Zapisuje stan douczania w katalogu modeli"""
+    with open(f'{model_dir}/{TRAINING_STATE_FILE}', 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def load_reference_values(model_dir):
+    """Wczytuje wartości referencyjne cech z katalogu modeli (None, gdy nie zostały zapisane)"""
+    path = f'{model_dir}/{REFERENCE_VALUES_FILE}'
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return [data[f'f{i}'] for i in range(len(data.files))]
+
+
+def save_reference_values(model_dir, values):
+    """Zapisuje wartości referencyjne cech (po jednej tablicy na cechę) w katalogu modeli"""
+    np.savez(f'{model_dir}/{REFERENCE_VALUES_FILE}', **{f'f{i}': array for i, array in enumerate(values)})
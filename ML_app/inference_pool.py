@@ -0,0 +1,127 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from registry import ModelRegistry
+from scoring import score_models
+
+# Rejestr modeli w procesie roboczym puli (ustawiany przez _init_worker)
+_worker_registry = None
+# Modele załadowane w procesie roboczym: (zbiór danych, wersja) -> modele
+_worker_models = {}
+# Liczba wersji modeli zbioru danych trzymanych w procesie roboczym (poprzednia i nowa w trakcie podmiany)
+WORKER_VERSIONS_KEPT = 2
+
+
+class InferencePoolBusy(Exception):
+    """Kolejka puli predykcji jest pełna"""
+
+
+def _init_worker(dataset_names, models_root, mmap_mode):
+    """Inicjalizacja procesu roboczego - aktywne modele ładowane są przed pierwszym zadaniem"""
+    global _worker_registry
+    _worker_registry = ModelRegistry(dataset_names, models_root=models_root, mmap_mode=mmap_mode,
+                                     check_interval=None)
+    for dataset_name in dataset_names:
+        try:
+            _worker_models_for(dataset_name, _worker_registry.resolve(dataset_name)[0])
+        except Exception:
+            pass    # Błąd zostanie zgłoszony przy pierwszym zadaniu dla zbioru danych
+
+
+def _worker_models_for(dataset_name, version):
+    """
+    Modele wskazanej wersji w procesie roboczym. Wersję wybiera proces serwera (ta sama,
+    której skalerem przeskalowano dane i którą oznacza predykcje), więc proces roboczy
+    nie sprawdza wersji samodzielnie. Najstarsze wersje usuwane są z pamięci.
+    """
+    key = (dataset_name, version)
+    models = _worker_models.get(key)
+    if models is None:
+        models = _worker_models[key] = _worker_registry.load_version(dataset_name, version)
+        loaded = [name for name in _worker_models if name[0] == dataset_name]
+        for old_key in loaded[:-WORKER_VERSIONS_KEPT]:
+            del _worker_models[old_key]
+    return models
+
+
+def _score(dataset_name, version, input_scaled, thresholds):
+    """Predykcja wszystkimi modelami wskazanej wersji w procesie roboczym"""
+    return score_models(_worker_models_for(dataset_name, version), input_scaled, thresholds)
+
+
+def _noop(_):
+    """Puste zadanie - wymusza uruchomienie (i inicjalizację) procesów roboczych"""
+    return None
+
+
+class InferencePool:
+    """
+    Pula procesów wykonujących predykcje modeli. Każdy proces ładuje modele przy starcie
+    (przy modelach skompilowanych lub mmap_mode='r' tablice są współdzielone przez system),
+    więc obliczenia lasów nie blokują wątków obsługujących żądania HTTP (GIL).
+    Każde zadanie niesie wersję modeli wybraną przez proces serwera - po podmianie wersji
+    proces roboczy ładuje nową wersję przy pierwszym zadaniu, które jej dotyczy.
+
+    Liczba zadań przyjętych jednocześnie (wykonywanych i oczekujących) ograniczona jest
+    do max_pending. Gdy limit jest osiągnięty, score() czeka najwyżej queue_timeout sekund,
+    a następnie zgłasza InferencePoolBusy - serwer odpowiada wtedy kodem 503
+    zamiast budować nieograniczoną kolejkę.
+    """
+
+    def __init__(self, dataset_names, workers=2, max_pending=64, queue_timeout=1.0,
+                 models_root='models', mmap_mode='r'):
+        self.dataset_names = list(dataset_names)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self.models_root = models_root
+        self.mmap_mode = mmap_mode
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _get_executor(self):
+        # Pula tworzona po rozwidleniu procesów serwera (gunicorn) - przez start()
+        # lub, gdy nie został wywołany, przy pierwszym zadaniu
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.dataset_names, self.models_root, self.mmap_mode)
+                )
+            return self._executor
+
+    def start(self):
+        """Uruchamia procesy robocze i czeka na załadowanie w nich modeli"""
+        executor = self._get_executor()
+        list(executor.map(_noop, range(self.workers)))
+        return self
+
+    def score(self, dataset_name, version, input_scaled, thresholds=None):
+        """Wykonuje score_models modelami podanej wersji w procesie roboczym i zwraca wynik"""
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise InferencePoolBusy("Serwer jest przeciążony. Spróbuj ponownie za chwilę.")
+        try:
+            future = self._get_executor().submit(
+                _score, dataset_name, version, np.ascontiguousarray(input_scaled, dtype=np.float64), thresholds
+            )
+            return future.result()
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        return {'workers': self.workers, 'max_pending': self.max_pending, 'rejected': self.rejected}
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
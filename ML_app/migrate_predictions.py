@@ -0,0 +1,271 @@
+import argparse
+
+import numpy as np
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+
+from incremental import DEFAULT_DATABASE_URL
+from models import db, FEATURE_DTYPE
+from schema import SCHEMAS
+
+# Dawne tabele predykcji oraz wyrażenia SQL kolumn w kolejności cech schematu (schema.py)
+LEGACY_TABLES = {
+    'heart_disease': ('heart_disease_prediction', [
+        'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg',
+        'thalachh', 'exng', 'oldpeak', 'slp', 'caa', 'thall'
+    ]),
+    'diabetes': ('diabetes_prediction', [
+        'pregnancies', 'glucose', 'blood_pressure', 'skin_thickness',
+        'insulin', 'bmi', 'diabetes_pedigree_function', 'age'
+    ]),
+    'lung_cancer': ('lung_cancer_prediction', [
+        "CASE WHEN UPPER(TRIM(gender)) = 'M' THEN 1 ELSE 0 END", 'age', 'smoking', 'yellow_fingers',
+        'anxiety', 'peer_pressure', 'chronic_disease', 'fatigue', 'allergy', 'wheezing',
+        'alcohol_consuming', 'coughing', 'shortness_of_breath', 'swallowing_difficulty', 'chest_pain'
+    ])
+}
+
+# Kolumny dodane do tabeli prediction po jej utworzeniu (create_all nie zmienia istniejących tabel)
+ADDED_COLUMNS = {
+    'model_version': 'VARCHAR(64)'
+}
+
+# Kolumny tekstowe poszerzone po utworzeniu tabel: (tabela, kolumna) -> długość.
+# Skróty haseł scrypt mają ok. 160 znaków (zob. passwords.py).
+WIDENED_COLUMNS = {
+    ('user', 'password_hash'): 255
+}
+
+RESULT_COLUMNS = ['rf_prediction', 'rf_probability', 'lr_prediction', 'lr_probability',
+                  'dt_prediction', 'dt_probability']
+
+
+def migrate_table(connection, dataset_name, next_id, chunk_size):
+    """
+    Przenosi predykcje jednej dawnej tabeli do tabeli prediction (wstawianie porcjami).
+    Zwraca (liczba przeniesionych wierszy, słownik stare id -> nowe id).
+    """
+    table, columns = LEGACY_TABLES[dataset_name]
+    result = connection.execute(text(
+        f"SELECT id, user_id, timestamp, {', '.join(RESULT_COLUMNS)}, {', '.join(columns)} "
+        f"FROM {table} ORDER BY id"
+    ))
+    insert = text(
+        f"INSERT INTO prediction (id, user_id, dataset, timestamp, features, {', '.join(RESULT_COLUMNS)}) "
+        f"VALUES (:id, :user_id, :dataset, :timestamp, :features, "
+        f"{', '.join(':' + name for name in RESULT_COLUMNS)})"
+    )
+
+    id_map = {}
+    n_result = len(RESULT_COLUMNS)
+    while True:
+        rows = result.fetchmany(chunk_size)
+        if not rows:
+            break
+        # Wektory cech całej porcji pakowane jednym wywołaniem
+        features = np.array([row[3 + n_result:] for row in rows], dtype=FEATURE_DTYPE)
+
+        mappings = []
+        for row, vector in zip(rows, features):
+            mapping = dict(zip(RESULT_COLUMNS, row[3:3 + n_result]))
+            mapping.update(id=next_id, user_id=row[1], dataset=dataset_name,
+                           timestamp=row[2], features=vector.tobytes())
+            mappings.append(mapping)
+            id_map[row[0]] = next_id
+            next_id += 1
+        connection.execute(insert, mappings)
+
+    return len(id_map), id_map
+
+
+def remap_outcomes(connection, dataset_name, id_map):
+    """
+    Przepisuje prediction_id w tabeli prediction_outcome na nowe identyfikatory.
+    Najpierw identyfikatory są negowane, aby zmiana nie naruszyła ograniczenia unikalności
+    (dataset, prediction_id) w trakcie aktualizacji.
+    """
+    if not id_map:
+        return
+    params = {'dataset': dataset_name}
+    connection.execute(text(
+        "UPDATE prediction_outcome SET prediction_id = -prediction_id WHERE dataset = :dataset"
+    ), params)
+    connection.execute(text(
+        "UPDATE prediction_outcome SET prediction_id = :new_id "
+        "WHERE dataset = :dataset AND prediction_id = :old_id"
+    ), [{'dataset': dataset_name, 'old_id': -old_id, 'new_id': new_id} for old_id, new_id in id_map.items()])
+
+
+# Kolejność cech w wektorach zapisanych przed wprowadzeniem wspólnego schematu, względem schematu:
+# nowy_wektor[j] = stary_wektor[LEGACY_FEATURE_ORDER[j]]. Aplikacja zapisywała płeć przed wiekiem
+# w zbiorze heart_disease; w pozostałych zbiorach kolejność była zgodna.
+LEGACY_FEATURE_ORDER = {
+    'heart_disease': [1, 0, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
+}
+
+
+def reorder_features(connection, dataset_name, order, chunk_size):
+    """Przestawia cechy w zapisanych wektorach predykcji zbioru danych (porcjami według id)"""
+    select = text(
+        "SELECT id, features FROM prediction WHERE dataset = :dataset AND id > :after_id ORDER BY id LIMIT :limit"
+    )
+    update = text("UPDATE prediction SET features = :features WHERE id = :id")
+
+    count = 0
+    after_id = 0
+    while True:
+        rows = connection.execute(select, {'dataset': dataset_name, 'after_id': after_id,
+                                           'limit': chunk_size}).fetchall()
+        if not rows:
+            break
+        # Wektory całej porcji przestawiane jednym indeksowaniem
+        X = np.frombuffer(b''.join(row[1] for row in rows), dtype=FEATURE_DTYPE).reshape(len(rows), -1)
+        X = np.ascontiguousarray(X[:, order])
+        connection.execute(update, [{'id': row[0], 'features': vector.tobytes()} for row, vector in zip(rows, X)])
+        count += len(rows)
+        after_id = rows[-1][0]
+    return count
+
+
+def add_missing_columns(engine):
+    """
+    Dodaje do istniejącej tabeli prediction kolumny wprowadzone później (ADDED_COLUMNS).
+    Zwraca listę dodanych kolumn.
+    """
+    added = []
+    for column, column_type in ADDED_COLUMNS.items():
+        if column in {c['name'] for c in inspect(engine).get_columns('prediction')}:
+            continue
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(f"ALTER TABLE prediction ADD COLUMN {column} {column_type}"))
+            added.append(column)
+        except (OperationalError, ProgrammingError):
+            # Kolumnę mógł dodać równolegle startujący proces
+            if column not in {c['name'] for c in inspect(engine).get_columns('prediction')}:
+                raise
+    return added
+
+
+def widen_columns(engine):
+    """
+    Zwiększa długość kolumn tekstowych istniejących tabel do wartości z WIDENED_COLUMNS
+    (create_all nie zmienia istniejących tabel). SQLite nie ogranicza długości VARCHAR,
+    więc zmiana dotyczy tylko pozostałych baz (np. PostgreSQL). Zwraca listę poszerzonych kolumn.
+    """
+    if engine.dialect.name == 'sqlite':
+        return []
+
+    def column_length(table, column):
+        for info in inspect(engine).get_columns(table):
+            if info['name'] == column:
+                return getattr(info['type'], 'length', None)
+
+    quote = engine.dialect.identifier_preparer.quote
+    widened = []
+    for (table, column), length in WIDENED_COLUMNS.items():
+        current = column_length(table, column)
+        if current is None or current >= length:
+            continue
+        if engine.dialect.name == 'mysql':
+            statement = f"ALTER TABLE {quote(table)} MODIFY {quote(column)} VARCHAR({length})"
+        else:
+            statement = f"ALTER TABLE {quote(table)} ALTER COLUMN {quote(column)} TYPE VARCHAR({length})"
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(statement))
+            widened.append(f'{table}.{column}')
+        except (OperationalError, ProgrammingError):
+            # Kolumnę mógł poszerzyć równolegle startujący proces
+            if (column_length(table, column) or 0) < length:
+                raise
+    return widened
+
+
+def upgrade_feature_layouts(engine, chunk_size=1000):
+    """
+    Oznacza wersję schematu cech dla każdego zbioru danych w tabeli feature_layout, a predykcje
+    zapisane przed wprowadzeniem schematu przestawia do jego kolejności (w tej samej transakcji).
+    Wpis w feature_layout wstawiany jest jako pierwszy, więc równoległe procesy (np. procesy
+    serwera startujące jednocześnie) nie przestawią tych samych wektorów dwukrotnie.
+    Zwraca słownik zbiór danych -> liczba przestawionych predykcji.
+    """
+    upgraded = {}
+    for dataset_name, schema in SCHEMAS.items():
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(
+                    "INSERT INTO feature_layout (dataset, schema_version) VALUES (:dataset, :version)"
+                ), {'dataset': dataset_name, 'version': schema.version})
+                order = LEGACY_FEATURE_ORDER.get(dataset_name)
+                upgraded[dataset_name] = reorder_features(connection, dataset_name, order, chunk_size) if order else 0
+        except IntegrityError:
+            # Zbiór danych był już oznaczony - wersja musi zgadzać się z bieżącym schematem
+            with engine.connect() as connection:
+                version = connection.execute(text(
+                    "SELECT schema_version FROM feature_layout WHERE dataset = :dataset"
+                ), {'dataset': dataset_name}).scalar()
+            if version != schema.version:
+                raise RuntimeError(
+                    f"Predykcje {dataset_name} zapisano w schemacie cech {version}, "
+                    f"bieżący schemat to {schema.version}"
+                )
+    return upgraded
+
+
+def migrate(database_url, drop_legacy=False, chunk_size=1000):
+    """
+    Przenosi predykcje z dawnych tabel (po jednej na zbiór danych) do wspólnej tabeli prediction.
+    Migrowane tabele są usuwane lub zachowywane pod nazwą legacy_<tabela>.
+    """
+    engine = create_engine(database_url)
+    try:
+        # Utworzenie brakujących tabel (prediction, prediction_outcome)
+        db.Model.metadata.create_all(engine)
+        existing = set(inspect(engine).get_table_names())
+        for column in add_missing_columns(engine):
+            print(f"prediction: dodano kolumnę {column}")
+        for column in widen_columns(engine):
+            print(f"{column}: zwiększono długość kolumny")
+
+        # Predykcje już przeniesione do tabeli prediction - przestawienie do kolejności schematu
+        # przed dodaniem wierszy z dawnych tabel (te zapisywane są od razu w kolejności schematu)
+        for dataset_name, count in upgrade_feature_layouts(engine, chunk_size).items():
+            if count:
+                print(f"{dataset_name}: przestawiono cechy w {count} predykcjach")
+
+        with engine.begin() as connection:
+            next_id = connection.execute(text("SELECT COALESCE(MAX(id), 0) FROM prediction")).scalar() + 1
+
+            for dataset_name, (table, _) in LEGACY_TABLES.items():
+                if table not in existing:
+                    continue
+
+                count, id_map = migrate_table(connection, dataset_name, next_id, chunk_size)
+                next_id += count
+                remap_outcomes(connection, dataset_name, id_map)
+
+                if drop_legacy:
+                    connection.execute(text(f"DROP TABLE {table}"))
+                else:
+                    connection.execute(text(f"ALTER TABLE {table} RENAME TO legacy_{table}"))
+                print(f"{dataset_name}: przeniesiono {count} predykcji z tabeli {table}")
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migracja predykcji do wspólnej tabeli prediction")
+    parser.add_argument('--database-url', default=DEFAULT_DATABASE_URL,
+                        help="Adres bazy danych (domyślnie baza aplikacji w katalogu instance)")
+    parser.add_argument('--drop-legacy', action='store_true',
+                        help="Usuń dawne tabele zamiast zmieniać ich nazwę na legacy_<tabela>")
+    parser.add_argument('--chunk-size', type=int, default=1000,
+                        help="Liczba wierszy przenoszonych w jednej porcji")
+    args = parser.parse_args()
+
+    migrate(args.database_url, drop_legacy=args.drop_legacy, chunk_size=args.chunk_size)
+
+
+if __name__ == '__main__':
+    main()
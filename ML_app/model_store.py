@@ -0,0 +1,157 @@
+"""
+Wersjonowany magazyn modeli. Każdy zapis modeli tworzy nowy, niezmienny katalog wersji,
+a aktywną wersję wskazuje plik CURRENT podmieniany atomowo (os.replace):
+
+    models/<zbiór_danych>/versions/<wersja>/   artefakty (joblib, compiled, schema.json) + manifest.json
+    models/<zbiór_danych>/CURRENT              identyfikator aktywnej wersji
+
+Zbiory danych bez pliku CURRENT (modele zapisane przed wprowadzeniem wersji) odczytywane są
+bezpośrednio z models/<zbiór_danych>. Zarządzanie wersjami z katalogu ML_app:
+
+    python model_store.py list heart_disease
+    python model_store.py activate heart_disease 20261018T120000-ab12cd34   # np. wycofanie wersji
+    python model_store.py prune heart_disease --keep 5
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+# Plik wskazujący aktywną wersję i katalog wersji (wewnątrz models/<zbiór_danych>)
+CURRENT_FILE = 'CURRENT'
+VERSIONS_DIR = 'versions'
+# Opis wersji zapisywany w jej katalogu
+MANIFEST_FILE = 'manifest.json'
+
+
+class ModelStore:
+    """Katalogi wersji modeli i atomowy wskaźnik aktywnej wersji dla każdego zbioru danych"""
+
+    def __init__(self, root='models'):
+        self.root = root
+
+    def dataset_dir(self, dataset_name):
+        return os.path.join(self.root, dataset_name)
+
+    def version_dir(self, dataset_name, version):
+        return os.path.join(self.dataset_dir(dataset_name), VERSIONS_DIR, version)
+
+    def current_version(self, dataset_name):
+        """Identyfikator aktywnej wersji (None dla modeli zapisanych bez wersjonowania)"""
+        try:
+            with open(os.path.join(self.dataset_dir(dataset_name), CURRENT_FILE), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def current_dir(self, dataset_name):
+        """Katalog artefaktów aktywnej wersji (lub models/<zbiór_danych> bez wersjonowania)"""
+        version = self.current_version(dataset_name)
+        if version is None:
+            return self.dataset_dir(dataset_name)
+        return self.version_dir(dataset_name, version)
+
+    def manifest(self, dataset_name, version):
+        with open(os.path.join(self.version_dir(dataset_name, version), MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+
+    def list_versions(self, dataset_name):
+        """Manifesty wszystkich wersji zbioru danych, od najstarszej"""
+        versions_dir = os.path.join(self.dataset_dir(dataset_name), VERSIONS_DIR)
+        if not os.path.isdir(versions_dir):
+            return []
+        manifests = []
+        for version in sorted(os.listdir(versions_dir)):
+            if os.path.exists(os.path.join(versions_dir, version, MANIFEST_FILE)):
+                manifests.append(self.manifest(dataset_name, version))
+        return manifests
+
+    def publish(self, dataset_name, write_artifacts, manifest):
+        """
+        Zapisuje nową wersję: write_artifacts(katalog) zapisuje artefakty do katalogu tymczasowego,
+        który po dopisaniu manifestu przemianowywany jest na katalog wersji. Dopiero potem
+        CURRENT wskazuje nową wersję - przerwany zapis nie zmienia aktywnych modeli.
+        Zwraca identyfikator wersji.
+        """
+        versions_dir = os.path.join(self.dataset_dir(dataset_name), VERSIONS_DIR)
+        os.makedirs(versions_dir, exist_ok=True)
+
+        created = datetime.now(timezone.utc)
+        version = created.strftime('%Y%m%dT%H%M%S%f')
+        if manifest.get('data_hash'):
+            version = f"{version}-{manifest['data_hash'][:8]}"
+
+        temp_dir = tempfile.mkdtemp(prefix=f'.{version}-', dir=versions_dir)
+        try:
+            write_artifacts(temp_dir)
+            manifest = {**manifest, 'version': version, 'dataset': dataset_name,
+                        'created': created.isoformat(timespec='seconds')}
+            with open(os.path.join(temp_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            os.rename(temp_dir, os.path.join(versions_dir, version))
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+
+        self.activate(dataset_name, version)
+        return version
+
+    def activate(self, dataset_name, version):
+        """Atomowo ustawia aktywną wersję (także do wycofania do wcześniejszej wersji)"""
+        if not os.path.exists(os.path.join(self.version_dir(dataset_name, version), MANIFEST_FILE)):
+            raise ValueError(f"Nieznana wersja modeli {dataset_name}: {version}")
+        dataset_dir = self.dataset_dir(dataset_name)
+        fd, temp_path = tempfile.mkstemp(prefix=f'.{CURRENT_FILE}-', dir=dataset_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(version + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, os.path.join(dataset_dir, CURRENT_FILE))
+
+    def prune(self, dataset_name, keep=5):
+        """Usuwa najstarsze wersje poza keep najnowszymi (aktywna wersja nigdy nie jest usuwana)"""
+        current = self.current_version(dataset_name)
+        versions = [manifest['version'] for manifest in self.list_versions(dataset_name)]
+        removed = []
+        for version in versions[:max(0, len(versions) - keep)]:
+            if version != current:
+                shutil.rmtree(self.version_dir(dataset_name, version), ignore_errors=True)
+                removed.append(version)
+        return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zarządzanie wersjami modeli")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    list_parser = subparsers.add_parser('list', help='Lista wersji modeli zbioru danych')
+    list_parser.add_argument('dataset')
+    activate_parser = subparsers.add_parser('activate', help='Ustawienie aktywnej wersji')
+    activate_parser.add_argument('dataset')
+    activate_parser.add_argument('version')
+    prune_parser = subparsers.add_parser('prune', help='Usunięcie najstarszych wersji')
+    prune_parser.add_argument('dataset')
+    prune_parser.add_argument('--keep', type=int, default=5, help='Liczba zachowywanych wersji')
+    parser.add_argument('--models-root', default='models', help='Katalog z modelami')
+    args = parser.parse_args()
+
+    store = ModelStore(args.models_root)
+    if args.command == 'list':
+        current = store.current_version(args.dataset)
+        for manifest in store.list_versions(args.dataset):
+            marker = '*' if manifest['version'] == current else ' '
+            metrics = ', '.join(f'{name}={value:.4f}' for name, value in manifest.get('metrics', {}).items())
+            print(f"{marker} {manifest['version']}  {manifest['created']}  {metrics}")
+        if current is None:
+            print("Brak aktywnej wersji - modele odczytywane bezpośrednio z katalogu zbioru danych")
+    elif args.command == 'activate':
+        store.activate(args.dataset, args.version)
+        print(f"Aktywna wersja {args.dataset}: {args.version}")
+    elif args.command == 'prune':
+        removed = store.prune(args.dataset, keep=args.keep)
+        print(f"Usunięto wersje: {', '.join(removed) or 'brak'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,136 +1,120 @@
-from datetime import datetime
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
-
-# Inicjalizacja obiektu bazy danych
-db = SQLAlchemy()
-
-class User(UserMixin, db.Model):
-    """
-    Model użytkownika systemu przechowujący podstawowe informacje oraz relacje z predykcjami.
-    Atrybuty:
-       id: Unikalny identyfikator użytkownika
-       username: Nazwa użytkownika (max 80 znaków)
-       email: Email użytkownika (max 120 znaków)
-       password_hash: Zahashowane hasło
-
-   Relacje:
-       heart_disease_predictions: Relacja z predykcjami chorób serca
-       diabetes_predictions: Relacja z predykcjami cukrzycy
-       lung_cancer_predictions: Relacja z predykcjami raka płuc
-
-   Dziedziczy po UserMixin aby zapewnić integrację z Flask-Login.
-    """
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128))
-    heart_disease_predictions = db.relationship('HeartDiseasePrediction', backref='user', lazy=True)
-    diabetes_predictions = db.relationship('DiabetesPrediction', backref='user', lazy=True)
-    lung_cancer_predictions = db.relationship('LungCancerPrediction', backref='user', lazy=True)
-
-    def set_password(self, password):
-        """
-        Hashuje i zapisuje hasło użytkownika
-        """
-        self.password_hash = generate_password_hash(password)
-
-    def check_password(self, password):
-        """
-        Weryfikuje hasło użytkownika
-        """
-        return check_password_hash(self.password_hash, password)
-
-class HeartDiseasePrediction(db.Model):
-    """
-    Model przechowujący predykcje chorób serca.
-    Zawiera zarówno dane wejściowe jak i wyniki predykcji.
-    """
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-
-    # Cechy wejściowe
-    sex = db.Column(db.Integer)
-    age = db.Column(db.Integer)
-    cp = db.Column(db.Integer)
-    trestbps = db.Column(db.Float)
-    chol = db.Column(db.Float)
-    fbs = db.Column(db.Integer)
-    restecg = db.Column(db.Integer)
-    thalachh = db.Column(db.Float)
-    exng = db.Column(db.Integer)
-    oldpeak = db.Column(db.Float)
-    slp = db.Column(db.Integer)
-    caa = db.Column(db.Integer)
-    thall = db.Column(db.Integer)
-
-    # Predykcje
-    rf_prediction = db.Column(db.Integer)
-    rf_probability = db.Column(db.Float)
-    lr_prediction = db.Column(db.Integer)
-    lr_probability = db.Column(db.Float)
-    dt_prediction = db.Column(db.Integer)
-    dt_probability = db.Column(db.Float)
-
-class DiabetesPrediction(db.Model):
-    """
-    Model przechowujący predykcje cukrzycy.
-    Zawiera zarówno dane wejściowe jak i wyniki predykcji.
-    """
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-
-    # Cechy wejściowe
-    pregnancies = db.Column(db.Integer)
-    glucose = db.Column(db.Float)
-    blood_pressure = db.Column(db.Float)
-    skin_thickness = db.Column(db.Float)
-    insulin = db.Column(db.Float)
-    bmi = db.Column(db.Float)
-    diabetes_pedigree_function = db.Column(db.Float)
-    age = db.Column(db.Integer)
-
-    # Predykcje
-    rf_prediction = db.Column(db.Integer)
-    rf_probability = db.Column(db.Float)
-    lr_prediction = db.Column(db.Integer)
-    lr_probability = db.Column(db.Float)
-    dt_prediction = db.Column(db.Integer)
-    dt_probability = db.Column(db.Float)
-
-class LungCancerPrediction(db.Model):
-    """
-    Model przechowujący predykcje raka płuc.
-    Zawiera zarówno dane wejściowe jak i wyniki predykcji.
-    """
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-
-    # Cechy wejściowe
-    gender = db.Column(db.String(1))
-    age = db.Column(db.Integer)
-    smoking = db.Column(db.Integer)
-    yellow_fingers = db.Column(db.Integer)
-    anxiety = db.Column(db.Integer)
-    peer_pressure = db.Column(db.Integer)
-    chronic_disease = db.Column(db.Integer)
-    fatigue = db.Column(db.Integer)
-    allergy = db.Column(db.Integer)
-    wheezing = db.Column(db.Integer)
-    alcohol_consuming = db.Column(db.Integer)
-    coughing = db.Column(db.Integer)
-    shortness_of_breath = db.Column(db.Integer)
-    swallowing_difficulty = db.Column(db.Integer)
-    chest_pain = db.Column(db.Integer)
-
-    # Predykcje
-    rf_prediction = db.Column(db.Integer)
-    rf_probability = db.Column(db.Float)
-    lr_prediction = db.Column(db.Integer)
-    lr_probability = db.Column(db.Float)
-    dt_prediction = db.Column(db.Integer)
-    dt_probability = db.Column(db.Float)
\ No newline at end of file
+from datetime import datetime
+from flask_sqlalchemy import SQLAlchemy
+from flask_login import UserMixin
+import numpy as np
+from passwords import password_hasher
+
+# Inicjalizacja obiektu bazy danych
+db = SQLAlchemy()
+
+# Typ wartości w spakowanym wektorze cech predykcji
+FEATURE_DTYPE = '<f8'
+
+class User(UserMixin, db.Model):
+    """
+    Model użytkownika systemu przechowujący podstawowe informacje oraz relacje z predykcjami.
+    Atrybuty:
+       id: Unikalny identyfikator użytkownika
+       username: Nazwa użytkownika (max 80 znaków)
+       email: Email użytkownika (max 120 znaków)
+       password_hash: Zahashowane hasło
+
+   Relacje:
+       predictions: Relacja z predykcjami dla wszystkich zbiorów danych
+
+   Dziedziczy po UserMixin aby zapewnić integrację z Flask-Login.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(255))
+    predictions = db.relationship('Prediction', backref='user', lazy=True)
+
+    def set_password(self, password):
+        """
+        Hashuje i zapisuje hasło użytkownika
+        """
+        self.password_hash = password_hasher.hash(password)
+
+    def check_password(self, password):
+        """
+        Weryfikuje hasło użytkownika
+        """
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """
+        Czy hasło zahashowano inną metodą lub kosztem niż obecnie skonfigurowane
+        """
+        return password_hasher.needs_rehash(self.password_hash)
+
+class Prediction(db.Model):
+    """
+    Model przechowujący predykcje dla wszystkich zbiorów danych w jednej tabeli.
+    Cechy wejściowe zapisywane są jako spakowany wektor float64 w kolejności cech
+    ze schematu danego zbioru (schema.py), więc nowy zbiór danych nie wymaga nowej tabeli.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    dataset = db.Column(db.String(32), nullable=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Cechy wejściowe (spakowany wektor, zob. pack_features)
+    features = db.Column(db.LargeBinary, nullable=False)
+
+    # Predykcje
+    rf_prediction = db.Column(db.Integer)
+    rf_probability = db.Column(db.Float)
+    lr_prediction = db.Column(db.Integer)
+    lr_probability = db.Column(db.Float)
+    dt_prediction = db.Column(db.Integer)
+    dt_probability = db.Column(db.Float)
+
+    # Wersja modeli, które wykonały predykcję (zob. model_store.py)
+    model_version = db.Column(db.String(64))
+
+    __table_args__ = (
+        # Indeks pod stronicowanie historii (kolejność malejąca po timestamp, id)
+        db.Index('ix_prediction_user_dataset_timestamp_id', 'user_id', 'dataset', 'timestamp', 'id'),
+    )
+
+    @staticmethod
+    def pack_features(values):
+        """Pakuje wartości cech do postaci binarnej (float64, little-endian)"""
+        return np.asarray(values, dtype=FEATURE_DTYPE).tobytes()
+
+    @staticmethod
+    def unpack_features(blob):
+        """Rozpakowuje wektor cech zapisany przez pack_features"""
+        return np.frombuffer(blob, dtype=FEATURE_DTYPE)
+
+    def feature_values(self):
+        """Zwraca wartości cech jako tablicę NumPy"""
+        return self.unpack_features(self.features)
+
+    def features_dict(self, feature_names):
+        """Zwraca słownik nazwa cechy -> wartość dla podanych nazw cech"""
+        return dict(zip(feature_names, self.feature_values().tolist()))
+
+class PredictionOutcome(db.Model):
+    """
+    Potwierdzony rzeczywisty wynik (etykieta) dla zapisanej predykcji.
+    Predykcje z etykietą służą do przyrostowego douczania modeli
+    (python multi-dataset-predictor.py incremental).
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    dataset = db.Column(db.String(32), nullable=False)
+    prediction_id = db.Column(db.Integer, nullable=False)
+    label = db.Column(db.Integer, nullable=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.UniqueConstraint('dataset', 'prediction_id'),)
+
+class FeatureLayout(db.Model):
+    """
+    Wersja schematu cech (schema.FeatureSchema.version), w której zapisane są wektory
+    cech predykcji danego zbioru danych. Brak wpisu oznacza predykcje zapisane
+    przed wprowadzeniem wspólnego schematu (zob. migrate_predictions.upgrade_feature_layouts).
+    """
+    dataset = db.Column(db.String(32), primary_key=True)
+    schema_version = db.Column(db.String(16), nullable=False)
@@ -6,7 +6,71 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report
 import joblib
+import numpy as np
+import argparse
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from compiled import COMPILED_DIR, compile_model, compiled_leaf_dtypes, save_compiled
+from compaction import (COMPACTION_VARIANTS, choose_variant, compact_model, compiled_accuracy, effective_tolerance,
+                        format_params, print_report)
+from tuning import PARAM_GRIDS, FoldResultCache, tune_estimator
+from dataset_cache import DatasetCache, file_hash
+from model_store import ModelStore
+from schema import DATASETS_CONFIG, SCHEMAS
+from incremental import (DEFAULT_DATABASE_URL, stream_labelled_rows, merge_feature_values, remap_tree_thresholds,
+                         remap_linear, load_training_state, save_training_state, load_reference_values,
+                         save_reference_values)
+
+# Nazwy trenowanych modeli
+MODEL_NAMES = ('rf', 'lr', 'dt')
+
+# Liczba zachowywanych wersji modeli każdego zbioru danych (starsze usuwane po zapisie nowej)
+MODEL_VERSIONS_KEPT = 5
+
+
+def build_model(model_name, n_jobs=None):
+    """
+    Tworzy niewytrenowany model o podanej nazwie.
+    n_jobs dotyczy tylko lasu losowego (liczba równolegle budowanych drzew).
+    """
+    if model_name == 'rf':
+        return RandomForestClassifier(random_state=42, n_jobs=n_jobs)
+    if model_name == 'lr':
+        return LogisticRegression(random_state=42, max_iter=1000)
+    if model_name == 'dt':
+        return DecisionTreeClassifier(random_state=42)
+    raise ValueError(f"Nieznany model: {model_name}")
+
+
+def train_pair(dataset_name, model_name, X_train, y_train, X_test, y_test, n_jobs):
+    """
+    Trenuje jeden model dla jednego zbioru danych (wywoływane w procesie puli).
+    Zwraca wytrenowany model oraz czasy trenowania i oceny.
+    """
+    model = build_model(model_name, n_jobs=n_jobs)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    test_score = model.score(X_test, y_test)
+    score_time = time.perf_counter() - start
+
+    # Predykcje w aplikacji wykonywane są jednym wątkiem
+    if model_name == 'rf':
+        model.set_params(n_jobs=None)
+
+    return {
+        'dataset': dataset_name,
+        'model_name': model_name,
+        'model': model,
+        'fit_time': fit_time,
+        'score_time': score_time,
+        'test_score': test_score
+    }
 
 
 class MultiDatasetPredictor:
@@ -15,64 +79,8 @@ class MultiDatasetPredictor:
         dla różnych zbiorów danych medycznych (choroby serca, cukrzyca, rak płuc).
         """
 
-    # Konfiguracja zbiorów danych - definiuje ścieżki, kolumny docelowe i cechy dla każdego zbioru
-    DATASETS_CONFIG = {
-        'heart_disease': {
-            'path': 'datasets/heart-disease.csv',
-            'target': 'target', # Kolumna zawierająca etykiety (0/1)
-            'features': [
-                # Lista krotek (nazwa_cechy, opis) dla chorób serca
-                ('age', 'Wiek pacjenta'),
-                ('sex', 'Płeć pacjenta (0 = kobieta, 1 = mężczyzna)'),
-                ('cp', 'Typ bólu w klatce piersiowej'),
-                ('trestbps', 'Ciśnienie tętnicze krwi w spoczynku'),
-                ('chol', 'Poziom cholesterolu'),
-                ('fbs', 'Cukier we krwi na czczo'),
-                ('restecg', 'Wyniki EKG spoczynkowego'),
-                ('thalach', 'Maksymalne tętno'),
-                ('exang', 'Dławica wysiłkowa'),
-                ('oldpeak', 'Obniżenie odcinka ST'),
-                ('slope', 'Nachylenie odcinka ST'),
-                ('ca', 'Liczba głównych naczyń wieńcowych'),
-                ('thal', 'Wynik testu Thallium')
-            ]
-        },
-        'diabetes': {
-            'path': 'datasets/diabetes.csv',
-            'target': 'Outcome',
-            'features': [
-                ('Pregnancies', 'Liczba ciąż'),
-                ('Glucose', 'Poziom glukozy'),
-                ('BloodPressure', 'Ciśnienie krwi'),
-                ('SkinThickness', 'Grubość fałdu skórnego'),
-                ('Insulin', 'Poziom insuliny'),
-                ('BMI', 'Wskaźnik masy ciała'),
-                ('DiabetesPedigreeFunction', 'Funkcja rodowodu cukrzycy'),
-                ('Age', 'Wiek')
-            ]
-        },
-        'lung_cancer': {
-            'path': 'datasets/survey-lung-cancer.csv',
-            'target': 'LUNG_CANCER',
-            'features': [
-                ('GENDER', 'Płeć (M/F)'),
-                ('AGE', 'Wiek'),
-                ('SMOKING', 'Palenie tytoniu (1-2)'),
-                ('YELLOW_FINGERS', 'Żółte palce (1-2)'),
-                ('ANXIETY', 'Niepokój (1-2)'),
-                ('PEER_PRESSURE', 'Presja rówieśników (1-2)'),
-                ('CHRONIC DISEASE', 'Choroba przewlekła (1-2)'),
-                ('FATIGUE', 'Zmęczenie (1-2)'),
-                ('ALLERGY', 'Alergia (1-2)'),
-                ('WHEEZING', 'Świszczący oddech (1-2)'),
-                ('ALCOHOL CONSUMING', 'Spożywanie alkoholu (1-2)'),
-                ('COUGHING', 'Kaszel (1-2)'),
-                ('SHORTNESS OF BREATH', 'Duszność (1-2)'),
-                ('SWALLOWING DIFFICULTY', 'Trudności w połykaniu (1-2)'),
-                ('CHEST PAIN', 'Ból w klatce piersiowej (1-2)')
-            ]
-        }
-    }
+    # Konfiguracja zbiorów danych - ścieżki, kolumny docelowe i cechy (wspólna z aplikacją, zob. schema.py)
+    DATASETS_CONFIG = DATASETS_CONFIG
 
     def __init__(self):
         """Inicjalizacja klasy z pustymi atrybutami"""
@@ -85,15 +93,53 @@ class MultiDatasetPredictor:
         self.X_test = None               # Zbiór testowy - cechy
         self.y_train = None              # Zbiór treningowy - etykiety
         self.y_test = None               # Zbiór testowy - etykiety
+        self.training_state = {}         # Stan douczania przyrostowego (punkt kontrolny)
+        self.reference_values = None     # Unikalne wartości cech danych treningowych (zob. update_incrementally)
+        self.leaf_dtypes = {}            # Typ liści drzew w modelach skompilowanych (domyślnie float64)
+        self.compaction = {}             # Wybrane warianty zmniejszonych modeli (zob. compact_models)
 
-    def load_dataset(self, dataset_name):
+    def load_dataset(self, dataset_name, chunksize=None, use_cache=True):
         """
         Wczytuje i przygotowuje wybrany zbiór danych do trenowania.
-
+        Przy podanym chunksize plik wczytywany jest porcjami (zob. load_dataset_chunked).
+        Przetworzone dane zapisywane są w pamięci podręcznej (zob. dataset_cache.py)
+        i ponownie używane, dopóki plik CSV i konfiguracja zbioru się nie zmienią.
         """
         if dataset_name not in self.DATASETS_CONFIG:
             raise ValueError(f"Nieznany zbiór danych: {dataset_name}")
 
+        cache = DatasetCache() if use_cache else None
+        if cache:
+            key = cache.key(self.DATASETS_CONFIG[dataset_name], chunksize=chunksize,
+                            test_size=0.2, random_state=42)
+            cached = cache.load(dataset_name, key)
+            if cached:
+                arrays, self.scaler, meta = cached
+                self.current_dataset = dataset_name
+                self.X_train, self.X_test = arrays['X_train'], arrays['X_test']
+                self.y_train, self.y_test = arrays['y_train'], arrays['y_test']
+                self.X = self.X_scaled = self.y = None
+                print(f"\nZaładowano zbiór danych {dataset_name} z pamięci podręcznej:")
+                print(f"Liczba próbek: {meta['n_samples']} (treningowe: {len(self.y_train)}, "
+                      f"testowe: {len(self.y_test)})")
+                return
+
+        if chunksize:
+            self.load_dataset_chunked(dataset_name, chunksize)
+        else:
+            self.load_dataset_in_memory(dataset_name)
+
+        if cache:
+            cache.store(dataset_name, key, {
+                'X_train': self.X_train, 'X_test': self.X_test,
+                'y_train': np.asarray(self.y_train), 'y_test': np.asarray(self.y_test)
+            }, self.scaler, {'n_samples': len(self.y_train) + len(self.y_test)})
+
+    def load_dataset_in_memory(self, dataset_name):
+        """
+        Wczytuje cały plik CSV do pamięci, standaryzuje cechy i dzieli dane
+        na zbiór treningowy i testowy.
+        """
         config = self.DATASETS_CONFIG[dataset_name]
         self.current_dataset = dataset_name
 
@@ -143,6 +189,74 @@ class MultiDatasetPredictor:
         print(f"Liczba próbek: {len(self.X)}")
         print("Cechy:", ", ".join(self.X.columns))
 
+    def load_dataset_chunked(self, dataset_name, chunksize=100000, test_size=0.2, random_state=42):
+        """
+        Wczytuje duży plik CSV porcjami, bez tworzenia pełnej ramki danych:
+        - cechy wczytywane są od razu jako float32, etykiety jako int8,
+        - kolumny tekstowe kodowane są wektorowo według 'categorical' z konfiguracji,
+        - StandardScaler dopasowywany jest przyrostowo (partial_fit) porcja po porcji,
+        - każdy wiersz trafia losowo do zbioru treningowego lub testowego już przy wczytywaniu.
+        W pamięci pozostają jedynie tablice zbiorów treningowego i testowego.
+        """
+        if dataset_name not in self.DATASETS_CONFIG:
+            raise ValueError(f"Nieznany zbiór danych: {dataset_name}")
+
+        config = self.DATASETS_CONFIG[dataset_name]
+        self.current_dataset = dataset_name
+        feature_columns = [feature[0] for feature in config['features']]
+        target = config['target']
+        categorical = config.get('categorical', {})
+
+        # Jawne typy kolumn - bez późniejszej konwersji kolumna po kolumnie
+        dtypes = {column: 'category' if column in categorical else np.float32 for column in feature_columns}
+        dtypes[target] = 'category' if target in categorical else np.int8
+
+        self.scaler = StandardScaler()
+        rng = np.random.default_rng(random_state)
+        X_parts = {'train': [], 'test': []}
+        y_parts = {'train': [], 'test': []}
+        n_samples = 0
+
+        for chunk in pd.read_csv(config['path'], usecols=feature_columns + [target],
+                                 dtype=dtypes, chunksize=chunksize):
+            for column, mapping in categorical.items():
+                encoded = chunk[column].map(mapping)
+                if encoded.isna().any():
+                    raise ValueError(f"Nieznane wartości w kolumnie {column}")
+                chunk[column] = encoded.astype(np.float32 if column != target else np.int8)
+
+            X_chunk = chunk[feature_columns]
+            self.scaler.partial_fit(X_chunk)
+
+            X_values = X_chunk.to_numpy(dtype=np.float32)
+            y_values = chunk[target].to_numpy(dtype=np.int8)
+            is_test = rng.random(len(chunk)) < test_size
+            X_parts['train'].append(X_values[~is_test])
+            X_parts['test'].append(X_values[is_test])
+            y_parts['train'].append(y_values[~is_test])
+            y_parts['test'].append(y_values[is_test])
+            n_samples += len(chunk)
+
+        if n_samples == 0:
+            raise ValueError(f"Zbiór danych {dataset_name} jest pusty")
+
+        # Skalowanie w miejscu, w precyzji float32
+        mean = self.scaler.mean_.astype(np.float32)
+        scale = self.scaler.scale_.astype(np.float32)
+        self.X_train = np.concatenate(X_parts['train'])
+        self.X_test = np.concatenate(X_parts['test'])
+        for X in (self.X_train, self.X_test):
+            X -= mean
+            X /= scale
+        self.y_train = np.concatenate(y_parts['train'])
+        self.y_test = np.concatenate(y_parts['test'])
+        self.X = self.X_scaled = self.y = None
+
+        print(f"\nZaładowano porcjami zbiór danych {dataset_name}:")
+        print(f"Liczba cech: {len(feature_columns)}")
+        print(f"Liczba próbek: {n_samples} (treningowe: {len(self.y_train)}, testowe: {len(self.y_test)})")
+        print("Cechy:", ", ".join(feature_columns))
+
     def train_models(self):
         """
         Trenuje trzy różne modele klasyfikacji:
@@ -156,9 +270,8 @@ class MultiDatasetPredictor:
         print(f"\nRozpoczęto trenowanie modeli dla zbioru {self.current_dataset}...")
 
         # Inicjalizacja i trenowanie modeli
-        self.models['rf'] = RandomForestClassifier(random_state=42)
-        self.models['lr'] = LogisticRegression(random_state=42, max_iter=1000)
-        self.models['dt'] = DecisionTreeClassifier(random_state=42)
+        for model_name in MODEL_NAMES:
+            self.models[model_name] = build_model(model_name)
 
         # Trenowanie każdego modelu i wyświetlanie wyników
         for name, model in self.models.items():
@@ -172,6 +285,173 @@ class MultiDatasetPredictor:
             print(f"Dokładność na zbiorze treningowym: {train_score:.4f}")
             print(f"Dokładność na zbiorze testowym: {test_score:.4f}")
 
+    def tune_models(self, search='grid', folds=5, n_jobs=-1, cache_dir='cache/tuning'):
+        """
+        Dobiera hiperparametry modeli walidacją krzyżową na zbiorze treningowym
+        (siatka parametrów lub sukcesywne połowienie). Wyniki foldów zapisywane są
+        w pamięci podręcznej na dysku, więc ponowne uruchomienia pomijają policzone konfiguracje.
+        Najlepsze modele są trenowane na całym zbiorze treningowym.
+        """
+        if self.current_dataset is None:
+            raise ValueError("Najpierw wybierz zbiór danych!")
+
+        print(f"\nDobór hiperparametrów dla zbioru {self.current_dataset} ({search}, {folds} foldów)...")
+        cache = FoldResultCache(cache_dir)
+
+        for model_name in MODEL_NAMES:
+            start = time.perf_counter()
+            hits, misses = cache.hits, cache.misses
+            best_params, best_score, history = tune_estimator(
+                build_model(model_name), PARAM_GRIDS[model_name], self.X_train, self.y_train,
+                cache, search=search, folds=folds, n_jobs=n_jobs
+            )
+
+            model = build_model(model_name).set_params(**best_params)
+            model.fit(self.X_train, self.y_train)
+            self.models[model_name] = model
+
+            print(f"\n=== {model_name.upper()} ===")
+            print(f"Najlepsze parametry: {best_params}")
+            print(f"Średnia dokładność CV: {best_score:.4f}")
+            print(f"Dokładność na zbiorze testowym: {model.score(self.X_test, self.y_test):.4f}")
+            print(f"Ocenione konfiguracje: {len(history)}, foldy z pamięci podręcznej: "
+                  f"{cache.hits - hits}, policzone: {cache.misses - misses}, "
+                  f"czas: {time.perf_counter() - start:.2f} s")
+
+    def compact_models(self, tolerance=0.01, model_names=('rf', 'dt')):
+        """
+        Zmniejsza wytrenowane modele drzewiaste: trenuje warianty z COMPACTION_VARIANTS
+        (mniej drzew, ograniczona głębokość i wielkość liści, przycinanie ccp_alpha),
+        każdy ocenia z liśćmi float64 i float32, a następnie wyświetla dokładność walidacji
+        krzyżowej na zbiorze treningowym, rozmiar, pamięć i opóźnienie predykcji. Model zastępowany
+        jest wariantem o najmniejszej pamięci, którego dokładność CV jest niższa od bazowej najwyżej
+        o tolerance (co najmniej jedną próbkę). Zbiór testowy służy tylko do oceny wybranego wariantu.
+        Zwraca słownik model -> lista wyników wariantów.
+        """
+        if not self.models:
+            raise ValueError("Najpierw wytreniuj modele!")
+
+        n_samples = len(self.y_train)
+        tolerance = effective_tolerance(tolerance, n_samples)
+        print(f"\nZmniejszanie modeli dla zbioru {self.current_dataset} (tolerancja dokładności {tolerance:.4f}, "
+              f"{tolerance * n_samples:.1f} z {n_samples} próbek walidacji krzyżowej)...")
+        report = {}
+        for model_name in model_names:
+            results, models = compact_model(self.models[model_name], COMPACTION_VARIANTS[model_name],
+                                            self.X_train, self.y_train)
+            chosen = choose_variant(results, tolerance)
+            print_report(model_name, results, chosen)
+
+            self.models[model_name] = models[chosen]
+            self.leaf_dtypes[model_name] = np.dtype(results[chosen]['leaf_dtype']).type
+            results[chosen]['test_accuracy'] = compiled_accuracy(
+                compile_model(models[chosen], self.leaf_dtypes[model_name]), self.X_test, self.y_test)
+            self.compaction[model_name] = results[chosen]
+            report[model_name] = results
+            print(f"Wybrany wariant: {format_params(results[chosen]['params'])}, liście {results[chosen]['leaf_dtype']} "
+                  f"(pamięć {results[chosen]['memory_bytes'] / results[0]['memory_bytes']:.1%} modelu bazowego), "
+                  f"dokładność testowa {results[chosen]['test_accuracy']:.4f}")
+        return report
+
+    def reference_feature_values(self, dataset_name, chunksize=100000):
+        """
+        Posortowane unikalne wartości każdej cechy pliku CSV zbioru (zakodowane jak przy
+        trenowaniu), wczytywane porcjami - wartości referencyjne dla remap_tree_thresholds.
+        """
+        schema = SCHEMAS[dataset_name]
+        values = None
+        for chunk in pd.read_csv(self.DATASETS_CONFIG[dataset_name]['path'], chunksize=chunksize):
+            values = merge_feature_values(values, schema.encode_frame(chunk))
+        return values
+
+    def update_incrementally(self, dataset_name, database_url=DEFAULT_DATABASE_URL,
+                             new_trees=10, lr_max_iter=100, chunk_size=1000):
+        """
+        Douczanie zapisanych modeli na nowych wierszach z historii predykcji,
+        dla których potwierdzono rzeczywisty wynik (od ostatniego punktu kontrolnego).
+        - skaler aktualizowany jest przez partial_fit, a progi drzew i współczynniki
+          regresji przeliczane są do nowej skali; progi drzew dosuwane są tak, aby próbki
+          z pliku CSV i z całej historii wyników trafiały do tych samych liści co przed zmianą
+          (unikalne wartości cech tych próbek zapisywane są z modelami i uzupełniane o nowe wiersze),
+        - las losowy rozbudowywany jest o new_trees drzew (warm_start) trenowanych na nowych danych,
+        - regresja logistyczna startuje od poprzednich współczynników (warm_start),
+        - drzewo decyzyjne nie ma wariantu przyrostowego i pozostaje bez zmian.
+        Koszt zależy od liczby nowych wierszy, a nie od całej historii. Jedynie dla modeli
+        zapisanych bez wartości referencyjnych są one jednorazowo zbierane z pliku CSV i historii
+        sprzed punktu kontrolnego.
+        """
+        if dataset_name not in self.DATASETS_CONFIG:
+            raise ValueError(f"Nieznany zbiór danych: {dataset_name}")
+
+        model_dir = ModelStore().current_dir(dataset_name)
+        self.current_dataset = dataset_name
+        self.models = {name: joblib.load(f'{model_dir}/{name}_model.joblib') for name in MODEL_NAMES}
+        self.scaler = joblib.load(f'{model_dir}/scaler.joblib')
+        self.training_state = load_training_state(model_dir)
+        self.reference_values = load_reference_values(model_dir)
+        # Zmniejszone modele zachowują typ liści przy ponownym eksporcie (zob. compact_models)
+        self.leaf_dtypes = compiled_leaf_dtypes(model_dir)
+        feature_columns = [feature[0] for feature in self.DATASETS_CONFIG[dataset_name]['features']]
+
+        old_mean, old_scale = self.scaler.mean_.copy(), self.scaler.scale_.copy()
+        last_outcome_id = self.training_state.get('last_outcome_id', 0)
+        if self.reference_values is None:
+            # Modele zapisane bez wartości referencyjnych - jednorazowe zebranie ich z pliku CSV
+            # i z historii wyników, na której modele były już douczane
+            self.reference_values = self.reference_feature_values(dataset_name)
+            if last_outcome_id:
+                for _, X_chunk, _ in stream_labelled_rows(database_url, dataset_name, 0, chunk_size,
+                                                          until_id=last_outcome_id):
+                    self.reference_values = merge_feature_values(self.reference_values, X_chunk)
+
+        # Strumieniowe wczytanie nowych wierszy i aktualizacja statystyk skalera porcja po porcji
+        X_chunks, y_chunks = [], []
+        for outcome_ids, X_chunk, y_chunk in stream_labelled_rows(
+                database_url, dataset_name, last_outcome_id, chunk_size):
+            self.reference_values = merge_feature_values(self.reference_values, X_chunk)
+            self.scaler.partial_fit(pd.DataFrame(X_chunk, columns=feature_columns))
+            X_chunks.append(X_chunk)
+            y_chunks.append(y_chunk)
+            last_outcome_id = int(outcome_ids[-1])
+
+        if not X_chunks:
+            print(f"\nBrak nowych wierszy z potwierdzonym wynikiem dla zbioru {dataset_name}.")
+            return False
+
+        X_new = np.vstack(X_chunks)
+        y_new = np.concatenate(y_chunks)
+        print(f"\nDouczanie modeli dla zbioru {dataset_name} na {len(y_new)} nowych wierszach...")
+
+        # Przeliczenie istniejących modeli do nowej skali danych
+        new_mean, new_scale = self.scaler.mean_, self.scaler.scale_
+        for estimator in self.models['rf'].estimators_ + [self.models['dt']]:
+            remap_tree_thresholds(estimator, old_mean, old_scale, new_mean, new_scale, self.reference_values)
+        remap_linear(self.models['lr'], old_mean, old_scale, new_mean, new_scale)
+
+        X_new_scaled = self.scaler.transform(pd.DataFrame(X_new, columns=feature_columns))
+
+        # Nowe drzewa i aktualizacja regresji wymagają obu klas w nowych danych
+        if set(np.unique(y_new)) == set(self.models['rf'].classes_):
+            rf = self.models['rf']
+            rf.set_params(warm_start=True, n_estimators=len(rf.estimators_) + new_trees)
+            rf.fit(X_new_scaled, y_new)
+            rf.set_params(warm_start=False)
+
+            lr = self.models['lr']
+            lr.set_params(warm_start=True, max_iter=lr_max_iter)
+            lr.fit(X_new_scaled, y_new)
+            lr.set_params(warm_start=False)
+            print(f"Las losowy: {len(rf.estimators_)} drzew, regresja logistyczna zaktualizowana")
+        else:
+            print("Nowe wiersze zawierają tylko jedną klasę - zaktualizowano jedynie skaler")
+
+        self.training_state = {
+            'last_outcome_id': last_outcome_id,
+            'rows_applied': self.training_state.get('rows_applied', 0) + len(y_new)
+        }
+        self.save_models_atomic()
+        return True
+
     def evaluate_models(self):
         """
         Przeprowadza szczegółową ewaluację wytrenowanych modeli,
@@ -191,7 +471,7 @@ class MultiDatasetPredictor:
             print("\nRaport klasyfikacji:")
             print(classification_report(self.y_test, y_pred))
 
-    def save_models(self):
+    def save_models(self, model_dir=None):
         """
         Zapisuje wytrenowane modele i skaler do plików.
         Tworzy osobny katalog dla każdego zbioru danych.
@@ -201,22 +481,116 @@ class MultiDatasetPredictor:
             return
 
         # Tworzenie katalogu dla modeli
-        model_dir = f'models/{self.current_dataset}'
+        model_dir = model_dir or f'models/{self.current_dataset}'
         os.makedirs(model_dir, exist_ok=True)
 
-        # Zapisywanie modeli
+        # Zapisywanie modeli bez kompresji - tablice NumPy zapisywane są w surowej postaci,
+        # dzięki czemu aplikacja może je mapować do pamięci (joblib.load(..., mmap_mode='r'))
         for model_name, model in self.models.items():
             model_path = f'{model_dir}/{model_name}_model.joblib'
-            joblib.dump(model, model_path)
+            joblib.dump(model, model_path, compress=0)
             print(f"Zapisano model {model_name} do {model_path}")
 
         # Zapisywanie skalera
         scaler_path = f'{model_dir}/scaler.joblib'
-        joblib.dump(self.scaler, scaler_path)
+        joblib.dump(self.scaler, scaler_path, compress=0)
         print(f"Zapisano skaler do {scaler_path}")
 
+        # Schemat cech, na którym trenowano modele - sprawdzany przy ładowaniu modeli w aplikacji
+        SCHEMAS[self.current_dataset].save(model_dir)
+
+        # Eksport modeli do postaci tablic NumPy używanej przez aplikację
+        self.export_compiled_models(model_dir)
+
+        # Zapis punktu kontrolnego douczania razem z modelami, których dotyczy. Modele wytrenowane
+        # od zera (bez punktu kontrolnego) zapisują wartości cech pliku CSV jako wartości referencyjne.
+        if self.training_state:
+            save_training_state(model_dir, self.training_state)
+        if self.reference_values is None and not self.training_state.get('last_outcome_id'):
+            self.reference_values = self.reference_feature_values(self.current_dataset)
+        if self.reference_values is not None:
+            save_reference_values(model_dir, self.reference_values)
+
         print(f"\nWszystkie modele dla zbioru {self.current_dataset} zostały zapisane!")
 
+    def save_models_atomic(self, manifest=None):
+        """
+        Zapisuje modele jako nową wersję w magazynie modeli (models/<zbiór_danych>/versions/<wersja>)
+        z manifestem (wersja, skrót danych, metryki) i dopiero po udanym zapisie atomowo
+        ustawia ją jako aktywną. Przerwany zapis nie zmienia aktywnych modeli, a działająca
+        aplikacja przełącza się na nową wersję bez restartu (zob. ModelRegistry.start_watcher).
+        Pola podane w manifest zastępują wartości wyliczone z bieżących danych.
+        Zwraca identyfikator wersji.
+        """
+        if not self.models:
+            print("Najpierw wytreniuj modele!")
+            return
+
+        config = self.DATASETS_CONFIG[self.current_dataset]
+        manifest = {
+            'data_path': config['path'],
+            'data_hash': file_hash(config['path']) if os.path.exists(config['path']) else None,
+            'schema_version': SCHEMAS[self.current_dataset].version,
+            'metrics': self.test_metrics(),
+            'training_state': self.training_state or None,
+            'compaction': self.compaction or None,
+            **(manifest or {})
+        }
+        store = ModelStore()
+        version = store.publish(self.current_dataset, self.save_models, manifest)
+        store.prune(self.current_dataset, keep=MODEL_VERSIONS_KEPT)
+        print(f"Aktywna wersja modeli {self.current_dataset}: {version}")
+        return version
+
+    def test_metrics(self):
+        """Dokładność modeli na zbiorze testowym (pusty słownik, gdy dane testowe nie są wczytane)"""
+        if self.X_test is None or self.y_test is None:
+            return {}
+        return {name: float(model.score(self.X_test, self.y_test)) for name, model in self.models.items()}
+
+    def export_compiled_models(self, model_dir=None):
+        """
+        Zapisuje wytrenowane modele i skaler jako płaskie tablice NumPy
+        (węzły drzew, progi, wartości liści, współczynniki regresji).
+        Aplikacja wykonuje na nich predykcje bez narzutu wywołań sklearn.
+        """
+        if not self.models:
+            print("Najpierw wytreniuj modele!")
+            return
+
+        model_dir = model_dir or f'models/{self.current_dataset}'
+        compiled_dir = f'{model_dir}/{COMPILED_DIR}'
+        save_compiled({**self.models, 'scaler': self.scaler}, compiled_dir, self.leaf_dtypes)
+        print(f"Wyeksportowano modele w postaci tablic do {compiled_dir}")
+
+    def export_saved_models(self, dataset_name):
+        """
+        Eksportuje do postaci tablic aktywne modele zbioru danych, bez ponownego trenowania.
+        Wynik zapisywany jest jako nowa wersja (z tablicami compiled i schematem cech),
+        bo katalogi istniejących wersji nie są zmieniane. Dane treningowe i metryki przejmowane
+        są z manifestu eksportowanej wersji; dla modeli zapisanych bez wersjonowania są nieznane.
+        """
+        if dataset_name not in self.DATASETS_CONFIG:
+            raise ValueError(f"Nieznany zbiór danych: {dataset_name}")
+
+        store = ModelStore()
+        source_version = store.current_version(dataset_name)
+        source = store.manifest(dataset_name, source_version) if source_version else {}
+        model_dir = store.current_dir(dataset_name)
+        self.current_dataset = dataset_name
+        self.models = {name: joblib.load(f'{model_dir}/{name}_model.joblib') for name in MODEL_NAMES}
+        self.scaler = joblib.load(f'{model_dir}/scaler.joblib')
+        self.training_state = load_training_state(model_dir)
+        self.reference_values = load_reference_values(model_dir)
+        # Zmniejszone modele zachowują typ liści przy ponownym eksporcie (zob. compact_models)
+        self.leaf_dtypes = compiled_leaf_dtypes(model_dir)
+        SCHEMAS[dataset_name].check_artifacts(model_dir, self.scaler)
+        self.save_models_atomic({
+            'data_path': source.get('data_path'),
+            'data_hash': source.get('data_hash'),
+            'metrics': source.get('metrics', {})
+        })
+
     def get_features(self):
         """
         Zwraca listę cech dla aktualnego zbioru danych
@@ -226,10 +600,9 @@ class MultiDatasetPredictor:
         return self.DATASETS_CONFIG[self.current_dataset]['features']
 
 
-def main():
+def interactive_menu():
     """
-    Główna funkcja programu oferująca interfejs konsolowy
-    do interakcji z systemem trenowania modeli.
+    Interfejs konsolowy do interakcji z systemem trenowania modeli.
     """
     predictor = MultiDatasetPredictor()
 
@@ -273,7 +646,7 @@ def main():
         elif choice == '4':
             # Zapisywanie modeli
             try:
-                predictor.save_models()
+                predictor.save_models_atomic()
             except Exception as e:
                 print(f"\nBłąd podczas zapisywania modeli: {str(e)}")
 
@@ -285,5 +658,186 @@ def main():
             print("\nNieprawidłowy wybór. Spróbuj ponownie.")
 
 
+def train_all(dataset_names=None, workers=None, n_jobs=None, chunksize=None, use_cache=True):
+    """
+    Nieinteraktywne trenowanie wszystkich par (zbiór danych, model) w puli procesów.
+    Każdy zbiór danych zapisywany jest atomowo po wytrenowaniu wszystkich jego modeli.
+    Na koniec wyświetlane jest zestawienie czasów dla każdej pary.
+    """
+    dataset_names = list(dataset_names or MultiDatasetPredictor.DATASETS_CONFIG.keys())
+    workers = workers or os.cpu_count() or 1
+    # Domyślnie rdzenie nieużywane przez pulę procesów przypadają na drzewa lasu losowego
+    n_jobs = n_jobs or max(1, (os.cpu_count() or 1) // workers)
+    total_start = time.perf_counter()
+
+    # Wczytanie zbiorów danych w procesie głównym - każdy zbiór wczytywany jest raz
+    predictors = {}
+    load_times = {}
+    for dataset_name in dataset_names:
+        start = time.perf_counter()
+        predictor = MultiDatasetPredictor()
+        predictor.load_dataset(dataset_name, chunksize=chunksize, use_cache=use_cache)
+        predictors[dataset_name] = predictor
+        load_times[dataset_name] = time.perf_counter() - start
+
+    print(f"\nTrenowanie {len(dataset_names) * len(MODEL_NAMES)} modeli "
+          f"(procesy: {workers}, n_jobs lasu losowego: {n_jobs})...")
+
+    results = []
+    save_times = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for dataset_name, predictor in predictors.items():
+            for model_name in MODEL_NAMES:
+                future = executor.submit(
+                    train_pair, dataset_name, model_name,
+                    predictor.X_train, predictor.y_train, predictor.X_test, predictor.y_test, n_jobs
+                )
+                futures[future] = time.perf_counter()
+
+        for future in as_completed(futures):
+            result = future.result()
+            result['wall_time'] = time.perf_counter() - futures[future]
+            results.append(result)
+
+            predictor = predictors[result['dataset']]
+            predictor.models[result['model_name']] = result['model']
+
+            # Zapis zbioru danych, gdy wszystkie jego modele są gotowe
+            if len(predictor.models) == len(MODEL_NAMES):
+                start = time.perf_counter()
+                predictor.models = {name: predictor.models[name] for name in MODEL_NAMES}
+                predictor.save_models_atomic()
+                save_times[result['dataset']] = time.perf_counter() - start
+
+    total_time = time.perf_counter() - total_start
+    fit_total = sum(result['fit_time'] for result in results)
+
+    print(f"\n{'Zbiór danych':<15} {'Model':<6} {'Wczytanie [s]':>14} {'Trenowanie [s]':>15} "
+          f"{'Ocena [s]':>10} {'Od zlecenia [s]':>16} {'Zapis [s]':>10} {'Dokł. test':>11}")
+    for result in sorted(results, key=lambda r: (r['dataset'], MODEL_NAMES.index(r['model_name']))):
+        dataset_name = result['dataset']
+        print(f"{dataset_name:<15} {result['model_name']:<6} {load_times[dataset_name]:>14.3f} "
+              f"{result['fit_time']:>15.3f} {result['score_time']:>10.3f} {result['wall_time']:>16.3f} "
+              f"{save_times.get(dataset_name, 0.0):>10.3f} {result['test_score']:>11.4f}")
+
+    print(f"\nCzas całkowity: {total_time:.3f} s")
+    print(f"Suma czasów trenowania: {fit_total:.3f} s "
+          f"(przyspieszenie względem sekwencyjnego: {fit_total / total_time:.2f}x przy {workers} procesach)")
+    return results
+
+
+def build_parser():
+    """Tworzy parser argumentów wiersza poleceń"""
+    parser = argparse.ArgumentParser(
+        description="System trenowania modeli dla wielu zbiorów danych. "
+                    "Uruchomiony bez argumentów wyświetla menu interaktywne."
+    )
+    subparsers = parser.add_subparsers(dest='command')
+
+    export_parser = subparsers.add_parser('export', help='Eksport zapisanych modeli do postaci tablic NumPy')
+    export_parser.add_argument('datasets', nargs='*', help='Zbiory danych (domyślnie wszystkie)')
+
+    train_parser = subparsers.add_parser('train-all', help='Trenowanie wszystkich modeli dla wszystkich zbiorów danych')
+    train_parser.add_argument('datasets', nargs='*', help='Zbiory danych (domyślnie wszystkie)')
+    train_parser.add_argument('--workers', type=int, default=None,
+                              help='Liczba procesów puli (domyślnie liczba rdzeni)')
+    train_parser.add_argument('--n-jobs', type=int, default=None,
+                              help='Liczba wątków lasu losowego (domyślnie rdzenie / procesy)')
+    train_parser.add_argument('--chunksize', type=int, default=None,
+                              help='Wczytywanie plików CSV porcjami o podanej liczbie wierszy')
+    train_parser.add_argument('--no-cache', action='store_true',
+                              help='Nie używaj pamięci podręcznej przetworzonych danych')
+
+    tune_parser = subparsers.add_parser('tune', help='Dobór hiperparametrów z walidacją krzyżową')
+    tune_parser.add_argument('datasets', nargs='*', help='Zbiory danych (domyślnie wszystkie)')
+    tune_parser.add_argument('--search', choices=['grid', 'halving'], default='grid',
+                             help='Metoda przeszukiwania (siatka lub sukcesywne połowienie)')
+    tune_parser.add_argument('--folds', type=int, default=5, help='Liczba foldów walidacji krzyżowej')
+    tune_parser.add_argument('--n-jobs', type=int, default=-1, help='Liczba równoległych procesów')
+    tune_parser.add_argument('--cache-dir', default='cache/tuning', help='Katalog pamięci podręcznej wyników')
+    tune_parser.add_argument('--no-save', action='store_true', help='Nie zapisuj najlepszych modeli')
+    tune_parser.add_argument('--chunksize', type=int, default=None,
+                             help='Wczytywanie plików CSV porcjami o podanej liczbie wierszy')
+    tune_parser.add_argument('--no-cache', action='store_true',
+                             help='Nie używaj pamięci podręcznej przetworzonych danych')
+
+    compact_parser = subparsers.add_parser(
+        'compact', help='Trenowanie i zmniejszanie modeli drzewiastych z raportem dokładności i opóźnień')
+    compact_parser.add_argument('datasets', nargs='*', help='Zbiory danych (domyślnie wszystkie)')
+    compact_parser.add_argument('--tolerance', type=float, default=0.01,
+                                help='Dopuszczalny spadek dokładności walidacji krzyżowej względem modelu bazowego')
+    compact_parser.add_argument('--report', help='Plik JSON z wynikami wszystkich wariantów')
+    compact_parser.add_argument('--no-save', action='store_true', help='Nie zapisuj wybranych modeli')
+    compact_parser.add_argument('--no-cache', action='store_true',
+                                help='Nie używaj pamięci podręcznej przetworzonych danych')
+
+    incremental_parser = subparsers.add_parser(
+        'incremental', help='Douczanie modeli na nowych wierszach z historii predykcji')
+    incremental_parser.add_argument('datasets', nargs='*', help='Zbiory danych (domyślnie wszystkie)')
+    incremental_parser.add_argument('--database-url', default=DEFAULT_DATABASE_URL, help='Adres bazy danych')
+    incremental_parser.add_argument('--new-trees', type=int, default=10,
+                                    help='Liczba drzew dodawanych do lasu losowego')
+    incremental_parser.add_argument('--lr-max-iter', type=int, default=100,
+                                    help='Maksymalna liczba iteracji regresji logistycznej')
+    incremental_parser.add_argument('--chunk-size', type=int, default=1000,
+                                    help='Liczba wierszy odczytywanych z bazy w jednej porcji')
+
+    return parser
+
+
+def main():
+    """
+    Główna funkcja programu - wykonuje polecenie z wiersza poleceń
+    lub uruchamia menu interaktywne.
+    """
+    args = build_parser().parse_args()
+
+    if args.command == 'export':
+        predictor = MultiDatasetPredictor()
+        for dataset_name in args.datasets or predictor.DATASETS_CONFIG.keys():
+            predictor.export_saved_models(dataset_name)
+        return
+
+    if args.command == 'train-all':
+        train_all(args.datasets, workers=args.workers, n_jobs=args.n_jobs,
+                  chunksize=args.chunksize, use_cache=not args.no_cache)
+        return
+
+    if args.command == 'incremental':
+        for dataset_name in args.datasets or MultiDatasetPredictor.DATASETS_CONFIG.keys():
+            MultiDatasetPredictor().update_incrementally(
+                dataset_name, database_url=args.database_url, new_trees=args.new_trees,
+                lr_max_iter=args.lr_max_iter, chunk_size=args.chunk_size
+            )
+        return
+
+    if args.command == 'compact':
+        reports = {}
+        for dataset_name in args.datasets or MultiDatasetPredictor.DATASETS_CONFIG.keys():
+            predictor = MultiDatasetPredictor()
+            predictor.load_dataset(dataset_name, use_cache=not args.no_cache)
+            predictor.train_models()
+            reports[dataset_name] = predictor.compact_models(tolerance=args.tolerance)
+            if not args.no_save:
+                predictor.save_models_atomic()
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(reports, f, indent=2)
+        return
+
+    if args.command == 'tune':
+        for dataset_name in args.datasets or MultiDatasetPredictor.DATASETS_CONFIG.keys():
+            predictor = MultiDatasetPredictor()
+            predictor.load_dataset(dataset_name, chunksize=args.chunksize, use_cache=not args.no_cache)
+            predictor.tune_models(search=args.search, folds=args.folds,
+                                  n_jobs=args.n_jobs, cache_dir=args.cache_dir)
+            if not args.no_save:
+                predictor.save_models_atomic()
+        return
+
+    interactive_menu()
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Metoda i koszt haszowania haseł w formacie werkzeug, np. scrypt:32768:8:1 lub pbkdf2:sha256:600000
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+# Liczba wątków haszujących oraz maksymalna liczba operacji oczekujących na wątek
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+
+
+class PasswordHasherBusy(Exception):
+    """Zbyt wiele oczekujących operacji haszowania haseł"""
+
+
+class PasswordHasher:
+    """
+    Haszowanie i weryfikacja haseł w ograniczonej puli wątków.
+    scrypt/pbkdf2 zwalniają GIL, więc pula ogranicza liczbę jednocześnie liczonych skrótów
+    i przy fali logowań nie zajmują one wszystkich rdzeni kosztem obsługi predykcji.
+    Przy więcej niż max_pending oczekujących operacjach zgłaszany jest PasswordHasherBusy.
+    """
+
+    def __init__(self, method=PASSWORD_HASH_METHOD, workers=PASSWORD_HASH_WORKERS,
+                 max_pending=PASSWORD_HASH_MAX_PENDING):
+        self.method = method
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _submit(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Zbyt wiele jednoczesnych prób logowania. Spróbuj ponownie za chwilę.")
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+            return self._executor.submit(function, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """Zwraca skrót hasła wyznaczony skonfigurowaną metodą"""
+        return self._submit(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        """Sprawdza hasło (metoda odczytywana jest z zapisanego skrótu)"""
+        return self._submit(check_password_hash, password_hash, password)
+
+    @cached_property
+    def method_prefix(self):
+        """
+        Prefiks skrótów wyznaczanych skonfigurowaną metodą, z parametrami uzupełnionymi przez werkzeug
+        (np. 'scrypt' -> 'scrypt:32768:8:1', 'pbkdf2:sha256' -> 'pbkdf2:sha256:<liczba iteracji>').
+        Odczytywany z jednorazowo wyznaczonego skrótu pustego hasła.
+        """
+        return generate_password_hash('', self.method).split('$', 1)[0]
+
+    def needs_rehash(self, password_hash):
+        """Czy skrót został wyznaczony inną metodą lub kosztem niż obecnie skonfigurowane"""
+        return password_hash.split('$', 1)[0] != self.method_prefix
+
+
+# Wspólna instancja używana przez model użytkownika
+password_hasher = PasswordHasher()
@@ -0,0 +1,122 @@
+import queue
+import threading
+import time
+
+from models import db
+
+# Znacznik zakończenia pracy wątku zapisującego
+_STOP = object()
+
+
+class PredictionWriter:
+    """
+    Zapis predykcji w tle (write-behind). Widoki odkładają wiersze do kolejki
+    w pamięci procesu i nie czekają na zatwierdzenie transakcji. Wątek zapisujący
+    łączy oczekujące wiersze w jedną transakcję (bulk_insert_mappings + commit),
+    gdy zbierze max_batch wierszy lub minie max_delay sekund od pierwszego z nich.
+
+    Przy zamknięciu aplikacji stop() zapisuje wszystko, co pozostało w kolejce.
+    Pełna kolejka (max_queue wpisów) blokuje submit() - przy przeciążeniu bazy
+    żądania zwalniają zamiast zajmować coraz więcej pamięci.
+    """
+
+    def __init__(self, app, model, max_batch=500, max_delay=0.05, max_queue=10000):
+        self.app = app
+        self.model = model
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.written = 0            # Liczba zapisanych wierszy
+        self.failed = 0             # Liczba wierszy, których nie udało się zapisać
+        self.batches = 0            # Liczba zatwierdzonych transakcji
+        self.last_error = None
+
+    def start(self):
+        """Uruchamia wątek zapisujący"""
+        self._thread = threading.Thread(target=self._run, name='prediction-writer', daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, mappings):
+        """Dodaje do kolejki listę wierszy (słowników kolumn) do zapisania"""
+        if mappings:
+            self._queue.put(list(mappings))
+
+    def _collect(self, first):
+        """Zbiera kolejne wpisy z kolejki do osiągnięcia max_batch wierszy lub upływu max_delay"""
+        batch = list(first)
+        entries = 1
+        stop = False
+        deadline = time.monotonic() + self.max_delay
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.extend(item)
+            entries += 1
+        return batch, entries, stop
+
+    def _write(self, batch):
+        """Zapisuje wiersze jedną transakcją"""
+        with self.app.app_context():
+            try:
+                db.session.bulk_insert_mappings(self.model, batch)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                with self._lock:
+                    self.failed += len(batch)
+                    self.last_error = str(e)
+                return
+            finally:
+                db.session.remove()
+
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            batch, entries, stop = self._collect(item)
+            self._write(batch)
+            for _ in range(entries + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def flush(self):
+        """Czeka, aż wszystkie wiersze dodane do kolejki zostaną zapisane"""
+        self._queue.join()
+
+    def stop(self, timeout=30):
+        """Zapisuje pozostałe wiersze i kończy wątek zapisujący"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def stats(self):
+        """Zwraca liczniki zapisu oraz liczbę wpisów oczekujących w kolejce"""
+        with self._lock:
+            return {
+                'pending': self._queue.qsize(),
+                'written': self.written,
+                'failed': self.failed,
+                'batches': self.batches,
+                'last_error': self.last_error
+            }
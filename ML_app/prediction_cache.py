@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    Pamięć podręczna wyników modeli dla pojedynczych wierszy danych (LRU z opcjonalnym TTL).
+    Klucz to (zbiór danych, wersja modeli, bajty przeskalowanego wektora cech), więc
+    zmiana artefaktów modeli automatycznie kieruje zapytania do nowych wpisów.
+    Rozmiar ograniczony jest liczbą wpisów (max_entries) - najdawniej używane wpisy są usuwane.
+    """
+
+    def __init__(self, max_entries=10000, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl                   # Czas życia wpisu w sekundach (None = bez limitu)
+        self._entries = OrderedDict()    # klucz -> (czas zapisu, wynik)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(dataset_name, version, row):
+        """Klucz wpisu dla jednego przeskalowanego wiersza danych"""
+        return dataset_name, version, np.ascontiguousarray(row, dtype=np.float64).tobytes()
+
+    def get(self, key):
+        """Zwraca zapamiętany wynik lub None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl is not None and time.monotonic() - entry[0] > self.ttl):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        """Zapisuje wynik, usuwając najdawniej używane wpisy po przekroczeniu limitu"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, dataset_name=None):
+        """Usuwa wpisy zbioru danych (lub wszystkie wpisy, gdy dataset_name=None)"""
+        with self._lock:
+            if dataset_name is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == dataset_name]:
+                del self._entries[key]
+
+    def stats(self):
+        """Liczniki trafień i chybień oraz liczba wpisów"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def score_cached(cache, dataset_name, version, models, input_scaled, score):
+    """
+    Wyniki modeli dla macierzy przeskalowanych danych z użyciem pamięci podręcznej.
+    Wiersze bez wpisu oceniane są jednym wywołaniem score(models, macierz) i zapisywane.
+    Zwraca wyniki w formacie score_models: {klucz_modelu: (etykiety, prawdopodobieństwa)}.
+    """
+    input_scaled = np.asarray(input_scaled, dtype=np.float64)
+    if len(input_scaled) == 0:
+        return score(models, input_scaled)
+
+    keys = [cache.key(dataset_name, version, row) for row in input_scaled]
+    cached = [cache.get(key) for key in keys]
+    missing = [i for i, value in enumerate(cached) if value is None]
+
+    if missing:
+        computed = score(models, input_scaled[missing])
+        for position, i in enumerate(missing):
+            value = {model_key: (labels[position], probabilities[position])
+                     for model_key, (labels, probabilities) in computed.items()}
+            cache.put(keys[i], value)
+            cached[i] = value
+
+    return {
+        model_key: (np.array([value[model_key][0] for value in cached]),
+                    np.array([value[model_key][1] for value in cached]))
+        for model_key in cached[0]
+    }
@@ -0,0 +1,299 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from compiled import COMPILED_DIR, MANIFEST_FILE, has_compiled, load_compiled
+from model_store import ModelStore
+from schema import SCHEMA_FILE, SCHEMAS
+from scoring import score_models
+
+# Pliki artefaktów zapisywane przez MultiDatasetPredictor.save_models
+MODEL_FILES = {
+    'rf': 'rf_model.joblib',         # Random Forest
+    'lr': 'lr_model.joblib',         # Logistic Regression
+    'dt': 'dt_model.joblib',         # Decision Tree
+    'scaler': 'scaler.joblib'        # Standaryzator danych
+}
+
+
+class ModelRegistry:
+    """
+    Rejestr modeli uczenia maszynowego dla wszystkich zbiorów danych.
+    Modele są ładowane z wyprzedzeniem (przy starcie aplikacji), każdy zbiór
+    danych dokładnie raz - równoległe żądania czekają na zakończenie ładowania
+    zamiast wczytywać te same pliki ponownie. Po załadowaniu wykonywana jest
+    predykcja rozgrzewająca, aby pierwsze żądanie nie ponosiło kosztu inicjalizacji.
+
+    Przy mmap_mode='r' tablice NumPy z nieskompresowanych plików joblib są mapowane
+    do pamięci tylko do odczytu, dzięki czemu procesy robocze współdzielą jedną
+    kopię stron w pamięci podręcznej systemu operacyjnego.
+
+    Przed udostępnieniem modeli sprawdzana jest zgodność ich schematu cech (schema.json,
+    nazwy kolumn skalera) ze schematem aplikacji - zob. schema.FeatureSchema.check_artifacts.
+
+    Jeśli dla zbioru danych istnieje wersja skompilowana (katalog compiled, zob. compiled.py),
+    używana jest ona zamiast modeli sklearn - proces serwera nie importuje wtedy w ogóle
+    sklearn ani pandas (joblib importowany jest dopiero przy ładowaniu modeli sklearn).
+
+    Każdy załadowany zestaw modeli ma wersję - identyfikator aktywnej wersji z magazynu modeli
+    (model_store.py), a dla modeli zapisanych bez wersjonowania odcisk plików artefaktów
+    (i-węzeł, rozmiar, czas modyfikacji). Po uruchomieniu start_watcher() wątek w tle co
+    check_interval sekund sprawdza, czy wersja się zmieniła, ładuje i rozgrzewa nowe modele
+    poza ścieżką obsługi żądań, podmienia referencję i powiadamia słuchaczy (on_reload).
+    Bez wątku sprawdzenie wykonuje get() w trakcie żądania.
+    """
+
+    def __init__(self, dataset_names, models_root='models', mmap_mode='r', use_compiled=True,
+                 check_interval=5.0):
+        self.dataset_names = list(dataset_names)
+        self.models_root = models_root
+        self.mmap_mode = mmap_mode
+        self.use_compiled = use_compiled
+        self.store = ModelStore(models_root)
+        self._models = {}                # Załadowane modele: zbiór danych -> słownik modeli
+        self._errors = {}                # Błędy ładowania: zbiór danych -> komunikat
+        self._load_times = {}            # Czas ładowania w sekundach
+        self._versions = {}              # Wersja (odcisk artefaktów) załadowanych modeli
+        self._checked = {}               # Czas ostatniego sprawdzenia artefaktów (time.monotonic)
+        self._listeners = []             # Funkcje wywoływane po przeładowaniu modeli zbioru danych
+        self.check_interval = check_interval
+        self._lock = threading.Lock()    # Ochrona słowników stanu
+        self._dataset_locks = {name: threading.Lock() for name in self.dataset_names}
+        self._preload_thread = None
+        self._watcher = None
+        self._stop_watcher = threading.Event()
+
+    def resolve(self, dataset_name):
+        """
+        Zwraca (wersja, katalog artefaktów) aktywnych modeli zbioru danych. Katalog wyznaczany
+        jest z tej samej odczytanej wersji, więc zmiana CURRENT w trakcie ładowania nie prowadzi
+        do połączenia wersji z artefaktami innej wersji.
+        """
+        version = self.store.current_version(dataset_name)
+        if version is not None:
+            return version, self.store.version_dir(dataset_name, version)
+        return self.fingerprint(dataset_name), self.store.dataset_dir(dataset_name)
+
+    def artifact_paths(self, dataset_name):
+        """Pliki modeli zapisanych bez wersjonowania (do wyznaczania odcisku)"""
+        models_dir = self.store.dataset_dir(dataset_name)
+        paths = [f'{models_dir}/{filename}' for filename in MODEL_FILES.values()]
+        if self.use_compiled and has_compiled(models_dir):
+            paths.append(f'{models_dir}/{COMPILED_DIR}/{MANIFEST_FILE}')
+        if os.path.exists(f'{models_dir}/{SCHEMA_FILE}'):
+            paths.append(f'{models_dir}/{SCHEMA_FILE}')
+        return paths
+
+    def fingerprint(self, dataset_name):
+        """Odcisk plików artefaktów bez wersjonowania - zmienia się po każdym zapisie modeli"""
+        digest = hashlib.sha1()
+        for path in self.artifact_paths(dataset_name):
+            stat = os.stat(path)
+            digest.update(f'{path}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+        return digest.hexdigest()[:16]
+
+    def _load_from_disk(self, dataset_name, models_dir):
+        """Wczytuje artefakty zbioru danych i wykonuje predykcję rozgrzewającą"""
+        if self.use_compiled and has_compiled(models_dir):
+            models = load_compiled(f'{models_dir}/{COMPILED_DIR}', mmap_mode=self.mmap_mode)
+        else:
+            import joblib
+            models = {
+                key: joblib.load(f'{models_dir}/{filename}', mmap_mode=self.mmap_mode)
+                for key, filename in MODEL_FILES.items()
+            }
+
+        # Modele wytrenowane na innym schemacie cech niż bieżący nie są udostępniane (SchemaMismatch)
+        if dataset_name in SCHEMAS:
+            SCHEMAS[dataset_name].check_artifacts(models_dir, models['scaler'])
+
+        # Predykcja rozgrzewająca na wierszu zer
+        dummy_row = np.zeros((1, models['scaler'].n_features_in_))
+        score_models(models, models['scaler'].transform(dummy_row))
+        return models
+
+    def load_version(self, dataset_name, version):
+        """
+        Wczytuje modele wskazanej wersji bez zmiany modeli aktywnych w rejestrze (np. w procesie
+        roboczym, który musi użyć tej samej wersji co proces serwera). Katalog modeli bez
+        wersjonowania jest zmienny, więc dla nich dostępna jest tylko bieżąca zawartość
+        (wersja musi być równa jej odciskowi).
+        """
+        if dataset_name not in self._dataset_locks:
+            raise ValueError(f"Nieznany zbiór danych: {dataset_name}")
+        models_dir = self.store.version_dir(dataset_name, version)
+        if not os.path.isdir(models_dir):
+            current, models_dir = self.resolve(dataset_name)
+            if current != version:
+                raise ValueError(f"Wersja modeli {dataset_name} {version} jest niedostępna (aktywna: {current})")
+        return self._load_from_disk(dataset_name, models_dir)
+
+    def load(self, dataset_name):
+        """
+        Ładuje modele dla zbioru danych, jeśli nie zostały jeszcze załadowane.
+        Blokada na poziomie zbioru danych gwarantuje pojedyncze ładowanie.
+        """
+        if dataset_name not in self._dataset_locks:
+            raise ValueError(f"Nieznany zbiór danych: {dataset_name}")
+
+        with self._dataset_locks[dataset_name]:
+            if dataset_name in self._models:
+                return self._models[dataset_name]
+
+            return self._load_locked(dataset_name)
+
+    def _load_locked(self, dataset_name):
+        """Wczytuje modele i podmienia je w rejestrze (wywoływane z blokadą zbioru danych)"""
+        start = time.perf_counter()
+        try:
+            # Wersja wyznaczana przed odczytem plików - zmiana w trakcie ładowania wywoła kolejne przeładowanie
+            version, models_dir = self.resolve(dataset_name)
+            models = self._load_from_disk(dataset_name, models_dir)
+        except Exception as e:
+            with self._lock:
+                self._errors[dataset_name] = str(e)
+            raise
+
+        with self._lock:
+            self._models[dataset_name] = models
+            self._versions[dataset_name] = version
+            self._load_times[dataset_name] = time.perf_counter() - start
+            self._checked[dataset_name] = time.monotonic()
+            self._errors.pop(dataset_name, None)
+        return models
+
+    def refresh(self, dataset_name, min_interval=0.0):
+        """
+        Przeładowuje modele zbioru danych, jeśli aktywna wersja zmieniła się od ostatniego ładowania.
+        Sprawdzenie pomijane jest, gdy od poprzedniego minęło mniej niż min_interval sekund.
+        Sprawdzenie i przeładowanie wykonywane są z blokadą zbioru danych, więc równoległe wątki
+        (obserwujący i obsługujące żądania) nie przeładują tego samego zbioru dwukrotnie.
+        Do czasu zakończenia ładowania żądania korzystają z poprzednich modeli.
+        Zwraca True, gdy modele zostały przeładowane.
+        """
+        lock = self._dataset_locks[dataset_name]
+        if not lock.acquire(blocking=False):
+            return False    # Sprawdzenie lub przeładowanie wykonuje już inny wątek
+        try:
+            now = time.monotonic()
+            if now - self._checked.get(dataset_name, 0.0) < min_interval:
+                return False
+            self._checked[dataset_name] = now
+            try:
+                if self.resolve(dataset_name)[0] == self._versions.get(dataset_name):
+                    return False
+            except OSError:
+                # Pliki w trakcie podmiany - sprawdzenie przy następnej okazji
+                return False
+            try:
+                self._load_locked(dataset_name)
+            except Exception:
+                return False
+        finally:
+            lock.release()
+
+        for listener in self._listeners:
+            listener(dataset_name)
+        return True
+
+    def on_reload(self, callback):
+        """Rejestruje funkcję callback(dataset_name) wywoływaną po przeładowaniu modeli"""
+        self._listeners.append(callback)
+
+    def get(self, dataset_name):
+        """Zwraca modele dla zbioru danych (ładuje je, jeśli jeszcze nie są w pamięci)"""
+        return self.get_versioned(dataset_name)[0]
+
+    def get_versioned(self, dataset_name):
+        """
+        Zwraca (modele, wersja) dla zbioru danych. Bez wątku obserwującego co check_interval
+        sekund sprawdza, czy na dysku nie pojawiła się nowa wersja modeli.
+        """
+        if dataset_name not in self._models:
+            self.load(dataset_name)
+        elif (self._watcher is None and self.check_interval is not None
+              and time.monotonic() - self._checked.get(dataset_name, 0.0) >= self.check_interval):
+            # Wstępny test bez blokady; rozstrzygające sprawdzenie wykonuje refresh z blokadą
+            self.refresh(dataset_name, min_interval=self.check_interval)
+
+        with self._lock:
+            return self._models[dataset_name], self._versions[dataset_name]
+
+    def version(self, dataset_name):
+        """Wersja załadowanych modeli zbioru danych (None, jeśli nie są załadowane)"""
+        return self._versions.get(dataset_name)
+
+    def preload(self, parallel=True):
+        """
+        Ładuje modele wszystkich zbiorów danych.
+        Przy parallel=True zbiory ładowane są równolegle w puli wątków.
+        Błędy są zapamiętywane i raportowane przez status().
+        """
+        def safe_load(dataset_name):
+            try:
+                self.load(dataset_name)
+            except Exception:
+                pass
+
+        if parallel:
+            with ThreadPoolExecutor(max_workers=len(self.dataset_names) or 1) as executor:
+                list(executor.map(safe_load, self.dataset_names))
+        else:
+            for dataset_name in self.dataset_names:
+                safe_load(dataset_name)
+
+    def start_preload(self, parallel=True):
+        """Uruchamia preload() w tle, aby nie blokować startu serwera"""
+        self._preload_thread = threading.Thread(
+            target=self.preload, kwargs={'parallel': parallel}, name='model-preload', daemon=True
+        )
+        self._preload_thread.start()
+        return self._preload_thread
+
+    def start_watcher(self):
+        """
+        Uruchamia wątek, który co check_interval sekund sprawdza wersje załadowanych zbiorów danych
+        i przeładowuje je w tle (żądania do końca ładowania korzystają z poprzednich modeli).
+        """
+        if self._watcher is None and self.check_interval is not None:
+            self._watcher = threading.Thread(target=self._watch, name='model-watcher', daemon=True)
+            self._watcher.start()
+        return self._watcher
+
+    def _watch(self):
+        while not self._stop_watcher.wait(self.check_interval):
+            for dataset_name in list(self._models):
+                try:
+                    self.refresh(dataset_name)
+                except Exception:
+                    pass
+
+    def stop_watcher(self):
+        self._stop_watcher.set()
+        if self._watcher is not None:
+            self._watcher.join()
+
+    def is_ready(self):
+        """Czy modele wszystkich zbiorów danych są załadowane"""
+        return all(name in self._models for name in self.dataset_names)
+
+    def status(self):
+        """Zwraca stan każdego zbioru danych: ready / loading / error oraz czas ładowania"""
+        with self._lock:
+            status = {}
+            for dataset_name in self.dataset_names:
+                if dataset_name in self._models:
+                    status[dataset_name] = {
+                        'state': 'ready',
+                        'version': self._versions[dataset_name],
+                        'load_time': round(self._load_times[dataset_name], 4)
+                    }
+                elif dataset_name in self._errors:
+                    status[dataset_name] = {'state': 'error', 'error': self._errors[dataset_name]}
+                else:
+                    status[dataset_name] = {'state': 'loading'}
+            return status
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Plik ze schematem cech zapisywany razem z artefaktami modeli (models/<zbiór_danych>/schema.json)
+SCHEMA_FILE = 'schema.json'
+
+# Konfiguracja zbiorów danych wspólna dla trenowania (multi-dataset-predictor.py) i aplikacji (flask-app.py).
+# Nazwy i kolejność cech odpowiadają kolumnom plików datasets/*.csv - w tej kolejności
+# dopasowywany jest skaler, więc w tej samej kolejności dane muszą trafiać do modeli.
+DATASETS_CONFIG = {
+    'heart_disease': {
+        'path': 'datasets/heart-disease.csv',
+        'target': 'target', # Kolumna zawierająca etykiety (0/1)
+        'features': [
+            # Lista krotek (nazwa_cechy, opis) dla chorób serca
+            ('age', 'Wiek pacjenta'),
+            ('sex', 'Płeć pacjenta (0 = kobieta, 1 = mężczyzna)'),
+            ('cp', 'Typ bólu w klatce piersiowej'),
+            ('trestbps', 'Ciśnienie tętnicze krwi w spoczynku'),
+            ('chol', 'Poziom cholesterolu'),
+            ('fbs', 'Cukier we krwi na czczo'),
+            ('restecg', 'Wyniki EKG spoczynkowego'),
+            ('thalach', 'Maksymalne tętno'),
+            ('exang', 'Dławica wysiłkowa'),
+            ('oldpeak', 'Obniżenie odcinka ST'),
+            ('slope', 'Nachylenie odcinka ST'),
+            ('ca', 'Liczba głównych naczyń wieńcowych'),
+            ('thal', 'Wynik testu Thallium')
+        ],
+        # Cechy wyświetlane w tabeli historii predykcji (nazwa cechy, nagłówek kolumny)
+        'summary': [('age', 'Wiek'), ('sex', 'Płeć')]
+    },
+    'diabetes': {
+        'path': 'datasets/diabetes.csv',
+        'target': 'Outcome',
+        'features': [
+            ('Pregnancies', 'Liczba ciąż'),
+            ('Glucose', 'Poziom glukozy'),
+            ('BloodPressure', 'Ciśnienie krwi'),
+            ('SkinThickness', 'Grubość fałdu skórnego'),
+            ('Insulin', 'Poziom insuliny'),
+            ('BMI', 'Wskaźnik masy ciała'),
+            ('DiabetesPedigreeFunction', 'Funkcja rodowodu cukrzycy'),
+            ('Age', 'Wiek')
+        ],
+        'summary': [('Age', 'Wiek'), ('Glucose', 'Poziom Glukozy')]
+    },
+    'lung_cancer': {
+        'path': 'datasets/survey-lung-cancer.csv',
+        'target': 'LUNG_CANCER',
+        # Kolumny tekstowe i ich kodowanie liczbowe
+        'categorical': {
+            'GENDER': {'M': 1, 'F': 0},
+            'LUNG_CANCER': {'YES': 1, 'NO': 0}
+        },
+        'features': [
+            ('GENDER', 'Płeć (M/F)'),
+            ('AGE', 'Wiek'),
+            ('SMOKING', 'Palenie tytoniu (1-2)'),
+            ('YELLOW_FINGERS', 'Żółte palce (1-2)'),
+            ('ANXIETY', 'Niepokój (1-2)'),
+            ('PEER_PRESSURE', 'Presja rówieśników (1-2)'),
+            ('CHRONIC DISEASE', 'Choroba przewlekła (1-2)'),
+            ('FATIGUE', 'Zmęczenie (1-2)'),
+            ('ALLERGY', 'Alergia (1-2)'),
+            ('WHEEZING', 'Świszczący oddech (1-2)'),
+            ('ALCOHOL CONSUMING', 'Spożywanie alkoholu (1-2)'),
+            ('COUGHING', 'Kaszel (1-2)'),
+            ('SHORTNESS OF BREATH', 'Duszność (1-2)'),
+            ('SWALLOWING DIFFICULTY', 'Trudności w połykaniu (1-2)'),
+            ('CHEST PAIN', 'Ból w klatce piersiowej (1-2)')
+        ],
+        'summary': [('AGE', 'Wiek'), ('GENDER', 'Płeć')]
+    }
+}
+
+
+class SchemaMismatch(ValueError):
+    """Artefakty modeli zostały wytrenowane na innym schemacie cech niż bieżący"""
+
+
+class FeatureSchema:
+    """
+    Schemat cech zbioru danych przygotowany raz, przy imporcie modułu: nazwy cech
+    w kolejności treningowej, tablice kodowania kolumn tekstowych i wersja (odcisk) schematu.
+
+    encode() zamienia wiersze z formularza, JSON lub CSV na macierz w kolejności schematu -
+    walidacja i konwersja wykonywane są wektorowo dla całych kolumn.
+
+    Typ macierzy to float64, jak przy trenowaniu modeli: progi drzew sklearn często leżą
+    dokładnie na wartościach treningowych, więc wejście zaokrąglone do float32 potrafi
+    zmienić ścieżkę w drzewie i wynik lasu.
+    """
+    dtype = np.float64
+
+    def __init__(self, dataset_name, config):
+        self.dataset_name = dataset_name
+        self.feature_names = [name for name, _ in config['features']]
+        self.categorical = {name: dict(mapping) for name, mapping in config.get('categorical', {}).items()
+                            if name in self.feature_names}
+
+        # Tablice wyszukiwania dla kolumn tekstowych: indeks kolumny -> (wartości, kody).
+        # Poza wartościami tekstowymi akceptowane są też same kody (np. '1' dla 'M').
+        self._lookups = {}
+        for name, mapping in self.categorical.items():
+            values = [str(value).upper() for value in mapping] + [str(code) for code in mapping.values()]
+            codes = list(mapping.values()) * 2
+            self._lookups[self.feature_names.index(name)] = (np.array(values), np.array(codes, dtype=self.dtype))
+
+        payload = json.dumps({'features': self.feature_names, 'categorical': self.categorical}, sort_keys=True)
+        self.version = hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+    @property
+    def n_features(self):
+        return len(self.feature_names)
+
+    def to_dict(self):
+        return {
+            'dataset': self.dataset_name,
+            'version': self.version,
+            'features': self.feature_names,
+            'categorical': self.categorical,
+            'dtype': np.dtype(self.dtype).name
+        }
+
+    def save(self, model_dir):
+        """Zapisuje schemat obok artefaktów modeli"""
+        with open(os.path.join(model_dir, SCHEMA_FILE), 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def check_artifacts(self, model_dir, scaler):
+        """
+        Sprawdza, czy modele z model_dir wytrenowano na tym schemacie (schema.json,
+        nazwy kolumn zapamiętane przez skaler, liczba cech). Zgłasza SchemaMismatch.
+        """
+        path = os.path.join(model_dir, SCHEMA_FILE)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('features') != self.feature_names or saved.get('categorical', {}) != self.categorical:
+                raise SchemaMismatch(
+                    f"Modele {self.dataset_name} wytrenowano na cechach {saved.get('features')} "
+                    f"(kodowanie {saved.get('categorical', {})}), oczekiwano {self.feature_names}"
+                )
+
+        trained_names = getattr(scaler, 'feature_names_in_', None)
+        if trained_names is not None and list(trained_names) != self.feature_names:
+            raise SchemaMismatch(
+                f"Skaler {self.dataset_name} dopasowano do cech {list(trained_names)}, "
+                f"oczekiwano {self.feature_names}"
+            )
+        if scaler.n_features_in_ != self.n_features:
+            raise SchemaMismatch(
+                f"Modele {self.dataset_name} oczekują {scaler.n_features_in_} cech, schemat ma {self.n_features}"
+            )
+
+    def rows_from_mappings(self, items):
+        """Wiersze wartości w kolejności schematu ze słowników (formularz, obiekty JSON, wiersze CSV)"""
+        rows = []
+        for item in items:
+            missing = [name for name in self.feature_names if name not in item]
+            if missing:
+                raise ValueError(f"Brakujące cechy w wierszu: {missing}")
+            rows.append([item[name] for name in self.feature_names])
+        return rows
+
+    def encode_mapping(self, mapping):
+        """Macierz 1 x cechy dla jednego słownika danych (np. formularza)"""
+        return self.encode(self.rows_from_mappings([mapping]))
+
+    def encode(self, rows):
+        """
+        Macierz (wiersze x cechy) z surowych wierszy w kolejności schematu.
+        Zgłasza ValueError przy złej liczbie cech, nieznanej wartości kategorycznej,
+        wartości nieliczbowej lub nieskończonej.
+        """
+        raw = np.array(rows, dtype=object)
+        if raw.ndim != 2 or raw.shape[1] != self.n_features:
+            raise ValueError(f"Nieprawidłowa liczba cech. Oczekiwano {self.n_features} w każdym wierszu")
+        return self._encode_columns(raw[:, i] for i in range(self.n_features))
+
+    def encode_frame(self, frame):
+        """Macierz cech z ramki pandas zawierającej kolumny cech (pozostałe kolumny są pomijane)"""
+        missing = [name for name in self.feature_names if name not in frame.columns]
+        if missing:
+            raise ValueError(f"Brakujące kolumny: {missing}")
+        return self._encode_columns(frame[name].to_numpy() for name in self.feature_names)
+
+    def _encode_columns(self, columns):
+        columns = list(columns)
+        X = np.empty((len(columns[0]) if columns else 0, self.n_features), dtype=self.dtype)
+        for i, column in enumerate(columns):
+            name = self.feature_names[i]
+            if i in self._lookups:
+                values, codes = self._lookups[i]
+                text = np.char.upper(np.char.strip(column.astype(str)))
+                matches = text[:, None] == values[None, :]
+                known = matches.any(axis=1)
+                if not known.all():
+                    raise ValueError(f"Nieznana wartość cechy {name}: {column[~known][0]}")
+                X[:, i] = codes[matches.argmax(axis=1)]
+                continue
+            try:
+                X[:, i] = column.astype(self.dtype)
+            except (TypeError, ValueError):
+                raise ValueError(f"Nieprawidłowa wartość liczbowa cechy {name}")
+
+        if not np.isfinite(X).all():
+            raise ValueError("Wartości cech muszą być skończonymi liczbami")
+        return X
+
+
+# Schematy wszystkich zbiorów danych przygotowywane przy imporcie modułu
+SCHEMAS = {name: FeatureSchema(name, config) for name, config in DATASETS_CONFIG.items()}
@@ -0,0 +1,55 @@
+import time
+
+import numpy as np
+
+# Nazwy modeli wyświetlane w wynikach
+MODEL_LABELS = {
+    'rf': 'Random Forest',
+    'lr': 'Logistic Regression',
+    'dt': 'Decision Tree'
+}
+
+
+def score_models(models, input_scaled, thresholds=None, observe=None):
+    """
+    Wykonuje predykcje wszystkimi modelami na przeskalowanych danych.
+    Dla każdego modelu predict_proba wywoływane jest tylko raz, a etykieta
+    wyznaczana jest z prawdopodobieństw:
+    - bez progu: klasa o najwyższym prawdopodobieństwie (argmax),
+    - z progiem (thresholds[klucz_modelu]): 1 gdy P(klasa 1) >= próg.
+    Zwraca słownik {klucz_modelu: (etykiety, prawdopodobieństwa klasy 1)}.
+    Opcjonalne observe(klucz_modelu, sekundy) otrzymuje czas predict_proba każdego modelu.
+    """
+    thresholds = thresholds or {}
+    results = {}
+
+    for model_key in MODEL_LABELS:
+        model = models[model_key]
+        start = time.perf_counter()
+        probabilities = model.predict_proba(input_scaled)
+        if observe is not None:
+            observe(model_key, time.perf_counter() - start)
+        positive = probabilities[:, 1]
+
+        if model_key in thresholds:
+            labels = (positive >= thresholds[model_key]).astype(int)
+        else:
+            labels = np.asarray(model.classes_)[probabilities.argmax(axis=1)].astype(int)
+
+        results[model_key] = (labels, positive)
+
+    return results
+
+
+def format_predictions(model_results, row=0):
+    """
+    Zwraca wyniki dla jednego wiersza w formacie używanym przez szablony i API:
+    {nazwa_modelu: {'prediction': ..., 'probability': ...}}
+    """
+    return {
+        MODEL_LABELS[model_key]: {
+            'prediction': int(labels[row]),
+            'probability': float(probabilities[row])
+        }
+        for model_key, (labels, probabilities) in model_results.items()
+    }
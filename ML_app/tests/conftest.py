@@ -0,0 +1,43 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+
+@pytest.fixture(scope='session')
+def flask_app(tmp_path_factory):
+    """
+    Moduł aplikacji (flask-app.py) z osobną bazą SQLite. Aplikacja uruchamiana jest z katalogu
+    ML_app, bo ścieżki modeli i zbiorów danych są względne.
+    """
+    database = tmp_path_factory.mktemp('db') / 'test.db'
+    previous_dir = os.getcwd()
+    previous_url = os.environ.get('DATABASE_URL')
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+    os.chdir(APP_DIR)
+    try:
+        spec = importlib.util.spec_from_file_location('flask_app', os.path.join(APP_DIR, 'flask-app.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.app.config['TESTING'] = True
+        module.model_registry.preload(parallel=False)
+        yield module
+    finally:
+        os.chdir(previous_dir)
+        if previous_url is None:
+            os.environ.pop('DATABASE_URL', None)
+        else:
+            os.environ['DATABASE_URL'] = previous_url
+
+
+@pytest.fixture(scope='session')
+def client(flask_app):
+    """Klient testowy zalogowanego użytkownika"""
+    client = flask_app.app.test_client()
+    client.post('/register', data={'username': 'tester', 'email': 'tester@example.com', 'password': 'secret'})
+    client.post('/login', data={'username': 'tester', 'password': 'secret'})
+    return client
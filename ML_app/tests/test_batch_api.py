@@ -0,0 +1,28 @@
+import pytest
+
+DIABETES_ROW = {'Pregnancies': 1, 'Glucose': 120, 'BloodPressure': 70, 'SkinThickness': 20,
+                'Insulin': 80, 'BMI': 30.5, 'DiabetesPedigreeFunction': 0.4, 'Age': 33}
+URL = '/api/predict/diabetes/batch'
+
+
+def test_batch_accepts_objects_and_value_lists(client):
+    response = client.post(URL, json=[DIABETES_ROW, list(DIABETES_ROW.values())])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 2
+    assert body['predictions'][0] == body['predictions'][1]
+
+
+@pytest.mark.parametrize('item, message', [
+    (None, 'Wiersz 1: oczekiwano obiektu'),
+    (7, 'Wiersz 1: oczekiwano obiektu'),
+    ('1,2,3', 'Wiersz 1: oczekiwano obiektu'),
+    ([1, 2, 3], 'Wiersz 1: oczekiwano 8 wartości cech'),
+    ({'Glucose': 120}, 'Wiersz 1: brakujące cechy'),
+    ({**DIABETES_ROW, 'Insulin': True}, 'Wiersz 1: nieprawidłowa wartość cechy Insulin: true'),
+    ([False] + list(DIABETES_ROW.values())[1:], 'Wiersz 1: nieprawidłowa wartość cechy Pregnancies: false'),
+])
+def test_batch_rejects_invalid_rows_with_row_index(client, item, message):
+    response = client.post(URL, json=[DIABETES_ROW, item])
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith(message)
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compiled import compile_model, load_compiled, save_compiled  # noqa: E402
+
+ATOL = 1e-9
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X_raw = rng.normal(loc=[5.0, -2.0, 100.0, 0.5], scale=[2.0, 1.0, 30.0, 0.1], size=(400, 4))
+    y = (X_raw[:, 0] + 0.05 * X_raw[:, 2] + rng.normal(size=400) > 10).astype(int)
+    scaler = StandardScaler().fit(X_raw)
+    return X_raw, scaler.transform(X_raw), y, scaler
+
+
+def fitted_models(X, y):
+    return {
+        'rf': RandomForestClassifier(n_estimators=20, random_state=42).fit(X, y),
+        'dt': DecisionTreeClassifier(random_state=42).fit(X, y),
+        'lr': LogisticRegression().fit(X, y)
+    }
+
+
+def test_scaler_matches_sklearn(data):
+    X_raw, X, _, scaler = data
+    compiled = compile_model(scaler)
+    assert np.allclose(compiled.transform(X_raw), X, rtol=0, atol=ATOL)
+
+
+@pytest.mark.parametrize('name', ['rf', 'dt', 'lr'])
+def test_predict_proba_matches_sklearn(data, name):
+    _, X, y, _ = data
+    model = fitted_models(X, y)[name]
+    compiled = compile_model(model)
+    np.testing.assert_array_equal(compiled.classes_, model.classes_)
+    assert np.allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=0, atol=ATOL)
+
+
+def test_saved_models_match_sklearn_end_to_end(data, tmp_path):
+    X_raw, X, y, scaler = data
+    models = fitted_models(X, y)
+    save_compiled({**models, 'scaler': scaler}, str(tmp_path))
+    loaded = load_compiled(str(tmp_path))
+
+    X_scaled = loaded['scaler'].transform(X_raw)
+    for name, model in models.items():
+        expected = model.predict_proba(scaler.transform(X_raw))
+        assert np.allclose(loaded[name].predict_proba(X_scaled), expected, rtol=0, atol=ATOL), name
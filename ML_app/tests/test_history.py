@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import pytest
+from flask_login import login_user
+
+HEART_ROW = [55, 1, 0, 130, 250, 0, 1, 150, 0, 1.2, 1, 0, 2]
+
+
+@pytest.fixture(scope='module')
+def history_ids(flask_app, client):
+    """Identyfikatory predykcji heart_disease użytkownika testowego, od najnowszej"""
+    rows = [HEART_ROW[:3] + [120 + i] + HEART_ROW[4:] for i in range(23)]
+    assert client.post('/api/predict/heart_disease/batch', json=rows).status_code == 200
+    Prediction = flask_app.Prediction
+    with flask_app.app.app_context():
+        user = flask_app.User.query.filter_by(username='tester').one()
+        return user.id, [row.id for row in Prediction.query.filter_by(user_id=user.id, dataset='heart_disease')
+                         .order_by(Prediction.timestamp.desc(), Prediction.id.desc())]
+
+
+def test_cursor_round_trip(flask_app):
+    timestamp = datetime(2024, 5, 17, 13, 45, 1, 123456)
+    assert flask_app.decode_cursor(flask_app.encode_cursor(timestamp, 42)) == (timestamp, 42)
+
+
+def test_pages_cover_history_without_gaps_or_duplicates(flask_app, history_ids):
+    user_id, expected = history_ids
+    with flask_app.app.test_request_context():
+        login_user(flask_app.db.session.get(flask_app.User, user_id))
+        seen, cursor = [], None
+        while True:
+            rows, cursor = flask_app.fetch_history_page('heart_disease', cursor, limit=5)
+            assert len(rows) <= 5
+            seen.extend(row.id for row in rows)
+            if cursor is None:
+                break
+    assert seen == expected
+
+
+def test_history_route_follows_cursor(client, history_ids):
+    assert client.get('/history/heart_disease').status_code == 200
+    assert client.get('/history/heart_disease?cursor=2024-01-01T00:00:00_1').status_code == 200
+
+
+@pytest.mark.parametrize('cursor', ['', 'garbage', '2024-01-01T00:00:00', '2024-01-01T00:00:00_x',
+                                    'not-a-date_5', '2024-13-40T00:00:00_5'])
+def test_history_rejects_bad_cursor(client, cursor):
+    response = client.get('/history/heart_disease', query_string={'cursor': cursor})
+    assert response.status_code == 400
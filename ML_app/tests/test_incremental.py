@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from incremental import (FEATURE_DTYPE, load_reference_values, merge_feature_values,  # noqa: E402
+                         remap_tree_thresholds, save_reference_values, stream_labelled_rows)
+from schema import SCHEMAS  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def diabetes():
+    frame = pd.read_csv(os.path.join(APP_DIR, 'datasets', 'diabetes.csv'))
+    return SCHEMAS['diabetes'].encode_frame(frame), frame['Outcome'].to_numpy()
+
+
+def updated_scaler(scaler, X, seed=0):
+    """Kopia skalera po partial_fit na przesuniętych wierszach (jak przy douczaniu)"""
+    rng = np.random.default_rng(seed)
+    updated = StandardScaler().fit(X)
+    updated.partial_fit(X[rng.choice(len(X), 200)] * 1.1 + 3.0)
+    return updated
+
+
+@pytest.mark.parametrize('model', [
+    DecisionTreeClassifier(random_state=42),
+    RandomForestClassifier(n_estimators=20, random_state=42)
+])
+def test_remap_keeps_training_leaves(diabetes, model):
+    X, y = diabetes
+    scaler = StandardScaler().fit(X)
+    model.fit(scaler.transform(X), y)
+    estimators = getattr(model, 'estimators_', [model])
+    leaves_before = [estimator.apply(scaler.transform(X)) for estimator in estimators]
+
+    new_scaler = updated_scaler(scaler, X)
+    reference_values = merge_feature_values(None, X)
+    for estimator in estimators:
+        remap_tree_thresholds(estimator, scaler.mean_, scaler.scale_,
+                              new_scaler.mean_, new_scaler.scale_, reference_values)
+
+    X_new_scaled = new_scaler.transform(X)
+    for estimator, leaves in zip(estimators, leaves_before):
+        np.testing.assert_array_equal(estimator.apply(X_new_scaled), leaves)
+
+
+def test_merge_feature_values_accumulates_unique_values():
+    values = merge_feature_values(None, np.array([[1.0, 5.0], [1.0, 4.0]]))
+    values = merge_feature_values(values, np.array([[0.5, 5.0]]))
+    np.testing.assert_array_equal(values[0], [0.5, 1.0])
+    np.testing.assert_array_equal(values[1], [4.0, 5.0])
+
+
+def test_reference_values_round_trip(tmp_path):
+    values = [np.array([0.0, 1.5]), np.array([2.0]), np.array([])]
+    assert load_reference_values(str(tmp_path)) is None
+    save_reference_values(str(tmp_path), values)
+    for loaded, expected in zip(load_reference_values(str(tmp_path)), values):
+        np.testing.assert_array_equal(loaded, expected)
+
+
+def test_stream_labelled_rows_reads_only_rows_after_checkpoint(tmp_path):
+    path = tmp_path / 'outcomes.db'
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE prediction (id INTEGER PRIMARY KEY, dataset TEXT, features BLOB)')
+    connection.execute('CREATE TABLE prediction_outcome (id INTEGER PRIMARY KEY, dataset TEXT, '
+                       'prediction_id INTEGER, label INTEGER)')
+    for i in range(1, 6):
+        features = np.array([i, -i], dtype=FEATURE_DTYPE).tobytes()
+        connection.execute('INSERT INTO prediction VALUES (?, ?, ?)', (i, 'diabetes', features))
+        connection.execute('INSERT INTO prediction_outcome VALUES (?, ?, ?, ?)', (i, 'diabetes', i, i % 2))
+    connection.commit()
+    connection.close()
+
+    def streamed(**kwargs):
+        chunks = list(stream_labelled_rows(f'sqlite:///{path}', 'diabetes', chunk_size=2, **kwargs))
+        return np.concatenate([ids for ids, _, _ in chunks]), np.vstack([X for _, X, _ in chunks])
+
+    ids, X = streamed(after_id=3)
+    np.testing.assert_array_equal(ids, [4, 5])
+    np.testing.assert_array_equal(X, [[4, -4], [5, -5]])
+    ids, _ = streamed(after_id=0, until_id=3)
+    np.testing.assert_array_equal(ids, [1, 2, 3])
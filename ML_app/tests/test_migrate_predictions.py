@@ -0,0 +1,31 @@
+import sqlite3
+
+import numpy as np
+
+from migrate_predictions import LEGACY_TABLES, RESULT_COLUMNS, migrate
+from models import FEATURE_DTYPE
+
+
+def test_lung_cancer_gender_is_migrated_case_insensitively(tmp_path):
+    path = tmp_path / 'legacy.db'
+    table, columns = LEGACY_TABLES['lung_cancer']
+    feature_columns = ['gender'] + columns[1:]
+    connection = sqlite3.connect(path)
+    connection.execute(
+        f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, user_id INTEGER, timestamp DATETIME, "
+        f"{', '.join(RESULT_COLUMNS)}, {', '.join(feature_columns)})"
+    )
+    for row_id, gender in enumerate(['M', 'm', ' M ', 'F', 'f'], start=1):
+        values = ([row_id, 1, '2024-01-01 00:00:00'] + [0] * len(RESULT_COLUMNS)
+                  + [gender, 60] + [1] * (len(columns) - 2))
+        connection.execute(f"INSERT INTO {table} VALUES ({', '.join('?' * len(values))})", values)
+    connection.commit()
+    connection.close()
+
+    migrate(f'sqlite:///{path}')
+
+    connection = sqlite3.connect(path)
+    rows = connection.execute("SELECT features FROM prediction WHERE dataset = 'lung_cancer' ORDER BY id").fetchall()
+    connection.close()
+    genders = [np.frombuffer(row[0], dtype=FEATURE_DTYPE)[0] for row in rows]
+    assert genders == [1, 1, 1, 0, 0]
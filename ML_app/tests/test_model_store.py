@@ -0,0 +1,103 @@
+import os
+import shutil
+
+import pytest
+
+from model_store import CURRENT_FILE, ModelStore
+from registry import ModelRegistry
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_marker(content):
+    def write_artifacts(directory):
+        with open(os.path.join(directory, 'marker.txt'), 'w') as f:
+            f.write(content)
+    return write_artifacts
+
+
+def hidden_entries(store, dataset_name):
+    """Pozostałości zapisu tymczasowego (katalogi wersji i pliki CURRENT z kropką)"""
+    dataset_dir = store.dataset_dir(dataset_name)
+    versions_dir = os.path.join(dataset_dir, 'versions')
+    return [name for directory in (dataset_dir, versions_dir) for name in os.listdir(directory)
+            if name.startswith('.')]
+
+
+def test_publish_swaps_current_and_activate_rolls_back(tmp_path):
+    store = ModelStore(str(tmp_path))
+    assert store.current_version('diabetes') is None
+    assert store.current_dir('diabetes') == store.dataset_dir('diabetes')
+
+    v1 = store.publish('diabetes', write_marker('v1'), {'data_hash': 'abcdef1234', 'metrics': {'rf': 0.7}})
+    v2 = store.publish('diabetes', write_marker('v2'), {'data_hash': 'abcdef1234', 'metrics': {'rf': 0.8}})
+    assert v1 != v2 and v2.endswith('-abcdef12')
+    assert store.current_version('diabetes') == v2
+    with open(os.path.join(store.current_dir('diabetes'), 'marker.txt')) as f:
+        assert f.read() == 'v2'
+    assert [manifest['version'] for manifest in store.list_versions('diabetes')] == [v1, v2]
+    assert store.manifest('diabetes', v1)['metrics'] == {'rf': 0.7}
+
+    store.activate('diabetes', v1)
+    assert store.current_version('diabetes') == v1
+    with open(os.path.join(store.current_dir('diabetes'), 'marker.txt')) as f:
+        assert f.read() == 'v1'
+    assert hidden_entries(store, 'diabetes') == []
+
+
+def test_activate_unknown_version_keeps_current(tmp_path):
+    store = ModelStore(str(tmp_path))
+    version = store.publish('diabetes', write_marker('v1'), {})
+    with pytest.raises(ValueError):
+        store.activate('diabetes', 'missing')
+    assert store.current_version('diabetes') == version
+
+
+def test_failed_publish_leaves_current_and_no_partial_version(tmp_path):
+    store = ModelStore(str(tmp_path))
+    version = store.publish('diabetes', write_marker('v1'), {})
+
+    def fail(directory):
+        write_marker('partial')(directory)
+        raise OSError('disk full')
+
+    with pytest.raises(OSError):
+        store.publish('diabetes', fail, {})
+    assert store.current_version('diabetes') == version
+    assert len(store.list_versions('diabetes')) == 1
+    assert hidden_entries(store, 'diabetes') == []
+
+
+def test_prune_never_removes_active_version(tmp_path):
+    store = ModelStore(str(tmp_path))
+    versions = [store.publish('diabetes', write_marker(str(i)), {}) for i in range(4)]
+    store.activate('diabetes', versions[0])
+    removed = store.prune('diabetes', keep=2)
+    assert removed == versions[1:2]
+    assert [manifest['version'] for manifest in store.list_versions('diabetes')] == [versions[0]] + versions[2:]
+
+
+def test_registry_follows_swap_and_rollback(tmp_path):
+    source = ModelStore(os.path.join(APP_DIR, 'models')).current_dir('diabetes')
+    store = ModelStore(str(tmp_path))
+
+    def copy_models(directory):
+        for name in os.listdir(source):
+            if name == 'manifest.json':
+                continue
+            path = os.path.join(source, name)
+            (shutil.copytree if os.path.isdir(path) else shutil.copy2)(path, os.path.join(directory, name))
+
+    v1 = store.publish('diabetes', copy_models, {})
+    registry = ModelRegistry(['diabetes'], models_root=str(tmp_path), check_interval=0)
+    assert registry.get_versioned('diabetes')[1] == v1
+
+    v2 = store.publish('diabetes', copy_models, {})
+    assert registry.get_versioned('diabetes')[1] == v2
+
+    store.activate('diabetes', v1)
+    models, version = registry.get_versioned('diabetes')
+    assert version == v1
+    assert set(models) == {'rf', 'lr', 'dt', 'scaler'}
+    with open(os.path.join(store.dataset_dir('diabetes'), CURRENT_FILE)) as f:
+        assert f.read().strip() == v1
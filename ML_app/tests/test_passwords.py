@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passwords import PasswordHasher  # noqa: E402
+
+
+@pytest.mark.parametrize('method', ['scrypt', 'scrypt:16384:8:1', 'pbkdf2:sha256', 'pbkdf2:sha256:1000'])
+def test_fresh_hash_does_not_need_rehash(method):
+    hasher = PasswordHasher(method=method)
+    password_hash = hasher.hash('secret')
+    assert hasher.verify(password_hash, 'secret')
+    assert not hasher.needs_rehash(password_hash)
+
+
+def test_hash_with_other_method_or_cost_needs_rehash():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000')
+    assert hasher.needs_rehash(PasswordHasher(method='pbkdf2:sha256:2000').hash('secret'))
+    assert hasher.needs_rehash(PasswordHasher(method='scrypt:16384:8:1').hash('secret'))
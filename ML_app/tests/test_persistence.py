@@ -0,0 +1,65 @@
+import time
+
+import pytest
+from flask import Flask
+
+from models import Prediction, db
+from persistence import PredictionWriter
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'writer.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def rows(count, start=0):
+    return [{'user_id': 1, 'dataset': 'diabetes', 'features': Prediction.pack_features([i, i + 1]),
+             'rf_prediction': i % 2, 'rf_probability': 0.5} for i in range(start, start + count)]
+
+
+def stored_count(app):
+    with app.app_context():
+        return db.session.query(Prediction).count()
+
+
+def test_stop_writes_pending_rows_without_waiting_for_delay(app):
+    writer = PredictionWriter(app, Prediction, max_batch=1000, max_delay=30).start()
+    for start in range(0, 30, 10):
+        writer.submit(rows(10, start))
+
+    started = time.monotonic()
+    writer.stop()
+    assert time.monotonic() - started < 10
+    assert not writer._thread.is_alive()
+    assert stored_count(app) == 30
+    assert writer.stats()['written'] == 30
+    assert writer.stats()['pending'] == 0
+
+
+def test_queued_entries_are_written_in_one_transaction(app):
+    writer = PredictionWriter(app, Prediction, max_batch=1000, max_delay=0.05)
+    for start in range(0, 12, 4):
+        writer.submit(rows(4, start))
+    writer.start()
+    writer.flush()
+    assert writer.stats()['batches'] == 1
+    assert stored_count(app) == 12
+    writer.stop()
+
+
+def test_failed_batch_is_counted_and_writer_keeps_running(app):
+    writer = PredictionWriter(app, Prediction, max_batch=1000, max_delay=0.01).start()
+    writer.submit([{'dataset': 'diabetes', 'features': b''}])     # brak wymaganego user_id
+    writer.flush()
+    writer.submit(rows(3))
+    writer.stop()
+
+    stats = writer.stats()
+    assert stats['failed'] == 1 and stats['last_error']
+    assert stats['written'] == 3
+    assert stored_count(app) == 3
@@ -0,0 +1,78 @@
+import importlib.util
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from models import Prediction
+from schema import DATASETS_CONFIG, SCHEMAS, SchemaMismatch
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def predictor_module():
+    spec = importlib.util.spec_from_file_location('multi_dataset_predictor',
+                                                  os.path.join(APP_DIR, 'multi-dataset-predictor.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def in_app_dir(monkeypatch):
+    monkeypatch.chdir(APP_DIR)
+
+
+@pytest.mark.parametrize('dataset_name', sorted(DATASETS_CONFIG))
+def test_encode_frame_matches_training_matrix(predictor_module, in_app_dir, dataset_name):
+    """Kodowanie serwera daje tę samą macierz i kolejność kolumn co wczytanie danych do trenowania"""
+    predictor = predictor_module.MultiDatasetPredictor()
+    predictor.load_dataset_in_memory(dataset_name)
+    schema = SCHEMAS[dataset_name]
+
+    assert list(predictor.X.columns) == schema.feature_names
+    encoded = schema.encode_frame(pd.read_csv(DATASETS_CONFIG[dataset_name]['path']))
+    np.testing.assert_array_equal(encoded, predictor.X.to_numpy(dtype=np.float64))
+
+
+@pytest.mark.parametrize('dataset_name', sorted(DATASETS_CONFIG))
+def test_encode_paths_agree_and_round_trip_through_storage(in_app_dir, dataset_name):
+    schema = SCHEMAS[dataset_name]
+    frame = pd.read_csv(DATASETS_CONFIG[dataset_name]['path']).head(20)
+    records = frame.to_dict('records')
+
+    from_frame = schema.encode_frame(frame)
+    from_mappings = np.vstack([schema.encode_mapping(record) for record in records])
+    from_rows = schema.encode(schema.rows_from_mappings(records))
+    np.testing.assert_array_equal(from_mappings, from_frame)
+    np.testing.assert_array_equal(from_rows, from_frame)
+
+    # Wektor zapisany w bazie odczytywany jest w kolejności schematu
+    for vector in from_frame:
+        np.testing.assert_array_equal(Prediction.unpack_features(Prediction.pack_features(vector)), vector)
+
+
+def test_categorical_values_accept_labels_and_codes():
+    schema = SCHEMAS['lung_cancer']
+    row = [1] * schema.n_features
+    encoded = schema.encode([[' m '] + row[1:], ['F'] + row[1:], ['1'] + row[1:]])
+    np.testing.assert_array_equal(encoded[:, 0], [1, 0, 1])
+    with pytest.raises(ValueError, match='GENDER'):
+        schema.encode([['X'] + row[1:]])
+
+
+def test_check_artifacts_rejects_other_feature_order(tmp_path):
+    schema = SCHEMAS['diabetes']
+    scaler = StandardScaler().fit(pd.DataFrame(np.ones((2, schema.n_features)), columns=schema.feature_names))
+    schema.save(str(tmp_path))
+    schema.check_artifacts(str(tmp_path), scaler)
+
+    saved = json.loads((tmp_path / 'schema.json').read_text(encoding='utf-8'))
+    saved['features'] = saved['features'][::-1]
+    (tmp_path / 'schema.json').write_text(json.dumps(saved), encoding='utf-8')
+    with pytest.raises(SchemaMismatch):
+        schema.check_artifacts(str(tmp_path), scaler)
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import math
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+
+# Domyślne siatki hiperparametrów dla trenowanych modeli
+PARAM_GRIDS = {
+    'rf': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [None, 5, 10],
+        'min_samples_leaf': [1, 3, 5]
+    },
+    'lr': {
+        'C': [0.01, 0.1, 1.0, 10.0, 100.0]
+    },
+    'dt': {
+        'max_depth': [None, 3, 5, 8, 12],
+        'min_samples_leaf': [1, 5, 10, 20]
+    }
+}
+
+
+def data_hash(X, y):
+    """Skrót SHA-256 danych treningowych (wartości, kształty i typy)"""
+    digest = hashlib.sha256()
+    for array in (np.ascontiguousarray(X), np.ascontiguousarray(y)):
+        digest.update(str((array.shape, array.dtype.str)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class FoldResultCache:
+    """
+    Dyskowa pamięć podręczna wyników pojedynczych foldów walidacji krzyżowej.
+    Klucz obejmuje skrót danych, model, parametry, liczbę próbek i numer foldu,
+    więc ponowne uruchomienie pomija konfiguracje już policzone.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(**parts):
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        path = f'{self.directory}/{key}.json'
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        with open(path) as f:
+            return json.load(f)
+
+    def put(self, key, result):
+        # Zapis przez plik tymczasowy, aby przerwany zapis nie zostawił uszkodzonego wpisu
+        path = f'{self.directory}/{key}.json'
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(result, f)
+        os.replace(temp_path, path)
+
+
+def fit_and_score(estimator, params, X, y, train_index, test_index):
+    """Trenuje kopię modelu z podanymi parametrami na jednym foldzie i zwraca dokładność"""
+    model = clone(estimator).set_params(**params)
+    start = time.perf_counter()
+    model.fit(X[train_index], y[train_index])
+    fit_time = time.perf_counter() - start
+    return {'score': float(model.score(X[test_index], y[test_index])), 'fit_time': fit_time}
+
+
+def evaluate_candidates(estimator, candidates, X, y, cache, folds, n_jobs, base_key):
+    """
+    Ocenia kandydatów walidacją krzyżową (k foldów). Brakujące pary (kandydat, fold)
+    liczone są równolegle, pozostałe odczytywane z pamięci podręcznej.
+    Zwraca listę średnich dokładności w kolejności kandydatów.
+    """
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    splits = list(splitter.split(X, y))
+
+    fold_results = {}
+    pending = []
+    for candidate_index, params in enumerate(candidates):
+        for fold_index, (train_index, test_index) in enumerate(splits):
+            key = cache.key(**base_key, params=params, n_samples=len(y), folds=folds, fold=fold_index)
+            cached = cache.get(key)
+            if cached is not None:
+                fold_results[(candidate_index, fold_index)] = cached
+            else:
+                pending.append((candidate_index, fold_index, key, params, train_index, test_index))
+
+    computed = Parallel(n_jobs=n_jobs)(
+        delayed(fit_and_score)(estimator, params, X, y, train_index, test_index)
+        for _, _, _, params, train_index, test_index in pending
+    )
+    for (candidate_index, fold_index, key, *_), result in zip(pending, computed):
+        cache.put(key, result)
+        fold_results[(candidate_index, fold_index)] = result
+
+    return [
+        float(np.mean([fold_results[(candidate_index, fold_index)]['score'] for fold_index in range(folds)]))
+        for candidate_index in range(len(candidates))
+    ]
+
+
+def tune_estimator(estimator, param_grid, X, y, cache, search='grid', folds=5, n_jobs=-1, factor=3):
+    """
+    Wyszukuje najlepsze hiperparametry modelu.
+    search='grid' - pełne przeszukanie siatki na wszystkich próbkach,
+    search='halving' - sukcesywne połowienie: w każdej rundzie zostaje 1/factor najlepszych
+    kandydatów, a liczba próbek rośnie factor razy.
+    Zwraca (najlepsze parametry, najlepszy wynik, lista (parametry, wynik, liczba próbek)).
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    candidates = list(ParameterGrid(param_grid))
+    base_key = {
+        'data': data_hash(X, y),
+        'estimator': type(estimator).__name__,
+        'base_params': estimator.get_params()
+    }
+    history = []
+
+    if search == 'grid':
+        scores = evaluate_candidates(estimator, candidates, X, y, cache, folds, n_jobs, base_key)
+        history = [(params, score, len(y)) for params, score in zip(candidates, scores)]
+    elif search == 'halving':
+        # Stała permutacja próbek - kolejne rundy używają coraz dłuższego jej prefiksu
+        order = np.random.default_rng(42).permutation(len(y))
+        n_rounds = max(1, math.ceil(math.log(len(candidates), factor)) + 1) if len(candidates) > 1 else 1
+        min_samples = max(folds * 2 * len(np.unique(y)), 1)
+
+        for round_index in range(n_rounds):
+            n_samples = max(min_samples, int(len(y) / factor ** (n_rounds - 1 - round_index)))
+            subset = order[:min(n_samples, len(y))]
+            scores = evaluate_candidates(estimator, candidates, X[subset], y[subset],
+                                         cache, folds, n_jobs, base_key)
+            history.extend((params, score, len(subset)) for params, score in zip(candidates, scores))
+
+            if len(candidates) == 1:
+                break
+            ranking = np.argsort(scores)[::-1]
+            keep = max(1, math.ceil(len(candidates) / factor))
+            candidates = [candidates[index] for index in ranking[:keep]]
+    else:
+        raise ValueError(f"Nieznana metoda wyszukiwania: {search}")
+
+    # Najlepszy kandydat spośród ocenionych na największej liczbie próbek
+    max_samples = max(n_samples for _, _, n_samples in history)
+    final = [(params, score) for params, score, n_samples in history if n_samples == max_samples]
+    best_params, best_score = max(final, key=lambda item: item[1])
+    return best_params, best_score, history
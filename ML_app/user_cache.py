@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask_login import UserMixin
+from sqlalchemy import event
+
+
+class CachedUser(UserMixin):
+    """
+    Niezależna od sesji bazy kopia danych użytkownika przechowywana w pamięci podręcznej.
+    Nie zawiera skrótu hasła - widoki potrzebują tylko identyfikatora i danych do wyświetlenia.
+    """
+
+    def __init__(self, id, username, email):
+        self.id = id
+        self.username = username
+        self.email = email
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.email)
+
+
+class UserCache:
+    """
+    Pamięć podręczna użytkowników w obrębie procesu (LRU z czasem życia wpisu).
+    Dzięki niej load_user nie odpytuje bazy przy każdym żądaniu.
+    Wpisy usuwane są po upływie ttl sekund oraz po każdej zmianie lub usunięciu użytkownika
+    (zdarzenia SQLAlchemy, zob. watch).
+    """
+
+    def __init__(self, ttl=300.0, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()    # id użytkownika -> (czas zapisu, CachedUser)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user):
+        """Zapisuje kopię użytkownika i zwraca ją"""
+        cached = CachedUser.from_user(user)
+        with self._lock:
+            self._entries[cached.id] = (time.monotonic(), cached)
+            self._entries.move_to_end(cached.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def invalidate(self, user_id=None):
+        """Usuwa wpis użytkownika (lub wszystkie wpisy, gdy user_id=None)"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def watch(self, model):
+        """Usuwa wpis po aktualizacji lub usunięciu obiektu modelu użytkownika"""
+        def on_change(mapper, connection, target):
+            self.invalidate(target.id)
+
+        event.listen(model, 'after_update', on_change)
+        event.listen(model, 'after_delete', on_change)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,15 @@
+"""
+Punkt wejścia WSGI dla serwera produkcyjnego. Plik aplikacji ma w nazwie myślnik
+(flask-app.py), więc jest importowany przez importlib. Uruchamianie z katalogu ML_app:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import importlib.util
+import os
+
+_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flask-app.py')
+_spec = importlib.util.spec_from_file_location('flask_app', _path)
+flask_app = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(flask_app)
+
+app = flask_app.app